@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from cachetools import LRUCache
+
+from app.config import bot_config
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Lets through ``rate`` acquisitions per second with bursts of up to
+    ``capacity``. Waiters are served in the order they came.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Lets nothing through for ``seconds``, then starts with an empty bucket.
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = self.paused_until
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Keeps requests of the bot under Telegram limits: ``rate`` requests per
+    second in total and ``chat_rate`` per chat with bursts of ``chat_burst``.
+    A request answered with 429 is retried after ``retry_after`` seconds, the
+    chat is paused for that time.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        chat_rate: float,
+        chat_burst: int,
+        max_retries: int,
+        max_chats: int = 10_000,
+    ):
+        self.bucket = TokenBucket(rate, rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        # buckets of the least recently active chats are dropped first
+        self.chat_buckets: LRUCache[Any, TokenBucket] = LRUCache(max_chats)
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, 'chat_id', None)
+        attempt = 0
+        while True:
+            if chat_id is not None:
+                await self._chat_bucket(chat_id).acquire()
+            await self.bucket.acquire()
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.warning(
+                    'Flood control on %s in chat %s, retrying in %s s',
+                    type(method).__name__,
+                    chat_id,
+                    e.retry_after,
+                )
+                if chat_id is not None:
+                    self._chat_bucket(chat_id).pause(e.retry_after)
+                else:
+                    self.bucket.pause(e.retry_after)
+
+
+class Broadcaster:
+    """
+    Sends requests to many chats concurrently. Requests to one chat are sent
+    one after another in the given order, at most ``max_concurrency`` requests
+    are in flight at once. Rate limits are left to ``RateLimitMiddleware`` of
+    the bot session.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _send_to_chat(
+        self,
+        bot: Bot,
+        requests: list[tuple[int, TelegramMethod]],
+        results: list[Any],
+    ) -> None:
+        for index, method in requests:
+            try:
+                async with self.semaphore:
+                    results[index] = await bot(method)
+            except TelegramAPIError as e:
+                logger.warning(
+                    'Failed to send %s to chat %s: %s',
+                    type(method).__name__,
+                    getattr(method, 'chat_id', None),
+                    e,
+                )
+                results[index] = e
+
+    async def broadcast(
+        self,
+        bot: Bot,
+        methods: Iterable[TelegramMethod],
+        timeout: float | None = None,
+    ) -> list[Any]:
+        """
+        Returns results in the order of ``methods``. A failed request doesn't
+        stop the others, its exception is returned instead of the result.
+        Requests not sent in ``timeout`` seconds are cancelled and their
+        results are ``None``.
+        """
+        methods = list(methods)
+        by_chat: dict[Any, list[tuple[int, TelegramMethod]]] = {}
+        for index, method in enumerate(methods):
+            chat_id = getattr(method, 'chat_id', None)
+            by_chat.setdefault(chat_id, []).append((index, method))
+
+        results: list[Any] = [None] * len(methods)
+        if not by_chat:
+            return results
+
+        tasks = [
+            asyncio.create_task(self._send_to_chat(bot, requests, results))
+            for requests in by_chat.values()
+        ]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if pending:
+            logger.warning(
+                'Broadcast timed out, %s of %s chats are not done',
+                len(pending),
+                len(tasks),
+            )
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            task.result()
+        return results
+
+
+rate_limiter = RateLimitMiddleware(
+    rate=bot_config.BROADCAST_RATE,
+    chat_rate=bot_config.BROADCAST_CHAT_RATE,
+    chat_burst=bot_config.BROADCAST_CHAT_BURST,
+    max_retries=bot_config.BROADCAST_MAX_RETRIES,
+)
+broadcaster = Broadcaster(bot_config.BROADCAST_CONCURRENCY)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText
+from cachetools import LRUCache
+
+from app.config import bot_config
+
+logger = logging.getLogger(__name__)
+
+EditMethod = EditMessageText | EditMessageReplyMarkup
+
+
+@dataclass
+class _MessageState:
+    text_hash: int | None = None
+    markup_hash: int | None = None
+    sent_at: float = float('-inf')
+    pending: EditMethod | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+def _text_hash(method: EditMessageText) -> int:
+    return hash((method.text, method.parse_mode, str(method.entities)))
+
+
+def _markup_hash(method: EditMethod) -> int:
+    markup = method.reply_markup
+    return hash(markup.model_dump_json() if markup is not None else None)
+
+
+class EditCoalescer:
+    """
+    Sends edits of a message at most once in ``window`` seconds. The first
+    edit is sent at once, edits coming in the window after it are collapsed
+    into one edit with the latest state sent when the window ends. Edits that
+    don't change the text or the keyboard of the message are not sent.
+
+    The coalescer must know about every edit of a message it handles: edit
+    it through ``edit`` or call ``discard`` before editing it directly.
+    """
+
+    def __init__(self, window: float, max_messages: int = 10_000):
+        self.window = window
+        self.messages: LRUCache[tuple, _MessageState] = LRUCache(max_messages)
+        self.sent = 0
+        self.coalesced = 0
+        self.skipped = 0
+
+    def _state(self, key: tuple) -> _MessageState:
+        state = self.messages.get(key)
+        if state is None:
+            state = _MessageState()
+            self.messages[key] = state
+        return state
+
+    def _is_unchanged(self, state: _MessageState, method: EditMethod) -> bool:
+        if _markup_hash(method) != state.markup_hash:
+            return False
+        if isinstance(method, EditMessageText):
+            return _text_hash(method) == state.text_hash
+        return True
+
+    async def edit(self, bot: Bot, method: EditMethod) -> None:
+        state = self._state((method.chat_id, method.message_id))
+
+        if state.pending is not None:
+            self.coalesced += 1
+            if isinstance(method, EditMessageReplyMarkup) and isinstance(
+                state.pending, EditMessageText
+            ):
+                # the text waiting to be sent must not be lost
+                method = state.pending.model_copy(
+                    update={'reply_markup': method.reply_markup}
+                )
+            state.pending = method
+            return
+
+        if self._is_unchanged(state, method):
+            self.skipped += 1
+            return
+
+        wait = state.sent_at + self.window - time.monotonic()
+        if wait <= 0:
+            await self._send(bot, state, method)
+            return
+
+        state.pending = method
+        state.task = asyncio.create_task(self._send_later(bot, state, wait))
+
+    def discard(self, chat_id: int, message_id: int) -> None:
+        """
+        Forgets the message: drops its pending edit and the last sent state.
+        Must be called before the message is edited or deleted directly.
+        """
+        state = self.messages.pop((chat_id, message_id), None)
+        if state is not None and state.task is not None:
+            state.task.cancel()
+
+    async def _send_later(self, bot: Bot, state: _MessageState, wait: float) -> None:
+        await asyncio.sleep(wait)
+        method, state.pending = state.pending, None
+        state.task = None
+        if self._is_unchanged(state, method):
+            self.skipped += 1
+            return
+        await self._send(bot, state, method)
+
+    async def _send(self, bot: Bot, state: _MessageState, method: EditMethod) -> None:
+        state.sent_at = time.monotonic()
+        text_hash, markup_hash = state.text_hash, state.markup_hash
+        if isinstance(method, EditMessageText):
+            state.text_hash = _text_hash(method)
+        state.markup_hash = _markup_hash(method)
+        self.sent += 1
+        try:
+            await bot(method)
+        except TelegramAPIError as e:
+            if isinstance(e, TelegramBadRequest) and 'not modified' in e.message:
+                return
+            logger.warning('Failed to edit message %s: %s', method.message_id, e)
+            # the next edit must not be skipped as unchanged
+            state.text_hash, state.markup_hash = text_hash, markup_hash
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'skipped': self.skipped,
+        }
+
+
+edit_coalescer = EditCoalescer(bot_config.EDIT_COALESCE_WINDOW)
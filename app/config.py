@@ -8,5 +8,22 @@ class BotConfig(BaseSettings):
     OWNER: str
     THROTTLE: float
     THROTTLE_CACHE_MAXSIZE: int
+    BROADCAST_RATE: float = 30
+    BROADCAST_CHAT_RATE: float = 1
+    BROADCAST_CHAT_BURST: int = 5
+    BROADCAST_CONCURRENCY: int = 16
+    BROADCAST_MAX_RETRIES: int = 3
+    ROUND_START_DELIVERY_TIMEOUT: float = 60
+    EDIT_COALESCE_WINDOW: float = 1
+    SCHEDULER_POLL_INTERVAL: float = 1
+    SCHEDULER_MISFIRE_GRACE: float = 30
+    SCHEDULER_DRIFT_WARNING: float = 1
+    WEBHOOK_URL: str | None = None
+    WEBHOOK_PATH: str = '/webhook'
+    WEBHOOK_SECRET: str | None = None
+    WEBHOOK_WORKERS: int = 8
+    WEBHOOK_QUEUE_SIZE: int = 1000
+    WEBHOOK_ENQUEUE_TIMEOUT: float = 5
+    WEBHOOK_SHUTDOWN_TIMEOUT: float = 30
 
 bot_config = BotConfig()
@@ -0,0 +1,17 @@
+from aiogram import types
+from aiogram.filters import Filter
+
+from keyboards.schemas import Action, parse_action_data
+
+
+class ActionFilter(Filter):
+    """
+    Passes callbacks of order buttons. The parsed action is given to the
+    handler as ``action``.
+    """
+
+    async def __call__(self, call: types.CallbackQuery) -> bool | dict[str, Action]:
+        action = parse_action_data(call.data)
+        if action is None:
+            return False
+        return {'action': action}
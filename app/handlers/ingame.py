@@ -1,31 +1,44 @@
-import asyncio
 import logging
+import uuid
 
-from aiogram import Router, types
+from aiogram import Bot, Router, types
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import BaseStorage, StorageKey
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText, SendMessage
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.broadcast import broadcaster
+from app.coalescer import edit_coalescer
+from app.config import bot_config
+from app.filters.action import ActionFilter
 from app.filters.admin import AdminFilter
 from app.filters.buttons import InlineButtonFilter, ReplyButtonFilter
 from app.filters.state import BotStates
-from app.handlers.round_loop import get_round_notifier
-from app.utils import method_executor_msg, send_all_info, sync_method_executor_call
+from app.handlers.round_loop import cancel_round, schedule_round
+from app.scheduler import Scheduler
+from app.utils import (
+    make_all_info,
+    method_executor_call,
+    method_executor_msg,
+    save_info_messages,
+)
 from database.clients.game import GameClient
-from database.clients.info import InfoClient
 from database.clients.user import UserClient
 from database.schemas import GameDto, GameStatus, PlanetDto, UserDto
 from game.config import game_config
 from keyboards import keyboards as kb
-from keyboards.schemas import Action, ActionType, get_action_from_data, validate_action
-from messages.renderer import MessageRenderer
+from keyboards.schemas import Action, ActionType
+from messages.renderer import MessageRenderer, get_renderer
 from storage.clients.actions import ActionsClient
 from storage.clients.messages import MessagesClient
-from storage.schemas import MessageType
+from storage.schemas import Job, MessageType
 
 ingame_router = Router()
 logger = logging.getLogger(__name__)
 
+TRANSACTION_TIMEOUT = 'transaction_timeout'
+
 
 async def start_round(
     message: types.Message,
@@ -33,7 +46,7 @@ async def start_round(
     messages_client: MessagesClient,
     game_client: GameClient,
     actions_client: ActionsClient,
-    info_client: InfoClient,
+    scheduler: Scheduler,
     session: AsyncSession,
     renderer: MessageRenderer,
 ):
@@ -61,47 +74,57 @@ async def start_round(
     ]
     game: GameDto = await game_client.get_game(session, user.game_id)
 
-    for admin in active_admins:
-        await message.bot.send_message(
-            admin.tg_id,
-            **renderer.render('start_round_for_admins', game=game),
-            reply_markup=types.ReplyKeyboardRemove(),
-        )
+    await broadcaster.broadcast(
+        message.bot,
+        (
+            SendMessage(
+                chat_id=admin.tg_id,
+                **renderer.render('start_round_for_admins', game=game),
+                reply_markup=types.ReplyKeyboardRemove(),
+            )
+            for admin in active_admins
+        ),
+    )
 
     all_planets_and_cities = await game_client.get_all_planets_and_cities(
         session, game.id
     )
+    sanctions = await game_client.get_imposed_sanctions_of_game(session, game.id)
+    dashboards: dict[int, list[SendMessage]] = {}
     for pl_id in all_planets_and_cities:
         planet, _ = all_planets_and_cities[pl_id]
-        actions_client.set_balance(planet.id, planet.balance, actions_client.MONEY_KEY)
-        actions_client.set_balance(
+        await actions_client.set_balance(
+            planet.id, planet.balance, actions_client.MONEY_KEY
+        )
+        await actions_client.set_balance(
             planet.id, planet.meteorites, actions_client.METEORITES_KEY
         )
         if planet.owner_id in acitve_players_ids:
-            sanctioned_planets = await game_client.get_planets_imposed_sanctions(session, pl_id)
-            await send_all_info(
-                bot=message.bot,
+            dashboards[planet.owner_id] = make_all_info(
                 game=game,
                 planets_and_cities=all_planets_and_cities.copy(),
                 planet_id=pl_id,
                 order_info={},
                 user_id=planet.owner_id,
-                messages_client=messages_client,
-                sanctioned_planets=sanctioned_planets,
+                sanctioned_planets=sanctions.get(pl_id, []),
                 renderer=renderer,
             )
-    round_notifier = get_round_notifier(
-        bot=message.bot,
-        game=game,
-        game_client=game_client,
-        actions_client=actions_client,
-        info_client=info_client,
-        messages_client=messages_client,
-        session=session,
-        renderer=renderer,
+
+    # the round timer starts once dashboards are delivered or given up on
+    results = await broadcaster.broadcast(
+        message.bot,
+        [request for requests in dashboards.values() for request in requests],
+        timeout=bot_config.ROUND_START_DELIVERY_TIMEOUT,
     )
+    offset = 0
+    for user_id, requests in dashboards.items():
+        await save_info_messages(
+            messages_client, user_id, results[offset:offset + len(requests)]
+        )
+        offset += len(requests)
+
     await session.commit()
-    await round_notifier.run_loop()
+    await schedule_round(scheduler, game, renderer.language)
 
 
 @ingame_router.message(ReplyButtonFilter('Начать игру'), AdminFilter())
@@ -111,7 +134,7 @@ async def start_game(
     messages_client: MessagesClient,
     game_client: GameClient,
     actions_client: ActionsClient,
-    info_client: InfoClient,
+    scheduler: Scheduler,
     session: AsyncSession,
     renderer: MessageRenderer,
 ):
@@ -121,7 +144,7 @@ async def start_game(
         messages_client,
         game_client,
         actions_client,
-        info_client,
+        scheduler,
         session,
         renderer,
     )
@@ -134,7 +157,7 @@ async def start_new_round(
     messages_client: MessagesClient,
     game_client: GameClient,
     actions_client: ActionsClient,
-    info_client: InfoClient,
+    scheduler: Scheduler,
     session: AsyncSession,
     renderer: MessageRenderer,
 ):
@@ -144,7 +167,7 @@ async def start_new_round(
         messages_client,
         game_client,
         actions_client,
-        info_client,
+        scheduler,
         session,
         renderer,
     )
@@ -160,6 +183,7 @@ async def end_the_game(
     game_client: GameClient,
     session: AsyncSession,
     renderer: MessageRenderer,
+    scheduler: Scheduler,
 ):
     logger.info(
         'ingame_router.end_the_game: Admin id=%s is ending the game',
@@ -174,22 +198,35 @@ async def end_the_game(
     admins_list = await game_client.get_all_active_admins(session, game.id)
     players_list = await game_client.get_all_active_players(session, game.id)
 
-    for admin in admins_list:
-        await message.bot.send_message(
-            admin.tg_id, **renderer.render('game_interrupted_report'),
-            reply_markup=kb.start_keyboard(True)
-        )
-    for player in players_list:
-        await message.bot.send_message(
-            player.tg_id, **renderer.render('game_interrupted_message'),
-            reply_markup=kb.start_keyboard(False)
-        )
+    await broadcaster.broadcast(
+        message.bot,
+        [
+            *(
+                SendMessage(
+                    chat_id=admin.tg_id,
+                    **renderer.render('game_interrupted_report'),
+                    reply_markup=kb.start_keyboard(True),
+                )
+                for admin in admins_list
+            ),
+            *(
+                SendMessage(
+                    chat_id=player.tg_id,
+                    **renderer.render('game_interrupted_message'),
+                    reply_markup=kb.start_keyboard(False),
+                )
+                for player in players_list
+            ),
+        ],
+    )
     await game_client.end_game(session, game.id)
+    await cancel_round(scheduler, game.id)
 
 
-@ingame_router.callback_query(lambda call: validate_action(call.data))
+@ingame_router.callback_query(ActionFilter())
 async def handle_action(
     call: types.CallbackQuery,
+    action: Action,
     state: FSMContext,
     user_client: UserClient,
     game_client: GameClient,
@@ -197,8 +234,8 @@ async def handle_action(
     actions_client: ActionsClient,
     session: AsyncSession,
     renderer: MessageRenderer,
+    scheduler: Scheduler,
 ):
-    action = get_action_from_data(call.data)
     logger.info(
         'ingame_router.handle_action: User id=%s is performing action %s',
         call.from_user.id,
@@ -218,10 +255,7 @@ async def handle_action(
         await call.bot.delete_message(call.from_user.id, call.message.message_id)
         return
 
-    old_balance = actions_client.get_balance(planet.id, actions_client.MONEY_KEY)
-    old_meteorites = actions_client.get_balance(
-        planet.id, actions_client.METEORITES_KEY
-    )
+    old_state = await actions_client.get_planet_state(planet.id)
 
     data = {
         'call': call,
@@ -235,20 +269,22 @@ async def handle_action(
         'messages_client': messages_client,
         'session': session,
         'renderer': renderer,
+        'scheduler': scheduler,
     }
+    keyboard_edit = None
     match action.action_type:
         case ActionType.ATTACK:
-            await handle_attack_action(**data)
+            keyboard_edit = await handle_attack_action(**data)
         case ActionType.DEVELOP | ActionType.SHIELD:
-            await handle_city_action(**data)
+            keyboard_edit = await handle_city_action(**data)
         case ActionType.CREATE:
-            await handle_create_action(**data)
+            keyboard_edit = await handle_create_action(**data)
         case ActionType.ECO:
-            await handle_eco_action(**data)
+            keyboard_edit = await handle_eco_action(**data)
         case ActionType.SANCTIONS:
-            await handle_sanctions_action(**data)
+            keyboard_edit = await handle_sanctions_action(**data)
         case ActionType.INVENT:
-            await handle_invent_action(**data)
+            keyboard_edit = await handle_invent_action(**data)
         case ActionType.NEGOTIATE:
             await handle_negotiate_action(**data)
         case ActionType.TRANSACTION:
@@ -261,47 +297,74 @@ async def handle_action(
         case ActionType.END_NEGOTIATIONS:
             await handle_end_negotiations_action(**data)
 
-    new_balance = actions_client.get_balance(planet.id, actions_client.MONEY_KEY)
-    meteorites = actions_client.get_balance(planet.id, actions_client.METEORITES_KEY)
+    new_state = await actions_client.get_planet_state(planet.id)
+    new_balance, meteorites = new_state.money, new_state.meteorites
 
-    if old_balance != new_balance:
-        info_message_id = messages_client.get_info_message_id(
+    text_edits: list[EditMessageText] = []
+    if old_state.money != new_balance:
+        info_message_id = await messages_client.get_info_message_id(
             planet.owner_id,
             MessageType.CITY,
         )
         planet.balance = new_balance
         cities = await game_client.get_cities_of_planet(session, planet.id, False)
         cities.sort(key=lambda city: city.name)
-        await call.bot.edit_message_text(
-            **renderer.render(
-                'common_planet_info',
-                planet=planet,
-                cities=cities,
-            ),
-            chat_id=planet.owner_id,
-            message_id=info_message_id,
-            reply_markup=kb.city_keyboard(
-                game.round,
-                planet,
-                cities,
-                actions_client.get_shielded_cities(planet.id),
-                actions_client.get_developed_cities(planet.id),
+        text_edits.append(
+            EditMessageText(
+                **renderer.render(
+                    'common_planet_info',
+                    planet=planet,
+                    cities=cities,
+                ),
+                chat_id=planet.owner_id,
+                message_id=info_message_id,
+                reply_markup=kb.city_keyboard(
+                    game.round,
+                    planet,
+                    cities,
+                    await actions_client.get_shielded_cities(planet.id),
+                    await actions_client.get_developed_cities(planet.id),
+                ),
             ),
         )
-    if old_meteorites != meteorites:
+    if old_state.meteorites != meteorites:
         planet.meteorites = meteorites
-        info_message_id = messages_client.get_info_message_id(
+        info_message_id = await messages_client.get_info_message_id(
             planet.owner_id,
             MessageType.METEORITES,
         )
-        chosen_meteorites = actions_client.get_created_meteorites(planet.id)
-        await call.bot.edit_message_text(
-            **renderer.render('meteorites_info', planet=planet),
-            chat_id=planet.owner_id,
-            message_id=info_message_id,
-            reply_markup=kb.meteorites_keyboard(planet, chosen_meteorites),
+        text_edits.append(
+            EditMessageText(
+                **renderer.render('meteorites_info', planet=planet),
+                chat_id=planet.owner_id,
+                message_id=info_message_id,
+                reply_markup=kb.meteorites_keyboard(
+                    planet, new_state.created_meteorites
+                ),
+            ),
         )
 
+    # a text edit of the pressed message carries its new keyboard, sending
+    # the keyboard first would hold the text back for the coalescing window
+    if keyboard_edit is not None and not any(
+        (edit.chat_id, edit.message_id)
+        == (keyboard_edit.chat_id, keyboard_edit.message_id)
+        for edit in text_edits
+    ):
+        await edit_coalescer.edit(call.bot, keyboard_edit)
+    for edit in text_edits:
+        await edit_coalescer.edit(call.bot, edit)
+
+
+def _keyboard_edit(
+    call: types.CallbackQuery, reply_markup: types.InlineKeyboardMarkup
+) -> EditMessageReplyMarkup:
+    return EditMessageReplyMarkup(
+        chat_id=call.message.chat.id,
+        message_id=call.message.message_id,
+        reply_markup=reply_markup,
+    )
+
 
 async def handle_attack_action(
     call: types.CallbackQuery,
@@ -314,14 +377,14 @@ async def handle_attack_action(
     renderer: MessageRenderer,
     *args,
     **kwargs,
-):
-    result = await sync_method_executor_call(
+) -> EditMessageReplyMarkup | None:
+    result = await method_executor_call(
         actions_client.attack_city, call, renderer, planet.id, action.argument
     )
     if not result:
         return
 
-    attacked_cities = actions_client.get_attacked_cities(planet.id)
+    attacked_cities = await actions_client.get_attacked_cities(planet.id)
     other_planet = await game_client.get_planet_by_city_id(session, action.argument)
     all_cities = await game_client.get_cities_of_planet(
         session, other_planet.id, with_rates=False
@@ -333,10 +396,11 @@ async def handle_attack_action(
         if planet_in_game.id != planet.id
     ]
 
-    await call.message.edit_reply_markup(
-        reply_markup=kb.other_planets_keyboard(
+    return _keyboard_edit(
+        call,
+        kb.other_planets_keyboard(
             game.round, planet, other_planet, all_cities, attacked_cities, other_planet_ids
-        )
+        ),
     )
 
 
@@ -351,30 +415,31 @@ async def handle_city_action(
     renderer: MessageRenderer,
     *args,
     **kwargs,
-):
+) -> EditMessageReplyMarkup | None:
     if action.action_type == ActionType.DEVELOP:
-        result = await sync_method_executor_call(
+        result = await method_executor_call(
             actions_client.develop_city, call, renderer, planet.id, action.argument
         )
     else:
-        result = await sync_method_executor_call(
+        result = await method_executor_call(
             actions_client.shield_city, call, renderer, planet.id, action.argument
         )
 
     if not result:
         return
 
-    shielded_cities = actions_client.get_shielded_cities(planet.id)
-    developed_cities = actions_client.get_developed_cities(planet.id)
+    shielded_cities = await actions_client.get_shielded_cities(planet.id)
+    developed_cities = await actions_client.get_developed_cities(planet.id)
 
     all_cities = await game_client.get_cities_of_planet(
         session, planet.id, with_rates=False
     )
 
-    await call.message.edit_reply_markup(
-        reply_markup=kb.city_keyboard(
+    return _keyboard_edit(
+        call,
+        kb.city_keyboard(
             game.round, planet, all_cities, shielded_cities, developed_cities
-        )
+        ),
     )
 
 
@@ -386,17 +451,18 @@ async def handle_create_action(
     renderer: MessageRenderer,
     *args,
     **kwargs,
-):
-    result = await sync_method_executor_call(
+) -> EditMessageReplyMarkup | None:
+    result = await method_executor_call(
         actions_client.create_meteorites, call, renderer, planet.id, action.argument
     )
     if not result:
         return
 
-    chosen = actions_client.get_created_meteorites(planet.id)
+    chosen = await actions_client.get_created_meteorites(planet.id)
 
-    await call.message.edit_reply_markup(
-        reply_markup=kb.meteorites_keyboard(planet, chosen)
+    return _keyboard_edit(
+        call,
+        kb.meteorites_keyboard(planet, chosen),
     )
 
 
@@ -407,17 +473,18 @@ async def handle_eco_action(
     renderer: MessageRenderer,
     *args,
     **kwargs,
-):
-    result = await sync_method_executor_call(
+) -> EditMessageReplyMarkup | None:
+    result = await method_executor_call(
         actions_client.eco_boost, call, renderer, planet.id
     )
     if not result:
         return
 
-    is_eco_boosted = actions_client.get_eco_boost(planet.id)
+    is_eco_boosted = await actions_client.get_eco_boost(planet.id)
 
-    await call.message.edit_reply_markup(
-        reply_markup=kb.eco_keyboard(planet, is_eco_boosted)
+    return _keyboard_edit(
+        call,
+        kb.eco_keyboard(planet, is_eco_boosted),
     )
 
 
@@ -432,18 +499,19 @@ async def handle_sanctions_action(
     renderer: MessageRenderer,
     *args,
     **kwargs,
-):
-    result = await sync_method_executor_call(
+) -> EditMessageReplyMarkup | None:
+    result = await method_executor_call(
         actions_client.sanction_planet, call, renderer, planet.id, action.argument
     )
     if not result:
         return
 
-    sanctioned_planets = actions_client.get_sanctioned_planets(planet.id)
+    sanctioned_planets = await actions_client.get_sanctioned_planets(planet.id)
     other_planets = await game_client.get_planets_of_game(session, game.id, False)
 
-    await call.message.edit_reply_markup(
-        reply_markup=kb.sanctions_keyboard(planet, other_planets, sanctioned_planets)
+    return _keyboard_edit(
+        call,
+        kb.sanctions_keyboard(planet, other_planets, sanctioned_planets),
     )
 
 
@@ -454,17 +522,18 @@ async def handle_invent_action(
     renderer: MessageRenderer,
     *args,
     **kwargs,
-):
-    result = await sync_method_executor_call(
+) -> EditMessageReplyMarkup | None:
+    result = await method_executor_call(
         actions_client.invent, call, renderer, planet.id
     )
     if not result:
         return
 
-    is_invented = actions_client.get_invented(planet.id)
+    is_invented = await actions_client.get_invented(planet.id)
 
-    await call.message.edit_reply_markup(
-        reply_markup=kb.invent_meteorites_keyboard(planet, is_invented)
+    return _keyboard_edit(
+        call,
+        kb.invent_meteorites_keyboard(planet, is_invented),
     )
 
 
@@ -504,7 +573,7 @@ async def handle_negotiate_action(
         ),
         reply_markup=kb.negotiations_offer_keyboard(to_planet, planet),
     )
-    messages_client.set_planet_message_id(
+    await messages_client.set_planet_message_id(
         to_planet.owner_id,
         planet.id,
         MessageType.NEGOTIATIONS_NOTIFICATION,
@@ -526,7 +595,7 @@ async def handle_accept_negotiations_action(
     **kwargs,
 ):
     from_planet = await game_client.get_planet(session, action.argument, False)
-    result = await sync_method_executor_call(
+    result = await method_executor_call(
         actions_client.make_negotiations, call, renderer, from_planet.id, planet.id,
     )
     if not result:
@@ -539,14 +608,14 @@ async def handle_accept_negotiations_action(
         ),
         reply_markup=kb.end_negotiations_keyboard(planet, from_planet),
     )
-    messages_client.set_planet_message_id(
+    await messages_client.set_planet_message_id(
         planet.owner_id,
         from_planet.id,
         MessageType.NEGOTIATIONS_END,
         message.message_id,
     )
     await call.message.delete()
-    messages_client.delete_planet_message_ids(
+    await messages_client.delete_planet_message_ids(
         planet.owner_id, MessageType.NEGOTIATIONS_NOTIFICATION, from_planet.id
     )
 
@@ -583,7 +652,7 @@ async def handle_refuse_negotiations_action(
 ):
     await call.answer()
     await call.message.delete()
-    messages_client.delete_planet_message_ids(
+    await messages_client.delete_planet_message_ids(
         planet.owner_id, MessageType.NEGOTIATIONS_NOTIFICATION, action.argument
     )
 
@@ -611,7 +680,7 @@ async def handle_end_negotiations_action(
     **kwargs,
 ):
     from_planet = await game_client.get_planet(session, action.argument)
-    result = await sync_method_executor_call(
+    result = await method_executor_call(
         actions_client.end_negotiations,
         call,
         renderer,
@@ -631,7 +700,7 @@ async def handle_end_negotiations_action(
         )
 
     await call.message.answer(**renderer.render('negotiations_ended'))
-    messages_client.delete_planet_message_ids(
+    await messages_client.delete_planet_message_ids(
         planet.owner_id, MessageType.NEGOTIATIONS_END, from_planet.id
     )
     await call.message.delete()
@@ -646,6 +715,7 @@ async def handle_transaction_action(
     game_client: GameClient,
     session: AsyncSession,
     renderer: MessageRenderer,
+    scheduler: Scheduler,
     *args,
     **kwargs,
 ):
@@ -653,9 +723,12 @@ async def handle_transaction_action(
 
     to_planet = await game_client.get_planet(session, action.argument, False)
 
+    # the timeout only expires the transaction it was scheduled for
+    nonce = uuid.uuid4().hex
     await state.set_state(BotStates.transaction_state)
-    transaction_data = {'from_planet': planet, 'to_planet': to_planet, 'game': game}
-    await state.set_data(transaction_data)
+    await state.set_data(
+        {'from_planet': planet, 'to_planet': to_planet, 'game': game, 'nonce': nonce}
+    )
     await call.message.answer(
         **renderer.render(
             'how_much_money',
@@ -663,16 +736,46 @@ async def handle_transaction_action(
         )
     )
 
-    await asyncio.sleep(game_config.TIME_WAITING_AMOUNT_ANSWER)
+    await scheduler.schedule(
+        game.id,
+        TRANSACTION_TIMEOUT,
+        game_config.TIME_WAITING_AMOUNT_ANSWER,
+        {
+            'chat_id': call.message.chat.id,
+            'user_id': call.from_user.id,
+            'nonce': nonce,
+            'language': renderer.language,
+        },
+    )
+
 
-    current_data = await state.get_data()
-    if current_data != transaction_data:
+async def expire_transaction(
+    job: Job,
+    bot: Bot,
+    fsm_storage: BaseStorage,
+    game_client: GameClient,
+    session: AsyncSession,
+    **kwargs,
+):
+    """
+    Clears the transaction state if the player hasn't answered with an
+    amount in ``TIME_WAITING_AMOUNT_ANSWER`` seconds.
+    """
+    chat_id = job.payload['chat_id']
+    state = FSMContext(
+        fsm_storage,
+        StorageKey(bot_id=bot.id, chat_id=chat_id, user_id=job.payload['user_id']),
+    )
+    if (await state.get_data()).get('nonce') != job.payload['nonce']:
         return
 
     await state.clear()
-    game = await game_client.get_game(session, game.id)
-    if game.status == GameStatus.ROUND:
-        await call.message.answer(**renderer.render('waiting_time_expired'))
+    game = await game_client.get_game(session, job.game_id)
+    if game is not None and game.status == GameStatus.ROUND:
+        await bot.send_message(
+            chat_id=chat_id,
+            **get_renderer(job.payload['language']).render('waiting_time_expired'),
+        )
 
 
 @ingame_router.message(BotStates.transaction_state)
@@ -708,7 +811,9 @@ async def set_amount_of_money(
     to_planet = data['to_planet']
 
     # check current balance which is stored
-    current_balance = actions_client.get_balance(from_planet.id, actions_client.MONEY_KEY)
+    current_balance = await actions_client.get_balance(
+        from_planet.id, actions_client.MONEY_KEY
+    )
     if amount > current_balance:
         await message.answer(**renderer.render('not_enough_money_for_transaction'))
         return
@@ -732,52 +837,60 @@ async def set_amount_of_money(
     if not res:
         return
 
-    actions_client.set_balance(
+    await actions_client.set_balance(
         from_planet.id, current_balance - amount, actions_client.MONEY_KEY,
     )
-    to_planet_balance = actions_client.get_balance(to_planet.id, actions_client.MONEY_KEY)
-    actions_client.set_balance(
+    to_planet_balance = await actions_client.get_balance(
+        to_planet.id, actions_client.MONEY_KEY
+    )
+    await actions_client.set_balance(
         to_planet.id, to_planet_balance + amount, actions_client.MONEY_KEY,
     )
     from_planet.balance = current_balance - amount
     to_planet.balance = to_planet_balance + amount
 
-    from_city_id = messages_client.get_info_message_id(
+    from_city_id = await messages_client.get_info_message_id(
         from_planet.owner_id, MessageType.CITY
     )
-    to_city_id = messages_client.get_info_message_id(
+    to_city_id = await messages_client.get_info_message_id(
         to_planet.owner_id, MessageType.CITY
     )
-    await message.bot.edit_message_text(
-        **renderer.render(
-            'common_planet_info',
-            planet=from_planet,
-            cities=from_planet_cities,
-        ),
-        chat_id=from_planet.owner_id,
-        message_id=from_city_id,
-        reply_markup=kb.city_keyboard(
-            game.round,
-            from_planet,
-            from_planet_cities,
-            actions_client.get_shielded_cities(from_planet.id),
-            actions_client.get_developed_cities(from_planet.id),
+    await edit_coalescer.edit(
+        message.bot,
+        EditMessageText(
+            **renderer.render(
+                'common_planet_info',
+                planet=from_planet,
+                cities=from_planet_cities,
+            ),
+            chat_id=from_planet.owner_id,
+            message_id=from_city_id,
+            reply_markup=kb.city_keyboard(
+                game.round,
+                from_planet,
+                from_planet_cities,
+                await actions_client.get_shielded_cities(from_planet.id),
+                await actions_client.get_developed_cities(from_planet.id),
+            ),
         ),
     )
-    await message.bot.edit_message_text(
-        **renderer.render(
-            'common_planet_info',
-            planet=to_planet,
-            cities=to_planet_cities,
-        ),
-        chat_id=to_planet.owner_id,
-        message_id=to_city_id,
-        reply_markup=kb.city_keyboard(
-            game.round,
-            to_planet,
-            to_planet_cities,
-            actions_client.get_shielded_cities(to_planet.id),
-            actions_client.get_developed_cities(to_planet.id),
+    await edit_coalescer.edit(
+        message.bot,
+        EditMessageText(
+            **renderer.render(
+                'common_planet_info',
+                planet=to_planet,
+                cities=to_planet_cities,
+            ),
+            chat_id=to_planet.owner_id,
+            message_id=to_city_id,
+            reply_markup=kb.city_keyboard(
+                game.round,
+                to_planet,
+                to_planet_cities,
+                await actions_client.get_shielded_cities(to_planet.id),
+                await actions_client.get_developed_cities(to_planet.id),
+            ),
         ),
     )
     await message.answer(
@@ -815,9 +928,11 @@ async def switch_other_planet(
         for planet_in_game in planets_in_game
         if planet_in_game.id != planet.id
     ]
-    attacked_cities_ids = actions_client.get_attacked_cities(planet.id)
+    attacked_cities_ids = await actions_client.get_attacked_cities(planet.id)
 
     await call.answer()
+    # a keyboard edit of the previous planet may still be pending
+    edit_coalescer.discard(call.message.chat.id, call.message.message_id)
     await call.message.edit_text(
         **renderer.render(
             'other_planet_info',
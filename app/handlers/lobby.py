@@ -4,8 +4,11 @@ from functools import partial
 
 from aiogram import Bot, Router, types
 from aiogram.fsm.context import FSMContext
+from aiogram.methods import SendMessage
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.broadcast import broadcaster
+from app.coalescer import edit_coalescer
 from app.filters.admin import AdminFilter
 from app.filters.buttons import ReplyButtonFilter
 from app.filters.state import BotStates
@@ -15,7 +18,7 @@ from database.clients.user import UserClient
 from database.schemas import AdminDto, GameDto, GameStatus, PlanetDto
 from keyboards import keyboards as kb
 from messages.renderer import MessageRenderer
-from packs.pack import packs
+from packs.pack import get_packs
 from storage.clients.actions import ActionsClient
 from storage.clients.messages import MessagesClient
 
@@ -73,7 +76,7 @@ async def set_number_of_planets(
     await call.answer()
     number, pack_name = call.data.split(',')
     number = int(number)
-    for p in packs:
+    for p in get_packs():
         if p.name == pack_name:
             pack = p
             break
@@ -139,15 +142,18 @@ async def notify_lobby_on_join_leave(
     active_players = await game_client.get_all_active_players(session, game.id)
     active_admins = await game_client.get_all_active_admins(session, game.id)
 
-    for ouser in active_admins + active_players:
-        await bot.send_message(
-            ouser.tg_id,
-            **message(
-                planet=planet,
-                game=game,
-                current_players=len(active_players),
-            ),
-        )
+    notification = message(
+        planet=planet,
+        game=game,
+        current_players=len(active_players),
+    )
+    await broadcaster.broadcast(
+        bot,
+        (
+            SendMessage(chat_id=ouser.tg_id, **notification)
+            for ouser in active_admins + active_players
+        ),
+    )
 
 
 @lobby_router.message(ReplyButtonFilter('Выйти из лобби'))
@@ -186,10 +192,12 @@ async def leave_lobby(
     if isinstance(user, AdminDto):
         return
 
-    message_ids = messages_client.find_all_messages(tg_id)
+    message_ids = await messages_client.find_all_messages(tg_id)
     if len(message_ids) > 0:
+        for message_id in message_ids:
+            edit_coalescer.discard(tg_id, message_id)
         await message.bot.delete_messages(tg_id, message_ids)
-    messages_client.delete_all_messages(tg_id)
+    await messages_client.delete_all_messages(tg_id)
     game: GameDto = await user_client.get_game(session, game_id)
 
     if game.status != GameStatus.WAITING:
@@ -273,7 +281,7 @@ async def chosen_lobby(
         all_planets_and_cities = await game_client.get_all_planets_and_cities(
             session, game.id
         )
-        order_info = actions_client.get_order_info(planet.id)
+        order_info = await actions_client.get_order_info(planet.id)
         sanctioned_planets = await game_client.get_planets_imposed_sanctions(
             session, planet.id
         )
@@ -2,11 +2,12 @@ import logging
 
 from aiogram import Router, types
 from aiogram.filters import Command, CommandObject, CommandStart
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from app.filters.admin import AdminFilter, OwnerFilter
 from app.filters.buttons import InlineButtonFilter
 from app.utils import method_executor_call, method_executor_msg
+from database.alru_cache import get_cache_stats
 from database.clients import UserClient
 from database.schemas import AdminDto, UserDto
 from game.config import game_config
@@ -29,6 +30,20 @@ async def help(
     )
 
 
+@main_page_router.message(Command('cachestats'), AdminFilter())
+async def cache_stats(
+    message: types.Message,
+    renderer: MessageRenderer,
+    db_engine: AsyncEngine,
+):
+    stats = get_cache_stats()
+    pool_stats = db_engine.pool.get_stats()
+    logger.info('main_page_router.cache_stats: %s, pool: %s', stats, pool_stats)
+    await message.answer(
+        **renderer.render('cache_stats', cache_stats=stats, pool_stats=pool_stats)
+    )
+
+
 @main_page_router.message(CommandStart())
 async def start(
     message: types.Message,
@@ -1,94 +1,167 @@
+import logging
 from datetime import timedelta
 
 from aiogram import Bot
+from aiogram.methods import DeleteMessages, SendDocument, SendMessage
 from aiogram.types import FSInputFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.notifier import Notifier
+from app.broadcast import broadcaster
 from app.pivot_table import make_pivot_table
+from app.scheduler import Scheduler
 from database.clients.game import GameClient
 from database.clients.info import InfoClient
-from database.schemas import GameDto, PlanetDto
+from database.schemas import GameDto, GameStatus, PlanetDto
 from game.config import game_config
 from keyboards import keyboards as kb
-from messages.renderer import MessageRenderer
+from messages.renderer import get_renderer
 from storage.clients.actions import ActionsClient
 from storage.clients.messages import MessagesClient
+from storage.schemas import Job
+
+logger = logging.getLogger(__name__)
+
+# checkpoints of a round: seconds since its start, job kind
+ROUND_CHECKPOINTS = (
+    (game_config.ROUND_LENGTH // 2, 'middle_5'),
+    (game_config.ROUND_LENGTH * 9 // 10, 'middle_9'),
+    (game_config.ROUND_LENGTH, 'end'),
+)
+
+# message of a middle checkpoint and the time left it tells
+MIDDLE_MESSAGES = {
+    'middle_5': ('half_time_passed', game_config.ROUND_LENGTH // 2),
+    'middle_9': ('hurry_up', game_config.ROUND_LENGTH // 10),
+}
+
+
+async def get_round_game(
+    job: Job, game_client: GameClient, session: AsyncSession
+) -> GameDto | None:
+    """
+    Returns the game of the job if the round the job was scheduled for is
+    still going on.
+    """
+    game = await game_client.get_game(session, job.game_id)
+    if (
+        game is None
+        or game.status != GameStatus.ROUND
+        or game.round != job.payload['round']
+    ):
+        logger.info(
+            'Skipping job %s of game %s: round %s is over',
+            job.kind,
+            job.game_id,
+            job.payload['round'],
+        )
+        return None
+    return game
 
 
 async def middle_handler(
+    job: Job,
     bot: Bot,
-    game: GameDto,
     game_client: GameClient,
-    message: dict[str, str | None],
     session: AsyncSession,
+    **kwargs,
 ):
+    game = await get_round_game(job, game_client, session)
+    if game is None:
+        return
+
+    key, seconds_left = MIDDLE_MESSAGES[job.kind]
+    message = get_renderer(job.payload['language']).render(
+        key, time=timedelta(seconds=seconds_left)
+    )
     active_players = await game_client.get_all_active_players(session, game.id)
     active_admins = await game_client.get_all_active_admins(session, game.id)
 
-    for user in active_admins + active_players:
-        await bot.send_message(user.tg_id, **message)
+    await broadcaster.broadcast(
+        bot,
+        (
+            SendMessage(chat_id=user.tg_id, **message)
+            for user in active_admins + active_players
+        ),
+    )
 
 
 async def end_handler(
+    job: Job,
     bot: Bot,
-    game: GameDto,
     game_client: GameClient,
     actions_client: ActionsClient,
     info_client: InfoClient,
     messages_client: MessagesClient,
     session: AsyncSession,
-    renderer: MessageRenderer,
+    **kwargs,
 ):
+    game = await get_round_game(job, game_client, session)
+    if game is None:
+        return
+
+    renderer = get_renderer(job.payload['language'])
+
     all_planets: list[PlanetDto] = await game_client.get_planets_of_game(
         session, game.id
     )
-    orders = {
-        planet.id: actions_client.get_order_info(planet.id) for planet in all_planets
-    }
-    for planet in all_planets:
-        actions_client.clear_order_info(planet.id)
+    orders, balances = await actions_client.snapshot_and_clear_game(
+        [planet.id for planet in all_planets]
+    )
 
-    for planet in all_planets:
-        current_money = actions_client.get_balance(planet.id, actions_client.MONEY_KEY)
-        current_meteorites = actions_client.get_balance(
-            planet.id, actions_client.METEORITES_KEY
+    # e.g. a recovered end job of a bot that was down longer than the TTL
+    expired = [planet.id for planet in all_planets if None in balances[planet.id]]
+    if expired and len(expired) == len(all_planets):
+        logger.error(
+            'State of round %s of game %s has expired, ending it with saved balances',
+            game.round,
+            game.id,
+        )
+    elif expired:
+        logger.warning(
+            'Balances of planets %s have expired, keeping saved ones', expired
         )
+
+    for planet in all_planets:
+        current_money, current_meteorites = balances[planet.id]
         await game_client.update_planet_balance(
-            session, planet.id, current_money, current_meteorites
+            session,
+            planet.id,
+            planet.balance if current_money is None else current_money,
+            planet.meteorites if current_meteorites is None else current_meteorites,
         )
-        actions_client.end_negotiations(planet.id)
 
     all_players = await game_client.get_all_active_players(session, game.id)
+    round_end_message = renderer.render('round_end_for_players', game=game)
+    requests = []
     for player in all_players:
-        messages = messages_client.find_all_messages(player.tg_id)
-        await bot.delete_messages(player.tg_id, messages)
-        messages_client.delete_all_messages(player.tg_id)
-        await bot.send_message(
-            player.tg_id,
-            **renderer.render(
-                'round_end_for_players',
-                game=game,
-            ),
-        )
+        messages = await messages_client.find_all_messages(player.tg_id)
+        requests.append(DeleteMessages(chat_id=player.tg_id, message_ids=messages))
+        requests.append(SendMessage(chat_id=player.tg_id, **round_end_message))
+    await broadcaster.broadcast(bot, requests)
+    for player in all_players:
+        await messages_client.delete_all_messages(player.tg_id)
 
     await game_client.end_current_round(session, game.id, orders)
     await game_client.save_round_info(session, game.id)
 
     all_admins = await game_client.get_all_active_admins(session, game.id)
-    for admin in all_admins:
-        await bot.send_message(
-            admin.tg_id,
-            **renderer.render(
-                'round_end_for_admin',
-                game=game,
-            ),
-            reply_markup=kb.round_stats_keyboard(game, admin),
-        )
+    await broadcaster.broadcast(
+        bot,
+        (
+            SendMessage(
+                chat_id=admin.tg_id,
+                **renderer.render(
+                    'round_end_for_admin',
+                    game=game,
+                ),
+                reply_markup=kb.round_stats_keyboard(game, admin),
+            )
+            for admin in all_admins
+        ),
+    )
 
     await session.commit()
     if game.round != game_config.ROUND_NUM:
-        await session.close()
         return
 
     all_cities = []
@@ -107,81 +180,47 @@ async def end_handler(
         game_orders_info,
     )
 
-    for admin in all_admins:
-        await bot.send_document(
-            admin.tg_id,
-            FSInputFile(
+    requests = [
+        SendDocument(
+            chat_id=admin.tg_id,
+            document=FSInputFile(
                 f'tmp/excel/game_{game.id}_results.xlsx', filename='Результаты игры.xlsx'
             ),
             caption=renderer.render('game_results')['text'],
             reply_markup=kb.start_keyboard(True),
         )
-
+        for admin in all_admins
+    ]
     for player in all_players:
-        await bot.send_message(
-            player.tg_id,
-            **renderer.render('end_of_the_game'),
+        requests.append(
+            SendMessage(chat_id=player.tg_id, **renderer.render('end_of_the_game'))
         )
-        await bot.send_message(
-            player.tg_id,
-            **renderer.render('goodbye'),
-            reply_markup=kb.start_keyboard(False)
+        requests.append(
+            SendMessage(
+                chat_id=player.tg_id,
+                **renderer.render('goodbye'),
+                reply_markup=kb.start_keyboard(False),
+            )
         )
+    await broadcaster.broadcast(bot, requests)
 
     await game_client.end_game(session, game.id)
     await session.commit()
 
 
-def get_round_notifier(
-    bot: Bot,
-    game: GameDto,
-    game_client: GameClient,
-    actions_client: ActionsClient,
-    info_client: InfoClient,
-    messages_client: MessagesClient,
-    session: AsyncSession,
-    renderer: MessageRenderer,
-) -> Notifier:
-    return Notifier(
-        checkpoints={
-            game_config.ROUND_LENGTH // 2: 'middle_5',
-            game_config.ROUND_LENGTH * 9 // 10: 'middle_9',
-            game_config.ROUND_LENGTH: 'end',
-        },
-        handlers={
-            'middle_5': middle_handler,
-            'middle_9': middle_handler,
-            'end': end_handler,
-        },
-        handler_args={
-            'middle_5': (
-                bot,
-                game,
-                game_client,
-                renderer.render(
-                    'half_time_passed',
-                    time=timedelta(seconds=game_config.ROUND_LENGTH // 2),
-                ),
-                session,
-            ),
-            'middle_9': (
-                bot,
-                game,
-                game_client,
-                renderer.render(
-                    'hurry_up', time=timedelta(seconds=game_config.ROUND_LENGTH // 10)
-                ),
-                session,
-            ),
-            'end': (
-                bot,
-                game,
-                game_client,
-                actions_client,
-                info_client,
-                messages_client,
-                session,
-                renderer,
-            ),
-        },
-    )
+def register_round_handlers(scheduler: Scheduler) -> None:
+    scheduler.register('middle_5', middle_handler)
+    scheduler.register('middle_9', middle_handler)
+    # a round must end even if the bot was down when its time ran out
+    scheduler.register('end', end_handler, recover=True)
+
+
+async def schedule_round(scheduler: Scheduler, game: GameDto, language: str) -> None:
+    payload = {'round': game.round, 'language': language}
+    for delay, kind in ROUND_CHECKPOINTS:
+        await scheduler.schedule(game.id, kind, delay, payload)
+
+
+async def cancel_round(scheduler: Scheduler, game_id: int) -> None:
+    # transfer timeouts are left to run: they release the players' states
+    await scheduler.cancel(game_id, [kind for _, kind in ROUND_CHECKPOINTS])
@@ -21,6 +21,27 @@ from storage.clients import (
 logger = logging.getLogger(__name__)
 
 
+class LazySession:
+    """
+    Stands in for the ``AsyncSession`` of an update. The session is created
+    when a handler first uses it, so updates answered from caches and Redis
+    don't open a session or check out a connection at all.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def used(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._session_factory()
+        return getattr(self._session, name)
+
+
 class DBMiddleware(BaseMiddleware):
     def __init__(
         self,
@@ -38,6 +59,8 @@ class DBMiddleware(BaseMiddleware):
         self.actions_client = redis_actions_client
         self.messages_client = redis_messages_client
         self.owner_id = int(bot_config.OWNER)
+        self.updates = 0
+        self.updates_without_db = 0
 
     async def __call__(
         self,
@@ -52,16 +75,30 @@ class DBMiddleware(BaseMiddleware):
         data['info_client'] = self.info_client
         data['owner_id'] = self.owner_id
 
-        async with self.session_factory() as session:
-            data['session'] = session
-            try:
-                result = await handler(event, data)
+        session = LazySession(self.session_factory)
+        data['session'] = session
+        self.updates += 1
+        try:
+            result = await handler(event, data)
+            if session.used:
                 await session.commit()
-                return result
-            except Exception as e: # noqa: BLE001
+            return result
+        except Exception as e: # noqa: BLE001
+            if session.used:
                 await session.rollback()
-                logger.info(
-                    'Error occured while handling an event: %s\nTraceback: %s',
-                    e,
-                    traceback.format_exc(),
-                )
+            logger.info(
+                'Error occured while handling an event: %s\nTraceback: %s',
+                e,
+                traceback.format_exc(),
+            )
+        finally:
+            if session.used:
+                await session.close()
+            else:
+                self.updates_without_db += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'updates': self.updates,
+            'updates_without_db': self.updates_without_db,
+        }
@@ -1,28 +1,29 @@
 from aiogram import BaseMiddleware
 
 from features.config import feature_config
-from messages.renderer import MessageRenderer
+from messages.renderer import get_renderer, get_templates
 
 
 class I18nMiddleware(BaseMiddleware):
+    """
+    Puts the language of the user and its renderer into ``data['language']``
+    and ``data['renderer']`` for the handlers and the middlewares after it.
+    """
+
     def __init__(self, default_language: str = 'ru'):
         self.default_language = default_language
-        self.message_renderers = {
-            'ru': MessageRenderer('ru'),
-            'en': MessageRenderer('en'),
-        }
 
-    async def __call__(self, handler, event, data):
+    def resolve_language(self, user) -> str:
         if not feature_config.I18N:
-            language = self.default_language
-            data['renderer'] = self.message_renderers[language]
-            return await handler(event, data)
-        
-        user = data.get('event_from_user')
-        language = self.default_language
+            return self.default_language
         if user and hasattr(user, 'language_code') and user.language_code:
             language = user.language_code.split('-')[0]
-            if language not in ('ru', 'en'):
-                language = self.default_language
-        data['renderer'] = self.message_renderers[language]
+            if language in get_templates():
+                return language
+        return self.default_language
+
+    async def __call__(self, handler, event, data):
+        language = self.resolve_language(data.get('event_from_user'))
+        data['language'] = language
+        data['renderer'] = get_renderer(language)
         return await handler(event, data)
@@ -7,19 +7,19 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Update
 from cachetools import TTLCache
 
-from features.config import feature_config
 from messages.renderer import MessageRenderer
 
 
 class ThrottleMiddleware(BaseMiddleware):
+    """
+    Drops callback queries of a user coming more often than once in
+    ``throttle`` seconds. Must be registered after ``I18nMiddleware``, the
+    warning is rendered with ``data['renderer']``.
+    """
+
     def __init__(self, throttle: float, cache_maxsize: int):
         self.throttle = throttle
         self.cache = TTLCache(maxsize=cache_maxsize, ttl=throttle)
-        self.message_renderers = {
-            'ru': MessageRenderer('ru'),
-            'en': MessageRenderer('en'),
-        }
-        self.default_language = 'ru'
 
     async def __call__(
         self,
@@ -34,21 +34,10 @@ class ThrottleMiddleware(BaseMiddleware):
         current_time = datetime.now(
             tz=ZoneInfo('Europe/Moscow'),
         )
-        renderer = self.message_renderers[self.default_language]
-        if (
-            hasattr(user, 'language_code')
-            and user.language_code
-            and feature_config.I18N
-        ):
-            language = user.language_code.split('-')[0]
-            renderer = self.message_renderers.get(
-                language,
-                self.default_language
-            )
-
         if user.id in self.cache:
             last_time: datetime = self.cache[user.id]
             if (current_time - last_time).total_seconds() < self.throttle:
+                renderer: MessageRenderer = data['renderer']
                 await event.callback_query.answer(
                     renderer.render('too_fast')['text'],
                     show_alert=False,
@@ -1,7 +1,5 @@
 from pathlib import Path
 
-import pandas as pd
-
 from database.schemas import CityDto, PlanetDto
 from game.schemas import ORDER_TYPE_TRANSLATIONS, OrderInfo, OrderType
 
@@ -12,6 +10,8 @@ def make_pivot_table(
     cities: list[CityDto],
     order_info: list[dict[int, OrderInfo]],
 ) -> bool:
+    import pandas as pd
+
     wrapped_path = Path(path)
     wrapped_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -0,0 +1,177 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable, Collection
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from storage.clients.jobs import JobStore
+from storage.schemas import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[None]]
+
+
+class Scheduler:
+    """
+    Runs checkpoints of games kept in a persistent ``JobStore``, one
+    scheduler serves every game of the process.
+
+    A handler of a job kind is called as ``handler(job, session=..., **context)``
+    with a session of its own opened for the job. On start jobs that are
+    overdue by more than ``misfire_grace`` seconds are dropped, unless their
+    kind was registered with ``recover=True``: such jobs (e.g. the end of a
+    round) are run at once.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        session_factory: async_sessionmaker[AsyncSession],
+        poll_interval: float = 1,
+        misfire_grace: float = 30,
+        drift_warning: float = 1,
+        **context: Any,
+    ):
+        self.store = store
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.misfire_grace = misfire_grace
+        self.drift_warning = drift_warning
+        self.context = context
+        self.handlers: dict[str, JobHandler] = {}
+        self.recoverable: set[str] = set()
+
+        self._loop_task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+        self.run = 0
+        self.failed = 0
+        self.recovered = 0
+        self.dropped = 0
+        self.max_drift = 0.0
+        self._total_drift = 0.0
+
+    def register(self, kind: str, handler: JobHandler, recover: bool = False) -> None:
+        self.handlers[kind] = handler
+        if recover:
+            self.recoverable.add(kind)
+
+    async def schedule(
+        self,
+        game_id: int,
+        kind: str,
+        delay: float,
+        payload: dict[str, Any] | None = None,
+    ) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f'No handler for job kind: {kind}')
+
+        job = Job(
+            game_id=game_id,
+            kind=kind,
+            run_at=time.time() + delay,
+            payload=payload or {},
+        )
+        await self.store.add(job)
+        self._wakeup.set()
+        return job
+
+    async def cancel(self, game_id: int, kinds: Collection[str] | None = None) -> int:
+        return await self.store.delete_game(game_id, kinds)
+
+    async def start(self) -> None:
+        if self._loop_task is not None:
+            return
+        await self._recover()
+        self._loop_task = asyncio.create_task(self._run_loop())
+
+    async def close(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        # claimed jobs are no longer in the store, let them finish
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _recover(self) -> None:
+        for job in await self.store.get_due(time.time() - self.misfire_grace):
+            if job.kind in self.recoverable:
+                self.recovered += 1
+                logger.warning(
+                    'Recovering job %s of game %s overdue by %.1f s',
+                    job.kind,
+                    job.game_id,
+                    time.time() - job.run_at,
+                )
+            elif await self.store.claim(job):
+                self.dropped += 1
+                logger.warning(
+                    'Dropping job %s of game %s overdue by %.1f s',
+                    job.kind,
+                    job.game_id,
+                    time.time() - job.run_at,
+                )
+
+    async def _run_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._run_due()
+                next_run_at = await self.store.next_run_at()
+            except Exception:
+                logger.exception('Failed to poll scheduled jobs')
+                next_run_at = None
+
+            timeout = self.poll_interval
+            if next_run_at is not None:
+                timeout = min(max(next_run_at - time.time(), 0), timeout)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+    async def _run_due(self) -> None:
+        for job in await self.store.get_due(time.time()):
+            if not await self.store.claim(job):
+                continue
+            task = asyncio.create_task(self._run_job(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_job(self, job: Job) -> None:
+        drift = max(time.time() - job.run_at, 0)
+        self.run += 1
+        self._total_drift += drift
+        self.max_drift = max(self.max_drift, drift)
+        if drift > self.drift_warning:
+            logger.warning(
+                'Job %s of game %s started %.2f s late', job.kind, job.game_id, drift
+            )
+
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            self.failed += 1
+            logger.error('No handler for job %s of game %s', job.kind, job.game_id)
+            return
+
+        async with self.session_factory() as session:
+            try:
+                await handler(job, session=session, **self.context)
+                await session.commit()
+            except Exception:
+                self.failed += 1
+                await session.rollback()
+                logger.exception('Job %s of game %s failed', job.kind, job.game_id)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'run': self.run,
+            'failed': self.failed,
+            'recovered': self.recovered,
+            'dropped': self.dropped,
+            'mean_drift': self._total_drift / self.run if self.run else 0.0,
+            'max_drift': self.max_drift,
+        }
@@ -1,14 +1,15 @@
 from collections.abc import Awaitable, Callable
-from typing import ParamSpec
+from typing import Any, ParamSpec
 
 from aiogram import Bot, types
+from aiogram.methods import SendMessage
 
 from database.schemas import CityDto, GameDto, PlanetDto
 from game.schemas import FAILURE_INTERPRETATIONS, FailureReason, OrderInfo, OrderType
 from keyboards import keyboards as kb
 from messages.renderer import MessageRenderer
 from storage.clients.messages import MessagesClient
-from storage.schemas import MessageType
+from storage.schemas import INFO_MESSAGE_TYPES
 
 Markup = (
     types.InlineKeyboardMarkup
@@ -37,22 +38,6 @@ async def method_executor_call[**P](
     return True
 
 
-async def sync_method_executor_call[**P](
-    method: Callable[P, FailureReason],
-    call: types.CallbackQuery,
-    renderer: MessageRenderer,
-    *args: P.args,
-) -> bool:
-    result = method(*args)
-    if result != FailureReason.SUCCESS:
-        await call.answer(
-            renderer.render(FAILURE_INTERPRETATIONS[result])['text'], True
-        )
-        return False
-    await call.answer()
-    return True
-
-
 async def method_executor_msg[**P](
     bot: Bot,
     method: Callable[P, Awaitable[FailureReason]],
@@ -72,107 +57,134 @@ async def method_executor_msg[**P](
     return True
 
 
-async def send_all_info(
-    bot: Bot,
+def make_all_info(
     game: GameDto,
     planets_and_cities: dict[int, tuple[PlanetDto, list[CityDto]]],
     planet_id: int,
     order_info: OrderInfo,
     user_id: int,
-    messages_client: MessagesClient,
     sanctioned_planets: list[PlanetDto],
     renderer: MessageRenderer,
-):
+) -> list[SendMessage]:
+    """
+    Returns the round dashboard of a player: the round announcement followed
+    by messages of ``INFO_MESSAGE_TYPES`` in that order.
+    """
     planet, planet_cities = planets_and_cities.pop(planet_id)
     planet_cities.sort(key=lambda city: city.name)
     other_planets = [val[0] for val in planets_and_cities.values()]
-    await bot.send_message(
-        user_id,
-        **renderer.render(
-            'start_round_for_players',
-            game=game,
-        ),
-    )
-    city_msg = await bot.send_message(
-        user_id,
-        **renderer.render(
-            'common_planet_info',
-            planet=planet,
-            cities=planet_cities,
-        ),
-        reply_markup=kb.city_keyboard(
-            game.round,
-            planet,
-            planet_cities,
-            order_info.get(OrderType.SHIELD, []),
-            order_info.get(OrderType.DEVELOP, []),
-        ),
-    )
-    messages_client.set_info_message_id(user_id, MessageType.CITY, city_msg.message_id)
-
     ikm = (
         kb.invent_meteorites_keyboard(planet, order_info.get(OrderType.INVENT, False))
         if not planet.is_invented
         else kb.meteorites_keyboard(planet, order_info.get(OrderType.CREATE, 0))
     )
-    meteorites_msg = await bot.send_message(
-        user_id,
-        **renderer.render(
-            'meteorites_info',
-            planet=planet,
-        ),
-        reply_markup=ikm,
-    )
-    messages_client.set_info_message_id(
-        user_id, MessageType.METEORITES, meteorites_msg.message_id
-    )
-
     sanctioned_planets_names = [planet.name for planet in sanctioned_planets]
-    sanctions_msg = await bot.send_message(
-        user_id,
-        **renderer.render(
-            'sanctions_info',
-            sanctioned_planets=sanctioned_planets_names,
-        ),
-        reply_markup=kb.sanctions_keyboard(
-            planet, other_planets, order_info.get(OrderType.SANCTIONS, [])
-        ),
-    )
-    messages_client.set_info_message_id(
-        user_id, MessageType.SANCTIONS, sanctions_msg.message_id
-    )
-
-    eco_msg = await bot.send_message(
-        user_id,
-        **renderer.render(
-            'eco_info',
-            game=game,
-        ),
-        reply_markup=kb.eco_keyboard(planet, order_info.get(OrderType.ECO, False)),
-    )
-    messages_client.set_info_message_id(user_id, MessageType.ECO, eco_msg.message_id)
-
     first_planet_id = min(planets_and_cities.keys())
     first_planet, first_planet_cities = planets_and_cities[first_planet_id]
 
-    msg = await bot.send_message(
-        user_id,
-        **renderer.render(
-            'other_planet_info',
-            planet=first_planet,
-            cities=first_planet_cities,
+    return [
+        SendMessage(
+            chat_id=user_id,
+            **renderer.render(
+                'start_round_for_players',
+                game=game,
+            ),
         ),
-        reply_markup=kb.other_planets_keyboard(
-            game.round,
-            planet,
-            first_planet,
-            first_planet_cities,
-            order_info.get(OrderType.ATTACK, []),
-            list(planets_and_cities.keys()),
+        SendMessage(
+            chat_id=user_id,
+            **renderer.render(
+                'common_planet_info',
+                planet=planet,
+                cities=planet_cities,
+            ),
+            reply_markup=kb.city_keyboard(
+                game.round,
+                planet,
+                planet_cities,
+                order_info.get(OrderType.SHIELD, []),
+                order_info.get(OrderType.DEVELOP, []),
+            ),
         ),
-    )
-    messages_client.set_info_message_id(
+        SendMessage(
+            chat_id=user_id,
+            **renderer.render(
+                'meteorites_info',
+                planet=planet,
+            ),
+            reply_markup=ikm,
+        ),
+        SendMessage(
+            chat_id=user_id,
+            **renderer.render(
+                'sanctions_info',
+                sanctioned_planets=sanctioned_planets_names,
+            ),
+            reply_markup=kb.sanctions_keyboard(
+                planet, other_planets, order_info.get(OrderType.SANCTIONS, [])
+            ),
+        ),
+        SendMessage(
+            chat_id=user_id,
+            **renderer.render(
+                'eco_info',
+                game=game,
+            ),
+            reply_markup=kb.eco_keyboard(planet, order_info.get(OrderType.ECO, False)),
+        ),
+        SendMessage(
+            chat_id=user_id,
+            **renderer.render(
+                'other_planet_info',
+                planet=first_planet,
+                cities=first_planet_cities,
+            ),
+            reply_markup=kb.other_planets_keyboard(
+                game.round,
+                planet,
+                first_planet,
+                first_planet_cities,
+                order_info.get(OrderType.ATTACK, []),
+                list(planets_and_cities.keys()),
+            ),
+        ),
+    ]
+
+
+async def save_info_messages(
+    messages_client: MessagesClient,
+    user_id: int,
+    results: list[Any],
+) -> None:
+    """
+    Remembers ids of the sent dashboard made by ``make_all_info``. Messages
+    that weren't delivered are skipped.
+    """
+    for message_type, result in zip(INFO_MESSAGE_TYPES, results[1:]):
+        if isinstance(result, types.Message):
+            await messages_client.set_info_message_id(
+                user_id, message_type, result.message_id
+            )
+
+
+async def send_all_info(
+    bot: Bot,
+    game: GameDto,
+    planets_and_cities: dict[int, tuple[PlanetDto, list[CityDto]]],
+    planet_id: int,
+    order_info: OrderInfo,
+    user_id: int,
+    messages_client: MessagesClient,
+    sanctioned_planets: list[PlanetDto],
+    renderer: MessageRenderer,
+):
+    requests = make_all_info(
+        game,
+        planets_and_cities,
+        planet_id,
+        order_info,
         user_id,
-        MessageType.ATTACK,
-        msg.message_id,
+        sanctioned_planets,
+        renderer,
     )
+    results = [await bot(request) for request in requests]
+    await save_info_messages(messages_client, user_id, results)
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import secrets
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = b'x-telegram-bot-api-secret-token'
+STATS_PATH = '/stats'
+
+
+@dataclass
+class PipelineStats:
+    received: int = 0
+    # updates not queued in ``enqueue_timeout``, Telegram sends them again
+    rejected: int = 0
+    processed: int = 0
+    failed: int = 0
+    max_depth: int = 0
+    enqueue_wait: float = 0
+    max_enqueue_wait: float = 0
+    processing_time: float = 0
+    max_processing_time: float = 0
+
+    @property
+    def mean_enqueue_wait(self) -> float:
+        queued = self.received - self.rejected
+        return self.enqueue_wait / queued if queued else 0
+
+    @property
+    def mean_processing_time(self) -> float:
+        return self.processing_time / self.processed if self.processed else 0
+
+
+class UpdatePipeline:
+    """
+    Feeds updates received by the webhook to the dispatcher from ``workers``
+    tasks. Updates are sharded by chat, so updates of one chat are handled
+    one by one in the order they came. Queues of all workers hold at most
+    ``queue_size`` updates: when the queue of a worker is full ``put`` waits
+    up to ``enqueue_timeout`` seconds for room and then gives up. ``close``
+    waits up to ``shutdown_timeout`` seconds for the queued updates.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        workers: int = 8,
+        queue_size: int = 1000,
+        enqueue_timeout: float = 5,
+        shutdown_timeout: float = 30,
+    ):
+        self.dp = dp
+        self.bot = bot
+        self.enqueue_timeout = enqueue_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.queues: list[asyncio.Queue[Update]] = [
+            asyncio.Queue(maxsize=max(queue_size // workers, 1)) for _ in range(workers)
+        ]
+        self.stats = PipelineStats()
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self.queues)
+
+    def _shard(self, update: Update) -> int:
+        context = UserContextMiddleware.resolve_event_context(update)
+        if context.chat_id is not None:
+            key = context.chat_id
+        elif context.user_id is not None:
+            key = context.user_id
+        else:
+            key = update.update_id
+        return key % len(self.queues)
+
+    async def put(self, update: Update) -> bool:
+        """
+        Queues the update, returns False if there was no room for it.
+        """
+        self.stats.received += 1
+        queue = self.queues[self._shard(update)]
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.enqueue_timeout):
+                await queue.put(update)
+        except TimeoutError:
+            self.stats.rejected += 1
+            logger.warning('Update %s rejected: queue is full', update.update_id)
+            return False
+
+        waited = time.perf_counter() - started
+        self.stats.enqueue_wait += waited
+        self.stats.max_enqueue_wait = max(self.stats.max_enqueue_wait, waited)
+        self.stats.max_depth = max(self.stats.max_depth, self.depth)
+        return True
+
+    async def start(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work(queue)) for queue in self.queues
+            ]
+
+    async def close(self) -> None:
+        """
+        Handles the queued updates and stops the workers. Updates still
+        queued after ``shutdown_timeout`` are dropped, so that a hung
+        handler can't block the shutdown.
+        """
+        try:
+            async with asyncio.timeout(self.shutdown_timeout):
+                await asyncio.gather(*(queue.join() for queue in self.queues))
+        except TimeoutError:
+            logger.warning(
+                'Stopping the webhook workers with %d updates left', self.depth
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self, queue: asyncio.Queue[Update]) -> None:
+        while True:
+            update = await queue.get()
+            started = time.perf_counter()
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception:
+                self.stats.failed += 1
+                logger.exception('Failed to handle update %s', update.update_id)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.stats.processed += 1
+                self.stats.processing_time += elapsed
+                self.stats.max_processing_time = max(
+                    self.stats.max_processing_time, elapsed
+                )
+                queue.task_done()
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            'workers': len(self.queues),
+            'depth': self.depth,
+            **asdict(self.stats),
+            'mean_enqueue_wait': self.stats.mean_enqueue_wait,
+            'mean_processing_time': self.stats.mean_processing_time,
+        }
+
+
+class WebhookApp:
+    """
+    ASGI application receiving updates from Telegram at ``path`` and
+    serving pipeline statistics at ``/stats``. Both check ``secret_token``
+    when it's set. ``on_startup`` and
+    ``on_shutdown`` are awaited on the lifespan events of the server.
+
+    An update is answered with 200 once it's queued and with 503 if the
+    queue had no room for it, so that Telegram sends it again later.
+    """
+
+    def __init__(
+        self,
+        pipeline: UpdatePipeline,
+        path: str,
+        secret_token: str | None = None,
+        on_startup: Callable[[], Awaitable[None]] | None = None,
+        on_shutdown: Callable[[], Awaitable[None]] | None = None,
+    ):
+        self.pipeline = pipeline
+        self.path = path
+        self.secret_token = secret_token
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+
+    async def __call__(
+        self,
+        scope: dict[str, Any],
+        receive: Callable[[], Awaitable[dict[str, Any]]],
+        send: Callable[[dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            status, body = await self._handle(scope, receive)
+            await send(
+                {
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(b'content-type', b'application/json')],
+                }
+            )
+            await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    if self.on_startup is not None:
+                        await self.on_startup()
+                    await self.pipeline.start()
+                except Exception as e:
+                    logger.exception('Failed to start the webhook')
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.pipeline.close()
+                if self.on_shutdown is not None:
+                    await self.on_shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _is_authorized(self, scope: dict[str, Any]) -> bool:
+        if not self.secret_token:
+            return True
+        token = dict(scope['headers']).get(SECRET_TOKEN_HEADER, b'')
+        return secrets.compare_digest(token, self.secret_token.encode())
+
+    async def _handle(self, scope, receive) -> tuple[int, bytes]:
+        if scope['path'] == STATS_PATH and scope['method'] == 'GET':
+            if not self._is_authorized(scope):
+                return 401, b'{}'
+            return 200, json.dumps(self.pipeline.get_stats()).encode()
+        if scope['path'] != self.path:
+            return 404, b'{}'
+        if scope['method'] != 'POST':
+            return 405, b'{}'
+        if not self._is_authorized(scope):
+            return 401, b'{}'
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        try:
+            update = Update.model_validate_json(
+                body, context={'bot': self.pipeline.bot}
+            )
+        except ValidationError:
+            return 400, b'{}'
+
+        if not await self.pipeline.put(update):
+            return 503, b'{}'
+        return 200, b'{}'
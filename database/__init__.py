@@ -1,9 +1,11 @@
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from database.config import database_config
+from database.pool import MonitoredQueuePool
 
 engine = create_async_engine(
     url=database_config.database_url,
+    poolclass=MonitoredQueuePool,
     pool_size=database_config.POOL_SIZE,
     pool_timeout=database_config.POOL_TIMEOUT,
 )
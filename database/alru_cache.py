@@ -1,15 +1,102 @@
-from collections.abc import Awaitable, Callable
+import asyncio
+import inspect
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import asdict, dataclass
 from typing import Concatenate, ParamSpec, TypeVar
 
-from asyncache import cached
 from cachetools import LRUCache, TTLCache, keys
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from database.invalidation import InvalidationBus, Message
+
 ParamsType = ParamSpec('ParamsType')
 InstanceType = TypeVar('InstanceType')
 ReturnType = TypeVar('ReturnType')
 SelfType = TypeVar('SelfType')
 
+TagFunction = Callable[..., Hashable | Awaitable[Hashable]]
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # misses that awaited a load started by another caller
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    loads: int = 0
+    load_time: float = 0
+    max_load_time: float = 0
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses + self.coalesced
+        return self.hits / requests if requests else 0
+
+    @property
+    def mean_load_time(self) -> float:
+        return self.load_time / self.loads if self.loads else 0
+
+
+class _CountingLRUCache(LRUCache):
+    def __init__(
+        self,
+        maxsize: int,
+        stats: CacheStats,
+        on_remove: Callable[[Hashable], None],
+    ):
+        super().__init__(maxsize)
+        self.stats = stats
+        self.on_remove = on_remove
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.on_remove(key)
+
+    def popitem(self):
+        item = super().popitem()
+        self.stats.evictions += 1
+        return item
+
+
+class _CountingTTLCache(TTLCache):
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stats: CacheStats,
+        on_remove: Callable[[Hashable], None],
+    ):
+        super().__init__(maxsize, ttl)
+        self.stats = stats
+        self.on_remove = on_remove
+
+    def __delitem__(self, key):
+        try:
+            super().__delitem__(key)
+        finally:
+            # an expired entry is removed and then reported as missing
+            self.on_remove(key)
+
+    def popitem(self):
+        item = super().popitem()
+        self.stats.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        # removes entries bypassing __delitem__
+        expired = super().expire(time)
+        self.stats.expirations += len(expired)
+        for key, _ in expired:
+            self.on_remove(key)
+        return expired
+
+
+# all cached functions by qualified name, e.g. 'UserClient.is_user_admin'
+registry: dict[str, AlruDBCacheWrapper] = {}
+_bus = InvalidationBus()
+
 
 class _AlruDBCacheWrapper[InstanceType, ParamsType, ReturnType]:
     def __init__(
@@ -26,9 +113,7 @@ class _AlruDBCacheWrapper[InstanceType, ParamsType, ReturnType]:
         *args: ParamsType.args,
         **kwargs: ParamsType.kwargs,
     ) -> ReturnType:
-        return await self._wrapper._cached_fn(
-            self._instance, session, *args, **kwargs
-        )
+        return await self._wrapper.call(self._instance, session, *args, **kwargs)
 
     def cache_invalidate(
         self,
@@ -37,6 +122,9 @@ class _AlruDBCacheWrapper[InstanceType, ParamsType, ReturnType]:
     ):
         self._wrapper.cache_invalidate(self._instance, *args, **kwargs)
 
+    def invalidate_tag(self, tag: Hashable):
+        self._wrapper.invalidate_tag(tag)
+
     def cache_clear(self):
         return self._wrapper.cache_clear()
 
@@ -46,14 +134,24 @@ class AlruDBCacheWrapper[ParamsType, ReturnType]:
         self,
         fn: Callable[Concatenate[InstanceType, AsyncSession, ParamsType], Awaitable[ReturnType]],
         maxsize: int = 128,
-        ttl: float | None = None
+        ttl: float | None = None,
+        tag: TagFunction | None = None,
     ):
+        self.stats = CacheStats()
         if ttl is None:
-            self.cacher = LRUCache(maxsize)
+            self.cacher = _CountingLRUCache(maxsize, self.stats, self._forget_key)
         else:
-            self.cacher = TTLCache(maxsize, ttl)
+            self.cacher = _CountingTTLCache(
+                maxsize, ttl, self.stats, self._forget_key
+            )
         self.fn = fn
-        self._cached_fn = cached(self.cacher, self._get_key)(self.fn)
+        self.name = fn.__qualname__
+        self.tag = tag
+        self._signature = inspect.signature(fn)
+        self._tagged_keys: dict[Hashable, set[Hashable]] = {}
+        self._key_tags: dict[Hashable, Hashable] = {}
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        registry[self.name] = self
 
     def _get_key(
         self,
@@ -64,6 +162,115 @@ class AlruDBCacheWrapper[ParamsType, ReturnType]:
     ):
         return keys.hashkey(instance, *args, **kwargs)
 
+    async def _get_tag(
+        self,
+        result: ReturnType,
+        instance: InstanceType,
+        session: AsyncSession,
+        *args: ParamsType.args,
+        **kwargs: ParamsType.kwargs,
+    ) -> Hashable:
+        """
+        Calls the tag function with the result and the arguments of the call
+        passed by name, so it can pick whatever identifies the entry.
+        """
+        bound = self._signature.bind(instance, session, *args, **kwargs)
+        bound.apply_defaults()
+        _, _, *arguments = bound.arguments.items()
+        tag = self.tag(instance, session, result, **dict(arguments))
+        if inspect.isawaitable(tag):
+            tag = await tag
+        return tag
+
+    async def _load(
+        self,
+        key: Hashable,
+        instance: InstanceType,
+        session: AsyncSession,
+        *args: ParamsType.args,
+        **kwargs: ParamsType.kwargs,
+    ) -> ReturnType:
+        started = time.perf_counter()
+        result = await self.fn(instance, session, *args, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.stats.loads += 1
+        self.stats.load_time += elapsed
+        self.stats.max_load_time = max(self.stats.max_load_time, elapsed)
+        tag = None
+        if self.tag is not None:
+            tag = await self._get_tag(result, instance, session, *args, **kwargs)
+        # storing may expire a stale entry of the same key, tag it afterwards
+        self.cacher[key] = result
+        if tag is not None and key in self.cacher:
+            self._tagged_keys.setdefault(tag, set()).add(key)
+            self._key_tags[key] = tag
+        return result
+
+    def _forget_key(self, key: Hashable) -> None:
+        """
+        Drops the tag of an entry that left the cache for any reason.
+        """
+        tag = self._key_tags.pop(key, None)
+        if tag is None:
+            return
+        tagged_keys = self._tagged_keys.get(tag)
+        if tagged_keys is not None:
+            tagged_keys.discard(key)
+            if not tagged_keys:
+                del self._tagged_keys[tag]
+
+    async def call(
+        self,
+        instance: InstanceType,
+        session: AsyncSession,
+        *args: ParamsType.args,
+        **kwargs: ParamsType.kwargs,
+    ) -> ReturnType:
+        """
+        Returns the cached result or loads it. Concurrent misses of one key
+        share a single load: the first caller queries the database and the
+        rest await its result or its exception.
+        """
+        key = self._get_key(instance, session, *args, **kwargs)
+        while True:
+            try:
+                result = self.cacher[key]
+            except KeyError:
+                pass
+            else:
+                self.stats.hits += 1
+                return result
+
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # the loading caller was cancelled, retry the load ourselves
+                if not future.cancelled():
+                    raise
+
+        self.stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._load(key, instance, session, *args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # waiters re-raise it, don't log it as never retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
     def __get__(
         self, instance: InstanceType, objtype: type | None = None
     ) -> _AlruDBCacheWrapper[InstanceType, ParamsType, ReturnType]:
@@ -76,20 +283,106 @@ class AlruDBCacheWrapper[ParamsType, ReturnType]:
         **kwargs: ParamsType.kwargs,
     ):
         key = self._get_key(instance, None, *args, **kwargs)
-        if key in self.cacher:
-            del self.cacher[key]
+        self.cacher.pop(key, None)
+        _bus.publish(
+            {
+                'cache': self.name,
+                'action': 'invalidate',
+                'args': args,
+                'kwargs': kwargs,
+            }
+        )
+
+    def invalidate_tag(self, tag: Hashable):
+        """
+        Removes all entries tagged with ``tag``, other entries stay cached.
+        """
+        self._invalidate_tag(tag)
+        _bus.publish({'cache': self.name, 'action': 'tag', 'tag': tag})
 
     def cache_clear(self):
+        self._cache_clear()
+        _bus.publish({'cache': self.name, 'action': 'clear'})
+
+    def _invalidate_args(self, args: tuple, kwargs: dict):
+        """
+        Removes entries of every instance called with these arguments.
+        """
+        suffix = tuple(keys.hashkey(*args, **kwargs))
+        for key in [key for key in self.cacher if tuple(key)[1:] == suffix]:
+            self.cacher.pop(key, None)
+
+    def _invalidate_tag(self, tag: Hashable):
+        for key in self._tagged_keys.pop(tag, ()):
+            self.cacher.pop(key, None)
+
+    def _cache_clear(self):
         self.cacher.clear()
+        self._tagged_keys.clear()
+        self._key_tags.clear()
+
+    def apply(self, message: Message):
+        match message['action']:
+            case 'invalidate':
+                self._invalidate_args(tuple(message['args']), message['kwargs'])
+            case 'tag':
+                self._invalidate_tag(message['tag'])
+            case 'clear':
+                self._cache_clear()
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            **asdict(self.stats),
+            'hit_rate': self.stats.hit_rate,
+            'mean_load_time': self.stats.mean_load_time,
+            'size': len(self.cacher),
+            'maxsize': self.cacher.maxsize,
+        }
+
+
+def get_cache_stats() -> dict[str, dict[str, float]]:
+    """
+    Returns counters of every cached function by its qualified name.
+    """
+    return {name: wrapper.get_stats() for name, wrapper in sorted(registry.items())}
+
+
+def apply_invalidation(message: Message) -> None:
+    """
+    Applies an invalidation received from another process.
+    """
+    if message['cache'] is None:
+        for wrapper in registry.values():
+            wrapper.apply(message)
+    elif message['cache'] in registry:
+        registry[message['cache']].apply(message)
+
+
+def set_invalidation_bus(bus: InvalidationBus) -> None:
+    """
+    Makes every cache publish its invalidations to ``bus`` and apply the
+    ones received from it.
+    """
+    global _bus
+    bus.subscribe(apply_invalidation)
+    _bus = bus
 
 
 def alru_cache(
     maxsize: int = 128,
-    ttl: float | None = None
+    ttl: float | None = None,
+    tag: TagFunction | None = None,
 ):
+    """
+    Caches results of an async ``DatabaseClient`` method ignoring the session.
+
+    ``tag`` is called as ``tag(instance, session, result, **arguments)`` after
+    a miss and may return an awaitable; entries with the same tag can be
+    dropped together with ``invalidate_tag``.
+    """
     def wrapper(
         fn: Callable[Concatenate[InstanceType, AsyncSession, ParamsType], Awaitable[ReturnType]]
     ) -> AlruDBCacheWrapper[ParamsType, ReturnType]:
-        return AlruDBCacheWrapper(fn, maxsize, ttl)
+        return AlruDBCacheWrapper(fn, maxsize, ttl, tag)
 
     return wrapper
@@ -23,8 +23,34 @@ from database.schemas import (
 logger = logging.getLogger(__name__)
 
 
+def _tag_by_game_id(client, s, result, game_id, **kwargs) -> int:
+    return game_id
+
+
+def _tag_by_game(client, s, game: GameDto | None, **kwargs) -> int | None:
+    return game.id if game else None
+
+
+def _tag_by_planet(client, s, planet: PlanetDto | None, **kwargs) -> int | None:
+    return planet.game_id if planet else None
+
+
+async def _tag_by_planet_id(
+    client: DatabaseClient, s: AsyncSession, result, planet_id: int, **kwargs
+) -> int | None:
+    return _tag_by_game(client, s, await client.get_game_by_planet_id(s, planet_id))
+
+
+async def _tag_by_city(
+    client: DatabaseClient, s: AsyncSession, city: CityDto | None, **kwargs
+) -> int | None:
+    if city is None:
+        return None
+    return await _tag_by_planet_id(client, s, city, city.planet_id)
+
+
 class DatabaseClient:
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_game_id)
     async def get_game(self, s: AsyncSession, game_id: int) -> GameDto | None:
         game = await s.get(Game, game_id)
         if game:
@@ -32,7 +58,7 @@ class DatabaseClient:
 
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_game)
     async def get_game_by_planet_id(
         self, s: AsyncSession, planet_id: int
     ) -> GameDto | None:
@@ -49,7 +75,7 @@ class DatabaseClient:
 
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_game)
     async def get_game_by_city_id(
         self, s: AsyncSession, city_id: int
     ) -> GameDto | None:
@@ -67,7 +93,7 @@ class DatabaseClient:
 
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_city)
     async def get_city(
         self, s: AsyncSession, city_id: int, load_rate: bool = False
     ) -> CityDto | None:
@@ -81,7 +107,7 @@ class DatabaseClient:
             return CityDto.model_validate(city)
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_planet)
     async def get_planet(
         self,
         s: AsyncSession,
@@ -100,7 +126,7 @@ class DatabaseClient:
             return PlanetDto.model_validate(planet)
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_planet)
     async def get_planet_by_city_id(
         self, s: AsyncSession, city_id: int
     ) -> PlanetDto | None:
@@ -114,7 +140,7 @@ class DatabaseClient:
             return PlanetDto.model_validate(planet)
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_game_id)
     async def get_player_planet(
         self,
         s: AsyncSession,
@@ -135,7 +161,7 @@ class DatabaseClient:
             return PlanetDto.model_validate(planet)
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_planet_id)
     async def get_cities_of_planet(
         self,
         s: AsyncSession,
@@ -157,7 +183,7 @@ class DatabaseClient:
             return TypeAdapter(list[CityDto]).validate_python(result.scalars().all())
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_game_id)
     async def get_planets_of_game(
         self,
         s: AsyncSession,
@@ -181,7 +207,7 @@ class DatabaseClient:
             return TypeAdapter(list[PlanetDto]).validate_python(planets)
         return None
 
-    @alru_cache(ttl=database_config.EXPIRE_CACHE)
+    @alru_cache(ttl=database_config.EXPIRE_CACHE, tag=_tag_by_game_id)
     async def get_all_planets_and_cities(
         self, s: AsyncSession, game_id: int
     ) -> dict[int, tuple[PlanetDto, list[CityDto]]]:
@@ -205,17 +231,20 @@ class DatabaseClient:
         return result
 
 
-    def _clear_game_cache(self) -> None:
-        self.get_game.cache_clear()
-        self.get_game_by_planet_id.cache_clear()
-        self.get_game_by_city_id.cache_clear()
-        self.get_city.cache_clear()
-        self.get_planet.cache_clear()
-        self.get_planet_by_city_id.cache_clear()
-        self.get_player_planet.cache_clear()
-        self.get_cities_of_planet.cache_clear()
-        self.get_planets_of_game.cache_clear()
-        self.get_all_planets_and_cities.cache_clear()
+    def _clear_game_cache(self, game_id: int) -> None:
+        """
+        Drops cached games, planets and cities of one game only.
+        """
+        self.get_game.invalidate_tag(game_id)
+        self.get_game_by_planet_id.invalidate_tag(game_id)
+        self.get_game_by_city_id.invalidate_tag(game_id)
+        self.get_city.invalidate_tag(game_id)
+        self.get_planet.invalidate_tag(game_id)
+        self.get_planet_by_city_id.invalidate_tag(game_id)
+        self.get_player_planet.invalidate_tag(game_id)
+        self.get_cities_of_planet.invalidate_tag(game_id)
+        self.get_planets_of_game.invalidate_tag(game_id)
+        self.get_all_planets_and_cities.invalidate_tag(game_id)
 
 
     async def get_all_sanctions_on_planet(
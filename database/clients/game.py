@@ -2,7 +2,20 @@ import logging
 from collections import Counter
 
 from pydantic import TypeAdapter
-from sqlalchemy import func, insert, not_, select, update
+from sqlalchemy import (
+    Integer,
+    Numeric,
+    Subquery,
+    and_,
+    case,
+    cast,
+    func,
+    insert,
+    not_,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.base_client import DatabaseClient
@@ -50,22 +63,31 @@ class GameClient(DatabaseClient):
     async def create_game(
         self, s: AsyncSession, admin_id: int, pack: Pack, number_of_planets: int = -1
     ) -> GameDto:
+        """
+        Creates the game with the first ``number_of_planets`` planets of the
+        pack. Planets and cities are inserted with one multi-row statement
+        each, whatever the size of the pack.
+        """
         if number_of_planets == -1:
             number_of_planets = len(pack.planets)
         number_of_planets = min(number_of_planets, len(pack.planets))
         game = Game(num_planets=number_of_planets)
         s.add(game)
         await s.flush()
-        for i, _planet in enumerate(pack.planets):
-            if i == number_of_planets:
-                break
-            planet = Planet(name=_planet.name, game_id=game.id)
-            s.add(planet)
-            await s.flush()
-            for _city in _planet.cities:
-                city = City(name=_city.name, planet_id=planet.id)
-                s.add(city)
-            await s.flush()
+
+        pack_planets = pack.planets[:number_of_planets]
+        if pack_planets:
+            planet_ids = await s.scalars(
+                insert(Planet).returning(Planet.id, sort_by_parameter_order=True),
+                [{'name': planet.name, 'game_id': game.id} for planet in pack_planets],
+            )
+            cities = [
+                {'name': city.name, 'planet_id': planet_id}
+                for planet_id, planet in zip(planet_ids.all(), pack_planets)
+                for city in planet.cities
+            ]
+            if cities:
+                await s.execute(insert(City), cities)
 
         stmt = update(Admin).where(Admin.tg_id == admin_id).values(game_id=game.id)
         await s.execute(stmt)
@@ -83,7 +105,7 @@ class GameClient(DatabaseClient):
             update(Game).where(Game.id == game_id).values(status=GameStatus.ENDED)
         )
 
-        self._clear_game_cache()
+        self._clear_game_cache(game_id)
 
     async def get_all_active_players(
         self, s: AsyncSession, game_id: int
@@ -100,83 +122,7 @@ class GameClient(DatabaseClient):
         return TypeAdapter(list[AdminDto]).validate_python(admins)
 
 
-    async def build_shield_for_cities(self, s: AsyncSession, *city_ids: int) -> None:
-        if len(city_ids) == 0:
-            return
-        stmt = update(City).where(City.id.in_(city_ids)).values(is_shielded=True)
-        await s.execute(stmt)
-
-    async def develop_cities(self, s: AsyncSession, *city_ids: int) -> None:
-        if len(city_ids) == 0:
-            return
-        stmt = (
-            update(City)
-            .where(City.id.in_(city_ids))
-            .values(
-                {City.development: City.development + game_config.DEVELOPMENT_BOOST}
-            )
-        )
-        await s.execute(stmt)
-
-    async def invent_for_planets(self, s: AsyncSession, *planet_ids: int) -> None:
-        if len(planet_ids) == 0:
-            return
-        stmt = update(Planet).where(Planet.id.in_(planet_ids)).values(is_invented=True)
-        await s.execute(stmt)
-
-    async def create_meteorites(self, s: AsyncSession, planet_id: int, n: int) -> None:
-        if n == 0:
-            return
-        planet = await s.get(Planet, planet_id)
-        planet.meteorites += n
-
-    async def attack_cities(self, s: AsyncSession, *city_ids: int) -> None:
-        if len(city_ids) == 0:
-            return
-        counter = Counter(city_ids)
-        once_attacked = set()
-
-        twice_attacked = set()
-        for city_id in counter:
-            if counter[city_id] == 1:
-                once_attacked.add(city_id)
-            else:
-                twice_attacked.add(city_id)
-        logger.debug(once_attacked)
-        logger.debug(twice_attacked)
-
-        stmt_for_twice = (
-            update(City)
-            .where(City.id.in_(twice_attacked))
-            .values(development=0, is_shielded=False)
-        )
-        logger.debug(stmt_for_twice)
-        stmt_for_once_shielded = (
-            update(City)
-            .where(City.id.in_(once_attacked), City.is_shielded)
-            .values(is_shielded=False)
-        )
-        logger.debug(stmt_for_once_shielded)
-        stmt_for_once_not_shielded = (
-            update(City)
-            .where(City.id.in_(once_attacked), not_(City.is_shielded))
-            .values(development=0)
-        )
-        logger.debug(stmt_for_once_not_shielded)
-
-        if twice_attacked:
-            await s.execute(stmt_for_twice)
-
-        if once_attacked:
-            await s.execute(stmt_for_once_not_shielded)
-            await s.execute(stmt_for_once_shielded)
-
-    async def eco_update(
-        self,
-        s: AsyncSession,
-        game_id: int,
-        orders: dict[int, OrderInfo],
-    ) -> None:
+    def _eco_delta(self, orders: dict[int, OrderInfo]) -> int:
         invent_count = 0
         buy_count = 0
         attack_count = 0
@@ -186,22 +132,15 @@ class GameClient(DatabaseClient):
             eco_boost_count += int(orders[planet_id].get(OrderType.ECO, 0))
             buy_count += orders[planet_id].get(OrderType.CREATE, 0)
             attack_count += len(orders[planet_id].get(OrderType.ATTACK, []))
-        delta = (
+        return (
             game_config.INVENTION_ECO_IMPACT * invent_count
             + game_config.CREATION_ECO_IMPACT * buy_count
             + game_config.ATTACK_ECO_IMPACT * attack_count
             + game_config.ECO_BOOST_RATE * eco_boost_count
         )
-        if delta == 0:
-            return
-        stmt = (
-            update(Game)
-            .where(Game.id == game_id)
-            .values(
-                {Game.ecorate: func.greatest(func.least(100, Game.ecorate + delta), 0)}
-            )
-        )
-        await s.execute(stmt)
+
+    def _updated_ecorate(self, delta: int):
+        return func.greatest(func.least(100, Game.ecorate + delta), 0)
 
     async def send_sanctions(
         self, s: AsyncSession, sanctions: list[SanctionDto]
@@ -293,89 +232,186 @@ class GameClient(DatabaseClient):
                     )
 
 
+    def _round_income(self, planet_ids: list[int]) -> Subquery:
+        """
+        Income of the given planets computed for all of them at once. Same as
+        ``Planet.income``, but with grouped joins instead of four correlated
+        subqueries per planet.
+        """
+        cities_income = (
+            select(
+                City.planet_id,
+                func.sum(
+                    cast(
+                        game_config.INCOME_COEFFICIENT
+                        * cast(Game.ecorate * City.development / 100, Numeric(10, 1)),
+                        Integer,
+                    )
+                ).label('income'),
+            )
+            .join(Planet, Planet.id == City.planet_id)
+            .join(Game, Game.id == Planet.game_id)
+            .where(City.planet_id.in_(planet_ids))
+            .group_by(City.planet_id)
+            .subquery()
+        )
+        sanctions = (
+            select(
+                Sanction.planet_to.label('planet_id'),
+                func.count(Sanction.planet_from).label('number'),
+            )
+            .join(Planet, Planet.id == Sanction.planet_to)
+            .join(Game, Game.id == Planet.game_id)
+            .where(
+                Sanction.planet_to.in_(planet_ids),
+                Sanction.num_round == Game.round - 1,
+            )
+            .group_by(Sanction.planet_to)
+            .subquery()
+        )
+        num_sanctions = func.coalesce(sanctions.c.number, 0)
+
+        return (
+            select(
+                Planet.id.label('planet_id'),
+                cast(
+                    func.coalesce(cities_income.c.income, 0)
+                    * (
+                        1
+                        - game_config.SANCTIONS_IMPACT
+                        * num_sanctions
+                        / Game.num_planets
+                    ),
+                    Integer,
+                ).label('income'),
+            )
+            .join(Game, Game.id == Planet.game_id)
+            .outerjoin(cities_income, cities_income.c.planet_id == Planet.id)
+            .outerjoin(sanctions, sanctions.c.planet_id == Planet.id)
+            .where(Planet.id.in_(planet_ids))
+            .subquery()
+        )
+
+    async def _resolve_planets(
+        self, s: AsyncSession, orders: dict[int, OrderInfo]
+    ) -> None:
+        """
+        Adds income, created meteorites and inventions to all planets with
+        one statement.
+        """
+        income = self._round_income(list(orders))
+        created = {
+            planet_id: order_info[OrderType.CREATE]
+            for planet_id, order_info in orders.items()
+            if order_info.get(OrderType.CREATE, 0)
+        }
+        invented = [
+            planet_id
+            for planet_id, order_info in orders.items()
+            if order_info.get(OrderType.INVENT, False)
+        ]
+
+        values = {Planet.balance: Planet.balance + income.c.income}
+        if created:
+            values[Planet.meteorites] = Planet.meteorites + case(
+                created, value=Planet.id, else_=0
+            )
+        if invented:
+            values[Planet.is_invented] = or_(
+                Planet.is_invented, Planet.id.in_(invented)
+            )
+        await s.execute(
+            update(Planet).where(Planet.id == income.c.planet_id).values(values)
+        )
+
+    async def _resolve_cities(
+        self, s: AsyncSession, orders: dict[int, OrderInfo]
+    ) -> None:
+        """
+        Applies shields, development and attacks of the round to all cities
+        with one statement: shields are built and cities developed before
+        the attacks hit them.
+        """
+        shielded_ids = set()
+        developed_ids = set()
+        attacks = Counter()
+        for order_info in orders.values():
+            shielded_ids.update(order_info.get(OrderType.SHIELD, []))
+            developed_ids.update(order_info.get(OrderType.DEVELOP, []))
+            attacks.update(order_info.get(OrderType.ATTACK, []))
+
+        city_ids = shielded_ids | developed_ids | attacks.keys()
+        if not city_ids:
+            return
+
+        twice_attacked = [city_id for city_id, n in attacks.items() if n > 1]
+        is_shielded = or_(City.is_shielded, City.id.in_(shielded_ids))
+        is_attacked = City.id.in_(attacks.keys())
+        stmt = (
+            update(City)
+            .where(City.id.in_(city_ids))
+            .values(
+                {
+                    City.is_shielded: and_(is_shielded, not_(is_attacked)),
+                    City.development: case(
+                        (City.id.in_(twice_attacked), 0),
+                        (and_(is_attacked, not_(is_shielded)), 0),
+                        (
+                            City.id.in_(developed_ids),
+                            City.development + game_config.DEVELOPMENT_BOOST,
+                        ),
+                        else_=City.development,
+                    ),
+                }
+            )
+        )
+        await s.execute(stmt)
+
     async def end_current_round(
         self,
         s: AsyncSession,
         game_id: int,
         orders: dict[int, OrderInfo],
     ) -> FailureReason:
+        """
+        Resolves all orders of the round. The number of statements doesn't
+        depend on the number of planets: orders and sanctions are inserted
+        in bulk, planets, cities and the game are updated once each.
+        """
         game = await s.get(Game, game_id)
 
-        self._save_orders(s, game, orders)
-
         if not game:
             return FailureReason.OBJECT_NOT_FOUND
 
         if game.status != GameStatus.ROUND:
             return FailureReason.ROUND_IS_NOT_GOING
 
-        orders_by_action = {
-            action: []
-            for action in OrderType
-            if action not in [OrderType.ECO, OrderType.CREATE]
-        }
-
-        for planet_id in orders: # noqa: PLC0206
+        self._save_orders(s, game, orders)
 
-            await s.execute(
-                update(Planet)
-                .where(Planet.id == planet_id)
-                .values({Planet.balance: Planet.balance + Planet.income})
-            )
-            await self.create_meteorites(
-                s, planet_id, orders[planet_id].get(OrderType.CREATE, 0)
-            )
-            orders_by_action[OrderType.SANCTIONS].extend(
-                [
-                    SanctionDto(
-                        planet_from=planet_id,
-                        planet_to=other_planet_id,
-                        num_round=game.round,
-                    )
-                    for other_planet_id in orders[planet_id].get(
-                        OrderType.SANCTIONS, []
-                    )
-                ]
-            )
-            if orders[planet_id].get(OrderType.INVENT, False):
-                orders_by_action[OrderType.INVENT].append(planet_id)
-            for action in (OrderType.ATTACK, OrderType.DEVELOP, OrderType.SHIELD):
-                orders_by_action[action].extend(orders[planet_id].get(action, []))
-
-        action_by_priorities = (
-            OrderType.SHIELD,
-            OrderType.DEVELOP,
-            OrderType.INVENT,
-            OrderType.SANCTIONS,
-            OrderType.ATTACK,
+        if orders:
+            await self._resolve_planets(s, orders)
+            await self._resolve_cities(s, orders)
+
+        await self.send_sanctions(
+            s,
+            [
+                SanctionDto(
+                    planet_from=planet_id,
+                    planet_to=other_planet_id,
+                    num_round=game.round,
+                )
+                for planet_id, order_info in orders.items()
+                for other_planet_id in order_info.get(OrderType.SANCTIONS, [])
+            ],
         )
 
-        for action in action_by_priorities:
-            objs = orders_by_action[action]
-            match action:
-                case OrderType.DEVELOP:
-                    await self.develop_cities(s, *objs)
-                case OrderType.ATTACK:
-                    await self.attack_cities(s, *objs)
-                case OrderType.SHIELD:
-                    await self.build_shield_for_cities(s, *objs)
-                case OrderType.INVENT:
-                    await self.invent_for_planets(s, *objs)
-                case OrderType.SANCTIONS:
-                    await self.send_sanctions(s, objs)
-
-        await self.eco_update(s, game.id, orders)
-
-        await s.execute(
-            update(Game)
-            .where(Game.id == game_id)
-            .values(
-                {
-                    Game.status: GameStatus.MEETING,
-                }
-            ) 
-        )
-        self._clear_game_cache()
+        values = {Game.status: GameStatus.MEETING}
+        delta = self._eco_delta(orders)
+        if delta != 0:
+            values[Game.ecorate] = self._updated_ecorate(delta)
+        await s.execute(update(Game).where(Game.id == game_id).values(values))
+        self._clear_game_cache(game_id)
+        return FailureReason.SUCCESS
 
     async def save_round_info(self, s: AsyncSession, game_id: int) -> FailureReason:
         game = await s.get(Game, game_id)
@@ -420,7 +456,6 @@ class GameClient(DatabaseClient):
     async def start_new_round(
         self, s: AsyncSession, initiator_id: int
     ) -> FailureReason:
-        self._clear_game_cache()
         admin = await s.get(Admin, initiator_id)
         if admin is None:
             return FailureReason.OBJECT_NOT_FOUND
@@ -428,6 +463,8 @@ class GameClient(DatabaseClient):
         if admin.game_id is None:
             return FailureReason.STARTING_GAME_WITHOUT_BEING_IN
 
+        self._clear_game_cache(admin.game_id)
+
         game = await s.get(Game, admin.game_id)
         if game.status not in (GameStatus.WAITING, GameStatus.MEETING):
             return FailureReason.CANNOT_START_ROUND
@@ -469,3 +506,23 @@ class GameClient(DatabaseClient):
         )
         sanction_planets = sanctioned_planets_result.scalars().all()
         return TypeAdapter(list[PlanetDto]).validate_python(sanction_planets)
+
+    async def get_imposed_sanctions_of_game(
+        self, s: AsyncSession, game_id: int
+    ) -> dict[int, list[PlanetDto]]:
+        """
+        Returns planets that sanctioned each planet of the game in previous
+        round, by id of the sanctioned planet. Planets without sanctions are
+        left out.
+        """
+        result = await s.execute(
+            select(Sanction.planet_to, Planet)
+            .join(Planet, Sanction.planet_from == Planet.id)
+            .join(Game, Game.id == Planet.game_id)
+            .where(Game.id == game_id, Sanction.num_round == Game.round - 1)
+            .order_by(Sanction.planet_to, Planet.id)
+        )
+        sanctions: dict[int, list[PlanetDto]] = {}
+        for planet_to, planet in result.all():
+            sanctions.setdefault(planet_to, []).append(PlanetDto.model_validate(planet))
+        return sanctions
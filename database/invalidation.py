@@ -0,0 +1,70 @@
+"""
+Channel that propagates ``alru_cache`` invalidations between processes
+sharing the database (bot workers and the stats web app).
+
+A message is a JSON-serializable dict::
+
+    {'sender': ..., 'cache': 'UserClient.is_user_admin',
+     'action': 'invalidate' | 'tag' | 'clear', 'args': [...], 'kwargs': {...},
+     'tag': ...}
+
+``cache`` is ``None`` for ``clear`` of every cache.
+"""
+
+import logging
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, Any]
+MessageHandler = Callable[[Message], None]
+
+
+class InvalidationBus:
+    """
+    Bus of a single process: invalidations are applied locally only.
+    """
+
+    def __init__(self):
+        self.sender = uuid.uuid4().hex
+        self._handlers: list[MessageHandler] = []
+
+    def subscribe(self, handler: MessageHandler) -> None:
+        self._handlers.append(handler)
+
+    def publish(self, message: Message) -> None:
+        pass
+
+    def receive(self, message: Message) -> None:
+        """
+        Applies a message published by another process.
+        """
+        if message.get('sender') == self.sender:
+            return
+
+        for handler in self._handlers:
+            try:
+                handler(message)
+            except Exception:
+                logger.exception('Failed to apply invalidation %s', message)
+
+
+class InMemoryInvalidationBus(InvalidationBus):
+    """
+    Stand-in for tests: buses created with the same ``network`` list deliver
+    messages to each other as separate processes would.
+    """
+
+    def __init__(self, network: list[InMemoryInvalidationBus] | None = None):
+        super().__init__()
+        self.network = network if network is not None else []
+        self.network.append(self)
+        self.published: list[Message] = []
+
+    def publish(self, message: Message) -> None:
+        message = {'sender': self.sender, **message}
+        self.published.append(message)
+        for bus in self.network:
+            bus.receive(message)
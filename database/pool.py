@@ -0,0 +1,61 @@
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    # checkouts that gave up after POOL_TIMEOUT
+    timeouts: int = 0
+    peak_checked_out: int = 0
+    wait_time: float = 0
+    max_wait_time: float = 0
+
+    @property
+    def mean_wait_time(self) -> float:
+        return self.wait_time / self.checkouts if self.checkouts else 0
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool that counts checkouts, the peak number of connections
+    checked out at once and how long checkouts waited for a free connection.
+    """
+
+    def __init__(self, *args, stats: PoolStats | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats() if stats is None else stats
+
+    def recreate(self) -> MonitoredQueuePool:
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+
+        waited = time.perf_counter() - started
+        self.stats.checkouts += 1
+        self.stats.wait_time += waited
+        self.stats.max_wait_time = max(self.stats.max_wait_time, waited)
+        self.stats.peak_checked_out = max(
+            self.stats.peak_checked_out, self.checkedout()
+        )
+        return record
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            'size': self.size(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            **asdict(self.stats),
+            'mean_wait_time': self.stats.mean_wait_time,
+        }
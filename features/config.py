@@ -7,5 +7,6 @@ class FeatureConfig(BaseSettings):
     )
 
     I18N: bool = False
+    MEMOIZE_STATIC_MESSAGES: bool = False
 
 feature_config = FeatureConfig()
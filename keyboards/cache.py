@@ -0,0 +1,96 @@
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, NamedTuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from cachetools import LRUCache
+
+KEYBOARD_CACHE_MAXSIZE = 4096
+CHECK_MARK = '✅'
+
+
+class ToggleButton(NamedTuple):
+    """
+    A button in both of its states. ``group`` and ``item_id`` tell which set
+    of checked ids decides the state, buttons without a group never change.
+    """
+
+    unchecked: InlineKeyboardButton
+    checked: InlineKeyboardButton
+    group: str | None = None
+    item_id: int | None = None
+
+
+class KeyboardSkeleton(NamedTuple):
+    signature: Hashable
+    rows: list[list[ToggleButton]]
+
+
+def toggle_button(
+    text: str,
+    checked_text: str,
+    callback_data: str,
+    group: str,
+    item_id: int,
+) -> ToggleButton:
+    return ToggleButton(
+        InlineKeyboardButton(text=text, callback_data=callback_data),
+        InlineKeyboardButton(text=checked_text, callback_data=callback_data),
+        group,
+        item_id,
+    )
+
+
+def static_button(text: str, callback_data: str) -> ToggleButton:
+    button = InlineKeyboardButton(text=text, callback_data=callback_data)
+    return ToggleButton(button, button)
+
+
+def adjust(buttons: list[ToggleButton], width: int) -> list[list[ToggleButton]]:
+    return [buttons[i : i + width] for i in range(0, len(buttons), width)]
+
+
+class KeyboardCache:
+    """
+    Keeps button skeletons of keyboards, so that a press only picks the state
+    of every button. Skeletons are keyed by (game, planet, round, kind) and
+    are built again if the ``signature`` of their source data changes, e.g.
+    when a city is destroyed at the end of a round.
+    """
+
+    def __init__(self, maxsize: int = KEYBOARD_CACHE_MAXSIZE):
+        self.skeletons: LRUCache[Hashable, KeyboardSkeleton] = LRUCache(maxsize)
+
+    def get(
+        self,
+        key: tuple[int, int, int | None, Any],
+        signature: Hashable,
+        build: Callable[[], list[list[ToggleButton]]],
+    ) -> KeyboardSkeleton:
+        skeleton = self.skeletons.get(key)
+        if skeleton is None or skeleton.signature != signature:
+            skeleton = KeyboardSkeleton(signature, build())
+            self.skeletons[key] = skeleton
+        return skeleton
+
+    def clear(self) -> None:
+        self.skeletons.clear()
+
+
+def render_skeleton(
+    skeleton: KeyboardSkeleton, checked: dict[str, Iterable[int]]
+) -> InlineKeyboardMarkup:
+    checked_sets = {group: set(ids) for group, ids in checked.items()}
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                button.checked
+                if button.item_id in checked_sets.get(button.group, ())
+                else button.unchecked
+                for button in row
+            ]
+            for row in skeleton.rows
+        ]
+    )
+
+
+keyboard_cache = KeyboardCache()
@@ -10,9 +10,17 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from database.schemas import AdminDto, CityDto, GameDto, GameStatus, PlanetDto
 from game.config import game_config
+from keyboards.cache import (
+    CHECK_MARK,
+    ToggleButton,
+    adjust,
+    keyboard_cache,
+    render_skeleton,
+    static_button,
+    toggle_button,
+)
 from keyboards.schemas import Action, ActionType, get_action_data
-from packs.pack import packs
-from web_app.stats.middlewares.verifier import sign_user_id
+from packs.pack import get_packs
 
 WEB_APP_URL = os.getenv('WEB_APP_URL')
 
@@ -46,63 +54,91 @@ def city_keyboard(
     under_shield_ids: list[int],
     developed_ids: list[int],
 ) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
     cities.sort(key=lambda x: x.name)
-    for city in cities:
-        if city.development == 0:
-            continue
-        str1, str2 = '', ''
-        if city.id in developed_ids:
-            str1 = '✅'
-        if city.id in under_shield_ids:
-            str2 = '✅'
-        develop_action = Action(
-            action_type=ActionType.DEVELOP,
-            planet_id=planet.id,
-            argument=city.id,
-        )
-        shield_action = Action(
-            action_type=ActionType.SHIELD,
-            planet_id=planet.id,
-            argument=city.id,
-        )
-        builder.add(
-            InlineKeyboardButton(
-                text=f'{str1}📈 {city.name} ({game_config.DEVELOPMENT_COST} 💵)',
-                callback_data=get_action_data(develop_action),
-            ),
-        )
-        if nround > 1:
-            builder.add(
-                InlineKeyboardButton(
-                    text=f'{str2}🛡️ {city.name} ({game_config.SHIELD_COST} 💵)',
-                    callback_data=get_action_data(shield_action),
-                ),
+
+    def build() -> list[list[ToggleButton]]:
+        buttons = []
+        for city in cities:
+            if city.development == 0:
+                continue
+            develop_text = f'📈 {city.name} ({game_config.DEVELOPMENT_COST} 💵)'
+            buttons.append(
+                toggle_button(
+                    develop_text,
+                    CHECK_MARK + develop_text,
+                    get_action_data(
+                        Action(
+                            action_type=ActionType.DEVELOP,
+                            planet_id=planet.id,
+                            argument=city.id,
+                        )
+                    ),
+                    'developed',
+                    city.id,
+                )
             )
-    return builder.adjust(2).as_markup()
+            if nround > 1:
+                shield_text = f'🛡️ {city.name} ({game_config.SHIELD_COST} 💵)'
+                buttons.append(
+                    toggle_button(
+                        shield_text,
+                        CHECK_MARK + shield_text,
+                        get_action_data(
+                            Action(
+                                action_type=ActionType.SHIELD,
+                                planet_id=planet.id,
+                                argument=city.id,
+                            )
+                        ),
+                        'shielded',
+                        city.id,
+                    )
+                )
+        return adjust(buttons, 2)
+
+    skeleton = keyboard_cache.get(
+        (planet.game_id, planet.id, nround, 'cities'),
+        tuple((city.id, city.name, city.development == 0) for city in cities),
+        build,
+    )
+    return render_skeleton(
+        skeleton, {'developed': developed_ids, 'shielded': under_shield_ids}
+    )
 
 
 def sanctions_keyboard(
     planet: PlanetDto, other_planets: list[PlanetDto], under_sanctions_ids: list[int]
 ) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
     other_planets.sort(key=lambda x: x.name)
-    for other_planet in other_planets:
-        if planet.id == other_planet.id:
-            continue
-        addition = '✅ ' if other_planet.id in under_sanctions_ids else ''
-        sanctions_action = Action(
-            action_type=ActionType.SANCTIONS,
-            planet_id=planet.id,
-            argument=other_planet.id,
-        )
-        builder.add(
-            InlineKeyboardButton(
-                text=f'{addition}{other_planet.name}',
-                callback_data=get_action_data(sanctions_action),
+
+    def build() -> list[list[ToggleButton]]:
+        buttons = [
+            toggle_button(
+                other_planet.name,
+                f'{CHECK_MARK} {other_planet.name}',
+                get_action_data(
+                    Action(
+                        action_type=ActionType.SANCTIONS,
+                        planet_id=planet.id,
+                        argument=other_planet.id,
+                    )
+                ),
+                'sanctioned',
+                other_planet.id,
             )
-        )
-    return builder.adjust(2).as_markup()
+            for other_planet in other_planets
+            if other_planet.id != planet.id
+        ]
+        return adjust(buttons, 2)
+
+    # the planets of a game don't change, so the skeleton is the same in every
+    # round
+    skeleton = keyboard_cache.get(
+        (planet.game_id, planet.id, None, 'sanctions'),
+        tuple((other_planet.id, other_planet.name) for other_planet in other_planets),
+        build,
+    )
+    return render_skeleton(skeleton, {'sanctioned': under_sanctions_ids})
 
 
 def invent_meteorites_keyboard(planet: PlanetDto, chosen: bool) -> InlineKeyboardMarkup:
@@ -172,72 +208,73 @@ def other_planets_keyboard(
     attacked_cities_ids: list[int],
     other_planet_ids: list[int],
 ) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-
     other_cities.sort(key=lambda x: x.name)
     other_planet_ids.sort()
 
-    if nround > 1:
-        for city in other_cities:
-            if city.development == 0:
-                continue
-            add = '✅ ' if city.id in attacked_cities_ids else ''
-            attack_action = Action(
-                action_type=ActionType.ATTACK,
-                planet_id=planet.id,
-                argument=city.id,
-            )
-            builder.add(
-                InlineKeyboardButton(
-                    text=f'{add}🗡 {city.name}',
-                    callback_data=get_action_data(attack_action),
+    def build() -> list[list[ToggleButton]]:
+        buttons = []
+        if nround > 1:
+            for city in other_cities:
+                if city.development == 0:
+                    continue
+                buttons.append(
+                    toggle_button(
+                        f'🗡 {city.name}',
+                        f'{CHECK_MARK} 🗡 {city.name}',
+                        get_action_data(
+                            Action(
+                                action_type=ActionType.ATTACK,
+                                planet_id=planet.id,
+                                argument=city.id,
+                            )
+                        ),
+                        'attacked',
+                        city.id,
+                    )
                 )
+        negotiate_action = Action(
+            action_type=ActionType.NEGOTIATE,
+            planet_id=planet.id,
+            argument=other_planet.id,
+        )
+        transaction_action = Action(
+            action_type=ActionType.TRANSACTION,
+            planet_id=planet.id,
+            argument=other_planet.id,
+        )
+        buttons.append(
+            static_button('Переговоры 📞', get_action_data(negotiate_action))
+        )
+        buttons.append(
+            static_button('Перевод 💸', get_action_data(transaction_action))
+        )
+        rows = adjust(buttons, 2)
+
+        planet_index = other_planet_ids.index(other_planet.id)
+        if len(other_planet_ids) > 1:
+            previous_id = other_planet_ids[planet_index - 1]
+            next_id = other_planet_ids[(planet_index + 1) % len(other_planet_ids)]
+            rows.append(
+                [
+                    static_button(
+                        '⬅️', f'other_planet_info {planet.id} {previous_id}'
+                    ),
+                    static_button('➡️', f'other_planet_info {planet.id} {next_id}'),
+                ]
             )
-    negotiate_action = Action(
-        action_type=ActionType.NEGOTIATE,
-        planet_id=planet.id,
-        argument=other_planet.id,
-    )
-    transaction_action = Action(
-        action_type=ActionType.TRANSACTION,
-        planet_id=planet.id,
-        argument=other_planet.id,
-    )
-    builder.add(
-        InlineKeyboardButton(
-            text='Переговоры 📞',
-            callback_data=get_action_data(negotiate_action),
-        ),
-        InlineKeyboardButton(
-            text='Перевод 💸',
-            callback_data=get_action_data(transaction_action),
+        return rows
+
+    skeleton = keyboard_cache.get(
+        (planet.game_id, planet.id, nround, ('other_planet', other_planet.id)),
+        (
+            tuple(
+                (city.id, city.name, city.development == 0) for city in other_cities
+            ),
+            tuple(other_planet_ids),
         ),
+        build,
     )
-    builder.adjust(2)
-    planet_index = other_planet_ids.index(other_planet.id)
-
-    if len(other_planet_ids) > 1:
-        paginator = [
-            InlineKeyboardButton(
-                text='⬅️',
-                callback_data=(
-                    'other_planet_info '
-                    f'{planet.id} '
-                    f'{other_planet_ids[planet_index - 1]}'
-                )
-            ),
-            InlineKeyboardButton(
-                text='➡️',
-                callback_data=(
-                    'other_planet_info '
-                    f'{planet.id} '
-                    f'{other_planet_ids[(planet_index + 1) % len(other_planet_ids)]}'
-                ),
-            ),
-        ]
-        builder.row(*paginator)
-    return builder.as_markup()
-
+    return render_skeleton(skeleton, {'attacked': attacked_cities_ids})
 
 
 def negotiations_offer_keyboard(planet: PlanetDto, from_planet: PlanetDto):
@@ -324,7 +361,7 @@ def ingame_keyboard(isadmin: bool, game: GameDto | None = None):
 # Клавиатура выбора паков
 def pack_keyboard():
     builder = InlineKeyboardBuilder()
-    for pack in packs:
+    for pack in get_packs():
         builder.add(InlineKeyboardButton(text=pack.name, callback_data=pack.name))
     return builder.adjust(2).as_markup()
 
@@ -341,6 +378,9 @@ def request_keyboard(id: int):
 
 
 def round_stats_keyboard(game: GameDto, for_user: AdminDto) -> InlineKeyboardMarkup:
+    # django is only needed to sign the link, so it is imported on first use
+    from web_app.stats.middlewares.verifier import sign_user_id
+
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
@@ -24,7 +24,85 @@ class Action(BaseModel):
     argument: int | None = None
 
 
+# compact callback data: PREFIX, one char of the action type, the planet id
+# in base 36 and, if there is an argument, '.' and the argument in base 36
+ACTION_DATA_PREFIX = '~'
+ARGUMENT_SEPARATOR = '.'
+ACTION_TYPE_CODES: dict[ActionType, str] = {
+    ActionType.ATTACK: 'a',
+    ActionType.DEVELOP: 'd',
+    ActionType.SHIELD: 's',
+    ActionType.CREATE: 'c',
+    ActionType.ECO: 'e',
+    ActionType.SANCTIONS: 'x',
+    ActionType.INVENT: 'i',
+    ActionType.NEGOTIATE: 'n',
+    ActionType.TRANSACTION: 't',
+    ActionType.ACCEPT_NEGOTIATIONS: 'y',
+    ActionType.REFUSE_NEGOTIATIONS: 'r',
+    ActionType.END_NEGOTIATIONS: 'q',
+}
+ACTION_TYPES_BY_CODE = {code: type_ for type_, code in ACTION_TYPE_CODES.items()}
+BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def _to_base36(number: int) -> str:
+    if number < 0:
+        return '-' + _to_base36(-number)
+    digits = []
+    while True:
+        number, digit = divmod(number, 36)
+        digits.append(BASE36_DIGITS[digit])
+        if not number:
+            return ''.join(reversed(digits))
+
+
+def _from_base36(text: str) -> int | None:
+    # int() would also accept '+', '_' and whitespace
+    digits = text.removeprefix('-')
+    if not digits.isascii() or not digits.isalnum():
+        return None
+    return int(text, 36)
+
+
+def get_action_data(action: Action) -> str:
+    data = (
+        f'{ACTION_DATA_PREFIX}{ACTION_TYPE_CODES[action.action_type]}'
+        f'{_to_base36(action.planet_id)}'
+    )
+    if action.argument is not None:
+        data += ARGUMENT_SEPARATOR + _to_base36(action.argument)
+    return data
+
+
+def parse_action_data(action_data: str | None) -> Action | None:
+    """
+    Returns the action encoded in callback data or ``None`` if the data
+    doesn't encode an action. Data of keyboards sent before the compact
+    format was introduced is understood as well.
+    """
+    if not action_data:
+        return None
+    if not action_data.startswith(ACTION_DATA_PREFIX):
+        if validate_action(action_data):
+            return get_action_from_data(action_data)
+        return None
+
+    action_type = ACTION_TYPES_BY_CODE.get(action_data[1:2])
+    if action_type is None:
+        return None
+    planet_id, separator, argument = action_data[2:].partition(ARGUMENT_SEPARATOR)
+    planet_id = _from_base36(planet_id)
+    argument = _from_base36(argument) if separator else None
+    if planet_id is None or (separator and argument is None):
+        return None
+    return Action(action_type=action_type, planet_id=planet_id, argument=argument)
+
+
 def validate_action(action_data: str) -> bool:
+    """
+    Checks callback data in the legacy ``type:planet_id:argument`` format.
+    """
     try:
         action_type, planet_id, argument = action_data.split(':')
         int(planet_id)
@@ -35,10 +113,11 @@ def validate_action(action_data: str) -> bool:
     except Exception: # noqa: BLE001
         return False
 
-def get_action_data(action: Action) -> str:
-    return f'{action.action_type}:{action.planet_id}:{action.argument}'
 
 def get_action_from_data(action_data: str) -> Action:
+    """
+    Parses callback data in the legacy ``type:planet_id:argument`` format.
+    """
     action_type, planet_id, argument = action_data.split(':')
     return Action(
         action_type=action_type,
@@ -1,21 +1,35 @@
 import asyncio
 import logging
+import math
 import os
 import sys
+from collections.abc import Awaitable, Callable
 
-import django
 from aiogram import Bot, Dispatcher
 
+from app.broadcast import rate_limiter
+from app.coalescer import edit_coalescer
 from app.config import bot_config
 from app.handlers import ingame_router, lobby_router, main_page_router
+from app.handlers.ingame import TRANSACTION_TIMEOUT, expire_transaction
+from app.handlers.round_loop import register_round_handlers
 from app.middlewares import DBMiddleware, I18nMiddleware
 from app.middlewares.throttle import ThrottleMiddleware
+from app.scheduler import Scheduler
+from app.webhook import UpdatePipeline, WebhookApp
 from database import engine, session_factory
+from database.alru_cache import get_cache_stats, set_invalidation_bus
 from database.clients import GameClient, InfoClient, UserClient
 from database.models import ModelBase
 from game.config import game_config
-from storage import redis_client
-from storage.clients import ActionsClient, MessagesClient
+from storage import redis_client, redis_pool
+from storage.clients import (
+    ActionsClient,
+    HashActionsClient,
+    MessagesClient,
+    RedisInvalidationBus,
+    RedisJobStore,
+)
 from storage.config import redis_config
 
 logging.basicConfig(
@@ -26,17 +40,22 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# django is only used to sign links to the web app, its settings are loaded
+# on the first signing
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_app.app.settings')
-django.setup()
 
 
-async def main():
-    logger.info('Starting the bot...')
-    bot_token = bot_config.TOKEN
+def create_bot() -> Bot:
+    bot = Bot(token=bot_config.TOKEN)
+    bot.session.middleware(rate_limiter)
+    return bot
 
-    bot = Bot(token=bot_token)
-    dp = Dispatcher()
 
+async def setup(bot: Bot, dp: Dispatcher) -> Callable[[], Awaitable[None]]:
+    """
+    Prepares the storages, the scheduler and the dispatcher shared by polling
+    and webhook modes. Returns the coroutine function that releases them.
+    """
     logger.info('Creating database tables...')
     async with engine.begin() as conn:
         await conn.run_sync(ModelBase.metadata.create_all)
@@ -47,18 +66,56 @@ async def main():
             session, int(bot_config.OWNER), True
         )
 
+    logger.info('Subscribing to cache invalidations...')
+    invalidation_bus = RedisInvalidationBus(redis_client)
+    await invalidation_bus.start()
+    set_invalidation_bus(invalidation_bus)
+
+    logger.info('Loading Redis scripts...')
+    actions_client_class = (
+        HashActionsClient if redis_config.ORDERS_LAYOUT == 'hash' else ActionsClient
+    )
+    # the round starts only after its dashboards are sent, its balances
+    # must still be there when it ends
+    actions_ttl = max(
+        redis_config.EXPIRE_KEY_SECONDS,
+        game_config.ROUND_LENGTH
+        + math.ceil(bot_config.ROUND_START_DELIVERY_TIMEOUT)
+        + redis_config.EXPIRE_KEY_MARGIN_SECONDS,
+    )
+    actions_client = actions_client_class(redis_client, actions_ttl, game_config)
+    await actions_client.load_scripts()
+
+    messages_client = MessagesClient(redis_client, redis_config.EXPIRE_KEY_SECONDS)
+
+    logger.info('Starting the round scheduler...')
+    scheduler = Scheduler(
+        RedisJobStore(redis_client),
+        session_factory,
+        poll_interval=bot_config.SCHEDULER_POLL_INTERVAL,
+        misfire_grace=bot_config.SCHEDULER_MISFIRE_GRACE,
+        drift_warning=bot_config.SCHEDULER_DRIFT_WARNING,
+        bot=bot,
+        game_client=GameClient(),
+        actions_client=actions_client,
+        info_client=InfoClient(),
+        messages_client=messages_client,
+        fsm_storage=dp.storage,
+    )
+    register_round_handlers(scheduler)
+    scheduler.register(TRANSACTION_TIMEOUT, expire_transaction)
+    await scheduler.start()
+    dp['scheduler'] = scheduler
+    dp['db_engine'] = engine
+
     logger.info('Setting up dispatcher')
     db_middleware = DBMiddleware(
         psql_user_client=UserClient(),
         psql_game_client=GameClient(),
         psql_info_client=InfoClient(),
         session_factory=session_factory,
-        redis_actions_client=ActionsClient(
-            redis_client, redis_config.EXPIRE_KEY_SECONDS, game_config
-        ),
-        redis_messages_client=MessagesClient(
-            redis_client, redis_config.EXPIRE_KEY_SECONDS
-        ),
+        redis_actions_client=actions_client,
+        redis_messages_client=messages_client,
     )
     i18n_middleware = I18nMiddleware(default_language='ru')
     throttle_middleware = ThrottleMiddleware(
@@ -70,8 +127,77 @@ async def main():
     dp.update.outer_middleware(throttle_middleware)
     dp.include_routers(main_page_router, lobby_router, ingame_router)
 
+    async def shutdown() -> None:
+        logger.info('Cache statistics: %s', get_cache_stats())
+        logger.info('Edit statistics: %s', edit_coalescer.stats())
+        await scheduler.close()
+        logger.info('Scheduler statistics: %s', scheduler.stats())
+        logger.info('Database pool statistics: %s', engine.pool.get_stats())
+        logger.info('Database session statistics: %s', db_middleware.stats())
+        await invalidation_bus.close()
+        await redis_client.aclose()
+        await redis_pool.aclose()
+
+    return shutdown
+
+
+async def main():
+    logger.info('Starting the bot...')
+    bot = create_bot()
+    dp = Dispatcher()
+    shutdown = await setup(bot, dp)
+
     logger.info('Starting polling...')
-    await dp.start_polling(bot)
+    try:
+        await bot.delete_webhook()
+        await dp.start_polling(bot)
+    finally:
+        await shutdown()
+
+
+def create_webhook_app() -> WebhookApp:
+    """
+    Webhook mode, run with
+    ``uvicorn main:create_webhook_app --factory --host 0.0.0.0 --port 8000``.
+    Use one server process: updates of a chat are ordered and FSM states are
+    kept within a process.
+    """
+    bot = create_bot()
+    dp = Dispatcher()
+    pipeline = UpdatePipeline(
+        dp,
+        bot,
+        workers=bot_config.WEBHOOK_WORKERS,
+        queue_size=bot_config.WEBHOOK_QUEUE_SIZE,
+        enqueue_timeout=bot_config.WEBHOOK_ENQUEUE_TIMEOUT,
+        shutdown_timeout=bot_config.WEBHOOK_SHUTDOWN_TIMEOUT,
+    )
+    shutdown = None
+
+    async def on_startup() -> None:
+        nonlocal shutdown
+        logger.info('Starting the bot in webhook mode...')
+        shutdown = await setup(bot, dp)
+        if bot_config.WEBHOOK_URL:
+            await bot.set_webhook(
+                url=bot_config.WEBHOOK_URL + bot_config.WEBHOOK_PATH,
+                secret_token=bot_config.WEBHOOK_SECRET or None,
+                allowed_updates=dp.resolve_used_update_types(),
+            )
+
+    async def on_shutdown() -> None:
+        logger.info('Webhook statistics: %s', pipeline.get_stats())
+        if shutdown is not None:
+            await shutdown()
+        await bot.session.close()
+
+    return WebhookApp(
+        pipeline,
+        bot_config.WEBHOOK_PATH,
+        secret_token=bot_config.WEBHOOK_SECRET,
+        on_startup=on_startup,
+        on_shutdown=on_shutdown,
+    )
 
 
 if __name__ == '__main__':
@@ -1,11 +1,52 @@
+from __future__ import annotations
+
 from datetime import timedelta
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from inflect import engine
+    from pymorphy3 import MorphAnalyzer
+
+FILTER_CACHE_MAXSIZE = 1024
+
+
+# pymorphy3 loads its dictionaries and inflect takes long to import, so both
+# are created on the first render that needs them
+
+
+@cache
+def get_morph() -> MorphAnalyzer:
+    from pymorphy3 import MorphAnalyzer
+
+    return MorphAnalyzer()
+
 
-from inflect import engine
-from num2words import num2words
-from pymorphy3 import MorphAnalyzer
+@cache
+def get_inflect_engine() -> engine:
+    from inflect import engine
 
-morph = MorphAnalyzer()
-inflect_engine = engine()
+    return engine()
+
+
+@lru_cache(maxsize=FILTER_CACHE_MAXSIZE)
+def _agree_ru(word: str, number: int) -> str:
+    return get_morph().parse(word)[0].make_agree_with_number(number).word
+
+
+@lru_cache(maxsize=FILTER_CACHE_MAXSIZE)
+def _agree_en(word: str, number: int) -> str:
+    return get_inflect_engine().plural_noun(word, number)
+
+
+def agree_ru(word: str, number: int) -> str:
+    # the russian plural form depends on the last two digits only
+    return _agree_ru(word, number % 100)
+
+
+def agree_en(word: str, number: int) -> str:
+    # inflect only tells one from the others
+    return _agree_en(word, 1 if number == 1 else 2)
 
 
 def time_filter(value: timedelta, locale: str = 'en') -> str:
@@ -15,9 +56,9 @@ def time_filter(value: timedelta, locale: str = 'en') -> str:
     secs %= 60
 
     if locale == 'ru':
-        hours_word = morph.parse('час')[0].make_agree_with_number(hours).word
-        mins_word = morph.parse('минута')[0].make_agree_with_number(mins).word
-        secs_word = morph.parse('секунда')[0].make_agree_with_number(secs).word
+        hours_word = agree_ru('час', hours)
+        mins_word = agree_ru('минута', mins)
+        secs_word = agree_ru('секунда', secs)
     else:
         hours_word = 'hour' if hours == 1 else 'hours'
         mins_word = 'minute' if mins == 1 else 'minutes'
@@ -40,17 +81,18 @@ def escape_md(text: str) -> str:
     return text
 
 
+@lru_cache(maxsize=FILTER_CACHE_MAXSIZE)
 def ordinal(n: int, locale: str = 'en') -> str:
+    from num2words import num2words
+
     return num2words(n, to='ordinal', lang=locale)
 
 
 def make_agree_with(word: str, number: int, locale: str = 'en') -> str:
     if locale == 'ru':
-        parsed_word = morph.parse(word)[0]
-        agreed_word = parsed_word.make_agree_with_number(number)
-        return agreed_word.word
+        return agree_ru(word, number)
     else:
-        return inflect_engine.plural_noun(word, number)
+        return agree_en(word, number)
 
 
 def tag_person(id: int, name: str) -> str:
@@ -1,38 +1,88 @@
 import os
+from functools import cache
 
 import yaml
-from jinja2 import Environment
+from jinja2 import Environment, Template, meta
 from pydantic import TypeAdapter
 
+from features.config import feature_config
 from messages.filters import ALL_FILTERS
 from messages.schemas import Message
 
 TEMPLATES_DIR = 'messages/templates'
-TEMPLATES: dict[str, dict[str, Message]] = {}
 
-for template_file in os.listdir(TEMPLATES_DIR):
-    if template_file.endswith('.yml'):
-        with open(
-            os.path.join(TEMPLATES_DIR, template_file), 'r', encoding='utf-8'
-        ) as f:
-            messages_data = yaml.safe_load(f)
-            TEMPLATES[template_file[:-4]] = TypeAdapter(
-                dict[str, Message]
-            ).validate_python(messages_data)
+
+@cache
+def get_templates() -> dict[str, dict[str, Message]]:
+    """
+    Reads and validates the templates of all languages on the first call.
+    """
+    templates = {}
+    for template_file in os.listdir(TEMPLATES_DIR):
+        if template_file.endswith('.yml'):
+            with open(
+                os.path.join(TEMPLATES_DIR, template_file), 'r', encoding='utf-8'
+            ) as f:
+                messages_data = yaml.safe_load(f)
+                templates[template_file[:-4]] = TypeAdapter(
+                    dict[str, Message]
+                ).validate_python(messages_data)
+    return templates
 
 
 class MessageRenderer:
-    def __init__(self, language: str):
+    """
+    Renders messages of one language. Templates are compiled once when the
+    renderer is created. With ``memoize_static`` the output of messages that
+    take no parameters is rendered once as well.
+    """
+
+    def __init__(self, language: str, memoize_static: bool = False):
         self.language = language
+        self.memoize_static = memoize_static
         self.env = Environment()
         self.env.filters.update({f.__name__: f for f in ALL_FILTERS})
+        self.messages = get_templates().get(language, {})
+        self.templates: dict[str, Template] = {}
+        self.static_keys: set[str] = set()
+        for key, message in self.messages.items():
+            ast = self.env.parse(message.template)
+            self.templates[key] = self.env.from_string(ast)
+            if not meta.find_undeclared_variables(ast):
+                self.static_keys.add(key)
+        self._rendered: dict[str, dict[str, str | None]] = {}
 
     def render(self, key: str, **kwargs) -> dict[str, str | None]:
-        message = TEMPLATES.get(self.language, {}).get(key)
-        if not message:
+        template = self.templates.get(key)
+        if template is None:
             raise ValueError(f'Message not found for key: {key}')
-        template = self.env.from_string(message.template)
+        if self.memoize_static and key in self.static_keys:
+            rendered = self._rendered.get(key)
+            if rendered is None:
+                rendered = self._render(key, template)
+                self._rendered[key] = rendered
+            return dict(rendered)
+        return self._render(key, template, **kwargs)
+
+    def _render(
+        self, key: str, template: Template, **kwargs
+    ) -> dict[str, str | None]:
         return {
             'text': template.render(**kwargs),
-            'parse_mode': 'MarkdownV2' if message.markdown else None,
+            'parse_mode': 'MarkdownV2' if self.messages[key].markdown else None,
         }
+
+
+_renderers: dict[str, MessageRenderer] = {}
+
+
+def get_renderer(language: str) -> MessageRenderer:
+    """
+    Returns the renderer of ``language`` shared by the whole process, the
+    renderer is created on the first request.
+    """
+    renderer = _renderers.get(language)
+    if renderer is None:
+        renderer = MessageRenderer(language, feature_config.MEMOIZE_STATIC_MESSAGES)
+        _renderers[language] = renderer
+    return renderer
@@ -1,3 +1,5 @@
+from functools import cache
+
 from pydantic import BaseModel, TypeAdapter
 
 pack_file_path = './packs/packs.json'
@@ -17,7 +19,9 @@ class Pack(BaseModel):
     planets: list[PackPlanet]
 
 
-with open(pack_file_path, encoding='utf-8') as file:
-    _packs = file.read()
+@cache
+def get_packs() -> list[Pack]:
+    with open(pack_file_path, encoding='utf-8') as file:
+        _packs = file.read()
 
-packs = TypeAdapter(list[Pack]).validate_json(_packs)
+    return TypeAdapter(list[Pack]).validate_json(_packs)
@@ -1,10 +1,47 @@
-from redis import Redis
+from redis.asyncio import BlockingConnectionPool, Redis, UnixDomainSocketConnection
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.exceptions import ConnectionError
 
-from storage.config import redis_config
+from storage.config import RedisConfig, redis_config
 
-redis_client = Redis(
-    db=redis_config.DB,
-    host=redis_config.HOST,
-    port=redis_config.INNER_PORT,
-    password=redis_config.PASSWORD,
-)
+
+def create_redis_pool(config: RedisConfig) -> BlockingConnectionPool:
+    """
+    Creates the connection pool shared by all storage clients.
+
+    Commands wait at most POOL_TIMEOUT for a free connection and
+    SOCKET_TIMEOUT for a reply, so a slow Redis fails the update instead of
+    hanging the event loop. Only connection errors are retried with
+    exponential backoff: a command that timed out may have run already, and
+    the order scripts are not idempotent.
+    """
+    if config.UNIX_SOCKET_PATH:
+        address = {
+            'connection_class': UnixDomainSocketConnection,
+            'path': config.UNIX_SOCKET_PATH,
+        }
+    else:
+        address = {'host': config.HOST, 'port': config.INNER_PORT}
+
+    return BlockingConnectionPool(
+        max_connections=config.POOL_SIZE,
+        timeout=config.POOL_TIMEOUT,
+        db=config.DB,
+        password=config.PASSWORD,
+        socket_timeout=config.SOCKET_TIMEOUT,
+        socket_connect_timeout=config.SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=config.HEALTH_CHECK_INTERVAL,
+        retry=Retry(
+            ExponentialWithJitterBackoff(
+                cap=config.RETRY_BACKOFF_CAP, base=config.RETRY_BACKOFF_BASE
+            ),
+            config.RETRY_ATTEMPTS,
+            supported_errors=(ConnectionError,),
+        ),
+        **address,
+    )
+
+
+redis_pool = create_redis_pool(redis_config)
+redis_client = Redis(connection_pool=redis_pool)
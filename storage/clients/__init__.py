@@ -1,7 +1,15 @@
 from storage.clients.actions import ActionsClient
+from storage.clients.hash_actions import HashActionsClient
+from storage.clients.invalidation import RedisInvalidationBus
+from storage.clients.jobs import InMemoryJobStore, JobStore, RedisJobStore
 from storage.clients.messages import MessagesClient
 
 __all__ = (
     'ActionsClient',
+    'HashActionsClient',
+    'InMemoryJobStore',
+    'JobStore',
     'MessagesClient',
+    'RedisInvalidationBus',
+    'RedisJobStore',
 )
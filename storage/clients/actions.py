@@ -1,20 +1,108 @@
+from typing import Any, NamedTuple
 
-from redis import Redis
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
 
 from game.config import GameConfig
 from game.schemas import FailureReason, OrderInfo, OrderType
+from storage.clients import scripts
 from storage.clients.base import BaseClient
 
 
+class PlanetState(NamedTuple):
+    # None if the balance has expired
+    money: int | None
+    meteorites: int | None
+    created_meteorites: int
+    invented: bool
+    eco_boost: bool
+
+
 class ActionsClient(BaseClient):
     MONEY_KEY = 'money_balance'
     METEORITES_KEY = 'meteorites_balance'
 
+    SET_ORDERS = (
+        OrderType.SHIELD,
+        OrderType.DEVELOP,
+        OrderType.SANCTIONS,
+        OrderType.ATTACK,
+    )
+    SCALAR_ORDERS = (OrderType.CREATE, OrderType.INVENT, OrderType.ECO)
+    SCALAR_FIELDS = (MONEY_KEY, METEORITES_KEY, *SCALAR_ORDERS)
+    # number of commands queued by _queue_planet_snapshot for scalar values
+    SCALAR_COMMANDS = 1
+
     def __init__(self, client: Redis, ex: int, game_config: GameConfig):
         super().__init__(client, ex)
         self.game_config = game_config
+        self._toggle_member = client.register_script(scripts.TOGGLE_MEMBER)
+        self._toggle_flag = client.register_script(scripts.TOGGLE_FLAG)
+        self._set_amount = client.register_script(scripts.SET_AMOUNT)
+
+    async def load_scripts(self) -> None:
+        for script in (self._toggle_member, self._toggle_flag, self._set_amount):
+            script.sha = await self.client.script_load(script.script)
+
+    def _scalar_slot(self, name: str, planet_id: int) -> tuple[str, str, str]:
+        """
+        Returns the key, the hash field and the legacy key of a scalar value
+        in the form expected by the scripts.
+        """
+        key = self._create_name(name, planet_id)
+        return key, '', key
+
+    async def _get_scalar(self, name: str, planet_id: int) -> Any:
+        return await self.get(name, planet_id)
+
+    async def _set_scalar(self, value: Any, name: str, planet_id: int) -> None:
+        await self.set(value, name, planet_id)
+
+    @staticmethod
+    def _parse_state(values: list[Any]) -> PlanetState:
+        money, meteorites, created, invented, eco = values
+        return PlanetState(
+            money=None if money is None else int(money),
+            meteorites=None if meteorites is None else int(meteorites),
+            created_meteorites=int(created or 0),
+            invented=invented == b'1',
+            eco_boost=eco == b'1',
+        )
 
-    def _edit_planet_binary_relation(
+    async def get_planet_state(self, planet_id: int) -> PlanetState:
+        """
+        Returns balances and scalar orders of the planet in one round trip.
+        """
+        values = await self.client.mget(
+            [self._create_name(name, planet_id) for name in self.SCALAR_FIELDS]
+        )
+        return self._parse_state(values)
+
+    async def _apply_script(
+        self,
+        script: AsyncScript,
+        balance_key: str,
+        planet_id: int,
+        keys: list[str],
+        fields: list[str],
+        args: list[Any],
+    ) -> FailureReason:
+        balance, balance_field, legacy_balance = self._scalar_slot(
+            balance_key, planet_id
+        )
+        status, _, _ = await script(
+            keys=[balance, legacy_balance, *keys],
+            args=[balance_field, *fields, *args, self.ex or 0],
+        )
+        if int(status):
+            return FailureReason.SUCCESS
+
+        if balance_key == self.MONEY_KEY:
+            return FailureReason.NOT_ENOUGH_MONEY
+        return FailureReason.NOT_ENOUGH_METEORITES
+
+    async def _edit_planet_binary_relation(
         self,
         relation: OrderType,
         balance_key: str,
@@ -22,46 +110,40 @@ class ActionsClient(BaseClient):
         planet_id: int,
         other_id: int,
     ) -> FailureReason:
-        balance = self.get_balance(planet_id, balance_key)
-
-        if self.sismember(other_id, relation, planet_id):
-            self.set_balance(planet_id, balance + cost, balance_key)
-            self.sdel([other_id], relation, planet_id)
-        else:
-            result = self.set_balance(planet_id, balance - cost, balance_key)
-            if result != FailureReason.SUCCESS:
-                return result
-            self.sadd([other_id], relation, planet_id)
-
-        return FailureReason.SUCCESS
+        return await self._apply_script(
+            self._toggle_member,
+            balance_key,
+            planet_id,
+            keys=[self._create_name(relation, planet_id)],
+            fields=[],
+            args=[cost, other_id],
+        )
 
-    def _edit_planet_unary_relation(
+    async def _edit_planet_unary_relation(
         self,
         relation: OrderType,
         balance_key: str,
         cost: int,
         planet_id: int,
     ) -> FailureReason:
-        record = self.get(relation, planet_id)
-        balance = self.get_balance(planet_id, balance_key)
-        if record is not None and int(record):
-            result = self.set_balance(planet_id, balance + cost, balance_key)
-            self.delete(relation, planet_id)
-        else:
-            result = self.set_balance(planet_id, balance - cost, balance_key)
-            if result != FailureReason.SUCCESS:
-                return result
-            self.set(1, relation, planet_id)
-        return result
-
-    def _get_planet_binary_relation(
+        key, field, legacy_key = self._scalar_slot(relation, planet_id)
+        return await self._apply_script(
+            self._toggle_flag,
+            balance_key,
+            planet_id,
+            keys=[key, legacy_key],
+            fields=[field],
+            args=[cost],
+        )
+
+    async def _get_planet_binary_relation(
         self, relation: OrderType, planet_id: int
     ) -> list[int]:
-        members = self.smembers(relation, planet_id)
+        members = await self.smembers(relation, planet_id)
         return list(map(int, members))
 
-    def shield_city(self, planet_id: int, city_id: int) -> FailureReason:
-        return self._edit_planet_binary_relation(
+    async def shield_city(self, planet_id: int, city_id: int) -> FailureReason:
+        return await self._edit_planet_binary_relation(
             relation=OrderType.SHIELD,
             balance_key=self.MONEY_KEY,
             cost=self.game_config.SHIELD_COST,
@@ -69,11 +151,11 @@ class ActionsClient(BaseClient):
             other_id=city_id,
         )
 
-    def get_shielded_cities(self, planet_id: int) -> list[int]:
-        return self._get_planet_binary_relation(OrderType.SHIELD, planet_id)
+    async def get_shielded_cities(self, planet_id: int) -> list[int]:
+        return await self._get_planet_binary_relation(OrderType.SHIELD, planet_id)
 
-    def develop_city(self, planet_id: int, city_id: int) -> FailureReason:
-        return self._edit_planet_binary_relation(
+    async def develop_city(self, planet_id: int, city_id: int) -> FailureReason:
+        return await self._edit_planet_binary_relation(
             relation=OrderType.DEVELOP,
             balance_key=self.MONEY_KEY,
             cost=self.game_config.DEVELOPMENT_COST,
@@ -81,11 +163,11 @@ class ActionsClient(BaseClient):
             other_id=city_id,
         )
 
-    def get_developed_cities(self, planet_id: int) -> list[int]:
-        return self._get_planet_binary_relation(OrderType.DEVELOP, planet_id)
+    async def get_developed_cities(self, planet_id: int) -> list[int]:
+        return await self._get_planet_binary_relation(OrderType.DEVELOP, planet_id)
 
-    def attack_city(self, planet_id: int, city_id: int) -> FailureReason:
-        return self._edit_planet_binary_relation(
+    async def attack_city(self, planet_id: int, city_id: int) -> FailureReason:
+        return await self._edit_planet_binary_relation(
             relation=OrderType.ATTACK,
             balance_key=self.METEORITES_KEY,
             cost=self.game_config.ATTACK_COST,
@@ -93,11 +175,13 @@ class ActionsClient(BaseClient):
             other_id=city_id,
         )
 
-    def get_attacked_cities(self, planet_id: int) -> list[int]:
-        return self._get_planet_binary_relation(OrderType.ATTACK, planet_id)
+    async def get_attacked_cities(self, planet_id: int) -> list[int]:
+        return await self._get_planet_binary_relation(OrderType.ATTACK, planet_id)
 
-    def sanction_planet(self, planet_id: int, other_planet_id: int) -> FailureReason:
-        return self._edit_planet_binary_relation(
+    async def sanction_planet(
+        self, planet_id: int, other_planet_id: int
+    ) -> FailureReason:
+        return await self._edit_planet_binary_relation(
             relation=OrderType.SANCTIONS,
             balance_key=self.MONEY_KEY,
             cost=self.game_config.SANCTIONS_COST,
@@ -105,71 +189,67 @@ class ActionsClient(BaseClient):
             other_id=other_planet_id,
         )
 
-    def get_sanctioned_planets(self, planet_id: int) -> list[int]:
-        return self._get_planet_binary_relation(OrderType.SANCTIONS, planet_id)
-
-    def create_meteorites(self, planet_id: int, meteorites_num: int) -> FailureReason:
-        balance = self.get_balance(planet_id, self.MONEY_KEY)
-        chosen_meteorites = self.get(OrderType.CREATE, planet_id)
-        if chosen_meteorites:
-            chosen_meteorites = int(chosen_meteorites)
-        else:
-            chosen_meteorites = 0
-        result = self.set_balance(
-            planet_id,
-            balance
-            - (meteorites_num - chosen_meteorites) * self.game_config.CREATE_COST,
+    async def get_sanctioned_planets(self, planet_id: int) -> list[int]:
+        return await self._get_planet_binary_relation(OrderType.SANCTIONS, planet_id)
+
+    async def create_meteorites(
+        self, planet_id: int, meteorites_num: int
+    ) -> FailureReason:
+        key, field, legacy_key = self._scalar_slot(OrderType.CREATE, planet_id)
+        return await self._apply_script(
+            self._set_amount,
             self.MONEY_KEY,
+            planet_id,
+            keys=[key, legacy_key],
+            fields=[field],
+            args=[self.game_config.CREATE_COST, meteorites_num],
         )
-        if result != FailureReason.SUCCESS:
-            return result
-
-        self.set(meteorites_num, OrderType.CREATE, planet_id)
-        return result
 
-    def get_created_meteorites(self, planet_id: int) -> int:
-        result = self.get(OrderType.CREATE, planet_id)
+    async def get_created_meteorites(self, planet_id: int) -> int:
+        result = await self._get_scalar(OrderType.CREATE, planet_id)
         if result is None:
             return 0
 
         return int(result)
 
-    def invent(self, planet_id: int) -> FailureReason:
-        return self._edit_planet_unary_relation(
+    async def invent(self, planet_id: int) -> FailureReason:
+        return await self._edit_planet_unary_relation(
             OrderType.INVENT, self.MONEY_KEY, self.game_config.INVENTION_COST, planet_id
         )
 
-    def get_invented(self, planet_id: int) -> bool:
-        return self.get(OrderType.INVENT, planet_id) == b'1'
+    async def get_invented(self, planet_id: int) -> bool:
+        return await self._get_scalar(OrderType.INVENT, planet_id) == b'1'
 
-    def eco_boost(self, planet_id: int) -> FailureReason:
-        return self._edit_planet_unary_relation(
+    async def eco_boost(self, planet_id: int) -> FailureReason:
+        return await self._edit_planet_unary_relation(
             OrderType.ECO, self.METEORITES_KEY, self.game_config.ECO_COST, planet_id
         )
 
-    def get_eco_boost(self, planet_id: int) -> bool:
-        return self.get(OrderType.ECO, planet_id) == b'1'
+    async def get_eco_boost(self, planet_id: int) -> bool:
+        return await self._get_scalar(OrderType.ECO, planet_id) == b'1'
 
-    def make_negotiations(self, planet_from: int, planet_to: int) -> FailureReason:
-        if self.exists(OrderType.NEGOTIATE, planet_to):
+    async def make_negotiations(
+        self, planet_from: int, planet_to: int
+    ) -> FailureReason:
+        if await self.exists(OrderType.NEGOTIATE, planet_to):
             return FailureReason.ALREADY_NEGOTIATING
 
-        side_negotiator = self.get(OrderType.NEGOTIATE, planet_from)
+        side_negotiator = await self.get(OrderType.NEGOTIATE, planet_from)
         if side_negotiator is not None and int(side_negotiator) == planet_to:
             return FailureReason.BILATERAL_NEGOTIATIONS
 
-        self.set(planet_from, OrderType.NEGOTIATE, planet_to)
+        await self.set(planet_from, OrderType.NEGOTIATE, planet_to)
         return FailureReason.SUCCESS
 
-    def end_negotiations(self, planet_to: int) -> FailureReason:
-        self.delete(OrderType.NEGOTIATE, planet_to)
+    async def end_negotiations(self, planet_to: int) -> FailureReason:
+        await self.delete(OrderType.NEGOTIATE, planet_to)
         return FailureReason.SUCCESS
 
-    def get_balance(self, planet_id: int, balance_key: str) -> int:
-        balance = self.get(balance_key, planet_id)
+    async def get_balance(self, planet_id: int, balance_key: str) -> int:
+        balance = await self._get_scalar(balance_key, planet_id)
         return int(balance)
 
-    def set_balance(
+    async def set_balance(
         self, planet_id: int, balance: int, balance_key: str
     ) -> FailureReason:
         if balance < 0:
@@ -178,21 +258,71 @@ class ActionsClient(BaseClient):
             else:
                 return FailureReason.NOT_ENOUGH_METEORITES
 
-        self.set(balance, balance_key, planet_id)
+        await self._set_scalar(balance, balance_key, planet_id)
         return FailureReason.SUCCESS
 
-    def get_order_info(self, planet_id: int) -> OrderInfo:
+    async def get_order_info(self, planet_id: int) -> OrderInfo:
         return {
-            OrderType.SHIELD: self.get_shielded_cities(planet_id),
-            OrderType.DEVELOP: self.get_developed_cities(planet_id),
-            OrderType.SANCTIONS: self.get_sanctioned_planets(planet_id),
-            OrderType.CREATE: self.get_created_meteorites(planet_id),
-            OrderType.INVENT: self.get_invented(planet_id),
-            OrderType.ECO: self.get_eco_boost(planet_id),
-            OrderType.ATTACK: self.get_attacked_cities(planet_id),
+            OrderType.SHIELD: await self.get_shielded_cities(planet_id),
+            OrderType.DEVELOP: await self.get_developed_cities(planet_id),
+            OrderType.SANCTIONS: await self.get_sanctioned_planets(planet_id),
+            OrderType.CREATE: await self.get_created_meteorites(planet_id),
+            OrderType.INVENT: await self.get_invented(planet_id),
+            OrderType.ECO: await self.get_eco_boost(planet_id),
+            OrderType.ATTACK: await self.get_attacked_cities(planet_id),
         }
 
-    def clear_order_info(self, planet_id: int) -> None:
+    async def clear_order_info(self, planet_id: int) -> None:
         for order_type in OrderType:
             if order_type != OrderType.NEGOTIATE:
-                self.delete(order_type, planet_id)
+                await self.delete(order_type, planet_id)
+
+    def _queue_planet_snapshot(self, pipe: Pipeline, planet_id: int) -> None:
+        for order_type in self.SET_ORDERS:
+            pipe.smembers(self._create_name(order_type, planet_id))
+        pipe.mget(
+            [self._create_name(name, planet_id) for name in self.SCALAR_FIELDS]
+        )
+
+    def _parse_planet_snapshot(self, values: list[Any]) -> PlanetState:
+        (scalars,) = values
+        return self._parse_state(scalars)
+
+    def _queue_clear(self, pipe: Pipeline, planet_ids: list[int]) -> None:
+        pipe.delete(
+            *(
+                self._create_name(order_type, planet_id)
+                for planet_id in planet_ids
+                for order_type in OrderType
+            )
+        )
+
+    async def snapshot_and_clear_game(
+        self, planet_ids: list[int]
+    ) -> tuple[dict[int, OrderInfo], dict[int, tuple[int | None, int | None]]]:
+        """
+        Returns orders and (money, meteorites) balances of every planet
+        and deletes the orders, including negotiations, in one MULTI/EXEC.
+        A balance is None if its key has expired.
+        """
+        pipe = self.client.pipeline(transaction=True)
+        for planet_id in planet_ids:
+            self._queue_planet_snapshot(pipe, planet_id)
+        self._queue_clear(pipe, planet_ids)
+        results = await pipe.execute()
+
+        commands_per_planet = len(self.SET_ORDERS) + self.SCALAR_COMMANDS
+        orders, balances = {}, {}
+        for i, planet_id in enumerate(planet_ids):
+            values = results[i * commands_per_planet : (i + 1) * commands_per_planet]
+            members = values[: len(self.SET_ORDERS)]
+            state = self._parse_planet_snapshot(values[len(self.SET_ORDERS) :])
+            orders[planet_id] = {
+                order_type: list(map(int, planet_members))
+                for order_type, planet_members in zip(self.SET_ORDERS, members)
+            }
+            orders[planet_id][OrderType.CREATE] = state.created_meteorites
+            orders[planet_id][OrderType.INVENT] = state.invented
+            orders[planet_id][OrderType.ECO] = state.eco_boost
+            balances[planet_id] = (state.money, state.meteorites)
+        return orders, balances
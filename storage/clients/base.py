@@ -1,7 +1,7 @@
 import builtins
 from typing import Any
 
-from redis import Redis
+from redis.asyncio import Redis
 
 
 class BaseClient:
@@ -13,60 +13,60 @@ class BaseClient:
     def _create_name(self, *args: Any) -> str:
         return self.sep.join(list(map(str, args)))
 
-    def set(self, value: Any, *name_args: Any) -> bool:
+    async def set(self, value: Any, *name_args: Any) -> bool:
         name = self._create_name(*name_args)
-        return bool(self.client.set(name=name, value=str(value), ex=self.ex))
+        return bool(await self.client.set(name=name, value=str(value), ex=self.ex))
 
-    def get(self, *name_args: Any) -> Any:
+    async def get(self, *name_args: Any) -> Any:
         name = self._create_name(*name_args)
-        return self.client.get(name)
+        return await self.client.get(name)
 
-    def delete(self, *name_args: Any) -> None:
+    async def delete(self, *name_args: Any) -> None:
         name = self._create_name(*name_args)
-        self.client.delete(name)
+        await self.client.delete(name)
 
-    def hset(self, key: Any, value: Any, *name_args: Any) -> bool:
+    async def hset(self, key: Any, value: Any, *name_args: Any) -> bool:
         name = self._create_name(*name_args)
-        return bool(self.client.hset(name, str(key), str(value)))
+        return bool(await self.client.hset(name, str(key), str(value)))
 
-    def hget(self, key: Any, *name_args: Any) -> Any:
+    async def hget(self, key: Any, *name_args: Any) -> Any:
         name = self._create_name(*name_args)
-        return self.client.hget(name, str(key))
+        return await self.client.hget(name, str(key))
 
-    def hgetall(self, *name_args: Any) -> dict[str, Any]:
+    async def hgetall(self, *name_args: Any) -> dict[str, Any]:
         name = self._create_name(*name_args)
-        return self.client.hgetall(name)
+        return await self.client.hgetall(name)
 
-    def hdel(self, keys: list[Any], *name_args: Any) -> bool:
+    async def hdel(self, keys: list[Any], *name_args: Any) -> bool:
         name = self._create_name(*name_args)
-        return bool(self.client.hdel(name, *keys))
+        return bool(await self.client.hdel(name, *keys))
 
-    def sadd(self, items: list[Any], *name_args: Any) -> int:
+    async def sadd(self, items: list[Any], *name_args: Any) -> int:
         items = list(map(str, items))
         name = self._create_name(*name_args)
-        return self.client.sadd(name, *items)
+        return await self.client.sadd(name, *items)
 
-    def sdel(self, items: list[Any], *name_args: Any) -> int:
+    async def sdel(self, items: list[Any], *name_args: Any) -> int:
         items = list(map(str, items))
         name = self._create_name(*name_args)
-        return self.client.srem(name, *items)
+        return await self.client.srem(name, *items)
 
-    def smembers(self, *name_args: Any) -> builtins.set[Any]:
+    async def smembers(self, *name_args: Any) -> builtins.set[Any]:
         name = self._create_name(*name_args)
-        return self.client.smembers(name)
+        return await self.client.smembers(name)
 
-    def sismember(self, value: Any, *name_args: Any) -> bool:
+    async def sismember(self, value: Any, *name_args: Any) -> bool:
         name = self._create_name(*name_args)
-        return bool(self.client.sismember(name, str(value)))
+        return bool(await self.client.sismember(name, str(value)))
 
-    def exists(self, *name_args: Any) -> bool:
+    async def exists(self, *name_args: Any) -> bool:
         name = self._create_name(*name_args)
-        return bool(self.client.exists(name))
+        return bool(await self.client.exists(name))
 
-    def increment(self, *name_args: Any) -> int:
+    async def increment(self, *name_args: Any) -> int:
         name = self._create_name(*name_args)
-        return self.client.incr(name)
+        return await self.client.incr(name)
 
-    def decrement(self, *name_args: Any) -> int:
+    async def decrement(self, *name_args: Any) -> int:
         name = self._create_name(*name_args)
-        return self.client.decr(name)
+        return await self.client.decr(name)
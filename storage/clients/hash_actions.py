@@ -0,0 +1,85 @@
+from typing import Any
+
+from redis.asyncio.client import Pipeline
+
+from storage.clients.actions import ActionsClient, PlanetState
+
+
+class HashActionsClient(ActionsClient):
+    """
+    Keeps balances and scalar orders of a planet in one hash
+    ``planet:<id>`` with a single TTL, relations stay in sets.
+
+    Values of the plain key layout are still read while the hash has no such
+    field, so the layout can be switched without migrating a running round.
+    The legacy key is removed once the field is written.
+    """
+
+    HASH_KEY = 'planet'
+    SCALAR_COMMANDS = 2
+
+    def _hash_name(self, planet_id: int) -> str:
+        return self._create_name(self.HASH_KEY, planet_id)
+
+    def _legacy_names(self, planet_id: int) -> list[str]:
+        return [self._create_name(name, planet_id) for name in self.SCALAR_FIELDS]
+
+    def _scalar_slot(self, name: str, planet_id: int) -> tuple[str, str, str]:
+        return (
+            self._hash_name(planet_id),
+            str(name),
+            self._create_name(name, planet_id),
+        )
+
+    async def _get_scalar(self, name: str, planet_id: int) -> Any:
+        value = await self.client.hget(self._hash_name(planet_id), str(name))
+        if value is None:
+            return await self.get(name, planet_id)
+        return value
+
+    async def _set_scalar(self, value: Any, name: str, planet_id: int) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._hash_name(planet_id), str(name), str(value))
+        if self.ex:
+            pipe.expire(self._hash_name(planet_id), self.ex)
+        pipe.delete(self._create_name(name, planet_id))
+        await pipe.execute()
+
+    def _merge_legacy(
+        self, fields: dict[bytes, Any], legacy_values: list[Any]
+    ) -> list[Any]:
+        return [
+            fields.get(str(name).encode(), legacy)
+            for name, legacy in zip(self.SCALAR_FIELDS, legacy_values)
+        ]
+
+    async def get_planet_state(self, planet_id: int) -> PlanetState:
+        """
+        Reads the hash together with the legacy keys in one round trip,
+        unset orders have no field, so the legacy keys are almost always
+        needed.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._hash_name(planet_id))
+        pipe.mget(self._legacy_names(planet_id))
+        fields, legacy_values = await pipe.execute()
+        return self._parse_state(self._merge_legacy(fields, legacy_values))
+
+    def _queue_planet_snapshot(self, pipe: Pipeline, planet_id: int) -> None:
+        for order_type in self.SET_ORDERS:
+            pipe.smembers(self._create_name(order_type, planet_id))
+        pipe.hgetall(self._hash_name(planet_id))
+        pipe.mget(self._legacy_names(planet_id))
+
+    def _parse_planet_snapshot(self, values: list[Any]) -> PlanetState:
+        fields, legacy_values = values
+        return self._parse_state(self._merge_legacy(fields, legacy_values))
+
+    def _queue_clear(self, pipe: Pipeline, planet_ids: list[int]) -> None:
+        super()._queue_clear(pipe, planet_ids)
+        for planet_id in planet_ids:
+            pipe.hdel(self._hash_name(planet_id), *map(str, self.SCALAR_ORDERS))
+
+    async def clear_order_info(self, planet_id: int) -> None:
+        await super().clear_order_info(planet_id)
+        await self.hdel(list(self.SCALAR_ORDERS), self.HASH_KEY, planet_id)
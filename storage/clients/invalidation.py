@@ -0,0 +1,75 @@
+import asyncio
+import json
+import logging
+
+from redis.asyncio import Redis
+
+from database.invalidation import InvalidationBus, Message
+
+logger = logging.getLogger(__name__)
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """
+    Sends cache invalidations to every process subscribed to one Redis
+    pub/sub channel.
+    """
+
+    CHANNEL = 'cache_invalidation'
+    RECONNECT_DELAY = 1
+
+    def __init__(self, client: Redis, channel: str = CHANNEL):
+        super().__init__()
+        self.client = client
+        self.channel = channel
+        self._listener: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    @property
+    def started(self) -> bool:
+        return self._listener is not None
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def publish(self, message: Message) -> None:
+        data = json.dumps({'sender': self.sender, **message})
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self.client.publish(self.channel, data)
+            )
+        except RuntimeError:
+            logger.warning('No event loop to publish invalidation %s', data)
+            return
+
+        self._pending.add(task)
+        task.add_done_callback(self._on_published)
+
+    def _on_published(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('Failed to publish invalidation: %s', task.exception())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message['type'] == 'message':
+                            self.receive(json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Invalidation channel lost, resubscribing')
+                # messages could be missed while disconnected
+                self.receive({'cache': None, 'action': 'clear'})
+                await asyncio.sleep(self.RECONNECT_DELAY)
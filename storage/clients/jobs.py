@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from collections.abc import Collection
+
+from redis.asyncio import Redis
+
+from storage.schemas import Job
+
+
+class JobStore(ABC):
+    """
+    Jobs of the scheduler ordered by their run time. A job is run by the
+    process that claims it, so that it isn't run twice when several bot
+    processes share the store.
+    """
+
+    @abstractmethod
+    async def add(self, job: Job) -> None: ...
+
+    @abstractmethod
+    async def get_due(self, now: float) -> list[Job]:
+        """
+        Returns jobs with ``run_at`` not later than ``now``, earliest first.
+        """
+
+    @abstractmethod
+    async def claim(self, job: Job) -> bool:
+        """
+        Removes the job from the store, returns False if it was already
+        claimed or deleted.
+        """
+
+    @abstractmethod
+    async def delete_game(
+        self, game_id: int, kinds: Collection[str] | None = None
+    ) -> int:
+        """
+        Deletes jobs of the game, only those of ``kinds`` if given.
+        """
+
+    @abstractmethod
+    async def next_run_at(self) -> float | None: ...
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Stand-in for tests: jobs are lost with the process.
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+
+    async def add(self, job: Job) -> None:
+        self.jobs[job.id] = job
+
+    async def get_due(self, now: float) -> list[Job]:
+        return sorted(
+            (job for job in self.jobs.values() if job.run_at <= now),
+            key=lambda job: job.run_at,
+        )
+
+    async def claim(self, job: Job) -> bool:
+        return self.jobs.pop(job.id, None) is not None
+
+    async def delete_game(
+        self, game_id: int, kinds: Collection[str] | None = None
+    ) -> int:
+        ids = [
+            job.id
+            for job in self.jobs.values()
+            if job.game_id == game_id and (kinds is None or job.kind in kinds)
+        ]
+        for job_id in ids:
+            del self.jobs[job_id]
+        return len(ids)
+
+    async def next_run_at(self) -> float | None:
+        return min((job.run_at for job in self.jobs.values()), default=None)
+
+
+class RedisJobStore(JobStore):
+    """
+    Keeps jobs in a sorted set scored by ``run_at``, so they survive
+    restarts of the bot. ZREM of the serialized job is the claim: only one
+    process gets 1 for it. The member is removed exactly as it was read, a
+    job serialized again may not match it (e.g. after an upgrade). Members
+    of a game are also indexed in a set of their own.
+    """
+
+    KEY = 'scheduler:jobs'
+
+    def __init__(self, client: Redis, key: str = KEY):
+        self.client = client
+        self.key = key
+        # members read by get_due by job id
+        self._members: dict[str, bytes | str] = {}
+
+    def _game_key(self, game_id: int) -> str:
+        return f'{self.key}:game:{game_id}'
+
+    async def add(self, job: Job) -> None:
+        member = job.model_dump_json()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zadd(self.key, {member: job.run_at})
+        pipe.sadd(self._game_key(job.game_id), member)
+        await pipe.execute()
+
+    async def get_due(self, now: float) -> list[Job]:
+        jobs = []
+        for member in await self.client.zrangebyscore(self.key, '-inf', now):
+            job = Job.model_validate_json(member)
+            self._members[job.id] = member
+            jobs.append(job)
+        return jobs
+
+    async def claim(self, job: Job) -> bool:
+        member = self._members.pop(job.id, None) or job.model_dump_json()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.key, member)
+        pipe.srem(self._game_key(job.game_id), member)
+        removed, _ = await pipe.execute()
+        return bool(removed)
+
+    async def delete_game(
+        self, game_id: int, kinds: Collection[str] | None = None
+    ) -> int:
+        members = []
+        for member in await self.client.smembers(self._game_key(game_id)):
+            job = Job.model_validate_json(member)
+            if kinds is None or job.kind in kinds:
+                members.append(member)
+                self._members.pop(job.id, None)
+        if not members:
+            return 0
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(self.key, *members)
+        pipe.srem(self._game_key(game_id), *members)
+        removed, _ = await pipe.execute()
+        return removed
+
+    async def next_run_at(self) -> float | None:
+        first = await self.client.zrange(self.key, 0, 0, withscores=True)
+        return first[0][1] if first else None
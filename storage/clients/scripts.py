@@ -0,0 +1,119 @@
+"""
+Lua scripts used by ``ActionsClient`` to apply an order in a single round trip.
+
+Every script checks the balance, toggles the order and writes the new balance
+atomically and returns ``{status, balance, state}``: ``status`` is 1 on success
+and 0 if the balance is not enough, ``balance`` is the balance after the call
+and ``state`` is the new state of the order.
+
+Scalar values (balances, flags, amounts) are addressed by three arguments:
+the key holding the value, the hash field and the legacy plain key. An empty
+field means the value is a plain string key. Otherwise the value lives in a
+hash field and is read from the legacy key while the field is missing, which
+lets a running round continue after switching the layout; the legacy key is
+dropped on the first write.
+"""
+
+_HELPERS = """
+local function expire(key, ttl)
+    if ttl > 0 then
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+
+local function read(key, field, legacy)
+    if field == '' then
+        return redis.call('GET', key)
+    end
+    return redis.call('HGET', key, field) or redis.call('GET', legacy)
+end
+
+local function write(key, field, legacy, value, ttl)
+    if field == '' then
+        if ttl > 0 then
+            redis.call('SET', key, value, 'EX', ttl)
+        else
+            redis.call('SET', key, value)
+        end
+        return
+    end
+    redis.call('HSET', key, field, value)
+    expire(key, ttl)
+    redis.call('DEL', legacy)
+end
+
+local function remove(key, field, legacy)
+    if field ~= '' then
+        redis.call('HDEL', key, field)
+    end
+    redis.call('DEL', legacy)
+end
+"""
+
+# KEYS: balance key, legacy balance key, relation set
+# ARGV: balance field, cost, member, ttl
+TOGGLE_MEMBER = _HELPERS + """
+local balance = tonumber(read(KEYS[1], ARGV[1], KEYS[2]) or '0')
+local cost = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[4])
+
+if redis.call('SISMEMBER', KEYS[3], ARGV[3]) == 1 then
+    balance = balance + cost
+    write(KEYS[1], ARGV[1], KEYS[2], balance, ttl)
+    redis.call('SREM', KEYS[3], ARGV[3])
+    return {1, balance, 0}
+end
+
+if balance < cost then
+    return {0, balance, 0}
+end
+
+balance = balance - cost
+write(KEYS[1], ARGV[1], KEYS[2], balance, ttl)
+redis.call('SADD', KEYS[3], ARGV[3])
+return {1, balance, 1}
+"""
+
+# KEYS: balance key, legacy balance key, flag key, legacy flag key
+# ARGV: balance field, flag field, cost, ttl
+TOGGLE_FLAG = _HELPERS + """
+local balance = tonumber(read(KEYS[1], ARGV[1], KEYS[2]) or '0')
+local flag = tonumber(read(KEYS[3], ARGV[2], KEYS[4]) or '0')
+local cost = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+if flag ~= 0 then
+    balance = balance + cost
+    write(KEYS[1], ARGV[1], KEYS[2], balance, ttl)
+    remove(KEYS[3], ARGV[2], KEYS[4])
+    return {1, balance, 0}
+end
+
+if balance < cost then
+    return {0, balance, 0}
+end
+
+balance = balance - cost
+write(KEYS[1], ARGV[1], KEYS[2], balance, ttl)
+write(KEYS[3], ARGV[2], KEYS[4], 1, ttl)
+return {1, balance, 1}
+"""
+
+# KEYS: balance key, legacy balance key, amount key, legacy amount key
+# ARGV: balance field, amount field, cost of one item, new amount, ttl
+SET_AMOUNT = _HELPERS + """
+local balance = tonumber(read(KEYS[1], ARGV[1], KEYS[2]) or '0')
+local chosen = tonumber(read(KEYS[3], ARGV[2], KEYS[4]) or '0')
+local cost = tonumber(ARGV[3])
+local amount = tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+
+local new_balance = balance - (amount - chosen) * cost
+if new_balance < 0 then
+    return {0, balance, chosen}
+end
+
+write(KEYS[1], ARGV[1], KEYS[2], new_balance, ttl)
+write(KEYS[3], ARGV[2], KEYS[4], amount, ttl)
+return {1, new_balance, amount}
+"""
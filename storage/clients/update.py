@@ -1,7 +1,7 @@
 from collections.abc import Awaitable
 from types import TracebackType
 
-from redis import Redis
+from redis.asyncio import Redis
 
 from storage.clients.base import BaseClient
 
@@ -20,7 +20,7 @@ class _UpdateContextManager:
         self.client = update_client
 
     async def __aenter__(self):
-        self.client.increment(self.user_id, self.money_key)
+        await self.client.increment(self.user_id, self.money_key)
 
     async def __aexit__(
         self,
@@ -28,11 +28,11 @@ class _UpdateContextManager:
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ):
-        count_val = self.client.decrement(self.user_id, self.money_key)
+        count_val = await self.client.decrement(self.user_id, self.money_key)
         if count_val <= 0:
             await self.exit_handler
         if count_val < 0:
-            self.client.delete(self.user_id, self.money_key)
+            await self.client.delete(self.user_id, self.money_key)
 
 
 class UpdateClient(BaseClient):
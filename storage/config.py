@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,7 +11,23 @@ class RedisConfig(BaseSettings):
     INNER_PORT: str
     OUTER_PORT: str
     PASSWORD: str
+    # connects through the unix socket instead of HOST:INNER_PORT if set
+    UNIX_SOCKET_PATH: str | None = None
     EXPIRE_KEY_SECONDS: int = 600
+    # kept by round state on top of the round and the delivery of its start
+    EXPIRE_KEY_MARGIN_SECONDS: int = 300
+    # 'keys' keeps every value of a planet in its own key, 'hash' groups
+    # balances and scalar orders of a planet into one hash
+    ORDERS_LAYOUT: Literal['keys', 'hash'] = 'keys'
+
+    POOL_SIZE: int = 20
+    POOL_TIMEOUT: float = 5
+    SOCKET_TIMEOUT: float = 2
+    SOCKET_CONNECT_TIMEOUT: float = 2
+    HEALTH_CHECK_INTERVAL: int = 30
+    RETRY_ATTEMPTS: int = 3
+    RETRY_BACKOFF_BASE: float = 0.05
+    RETRY_BACKOFF_CAP: float = 1
 
 
 redis_config = RedisConfig()
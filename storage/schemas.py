@@ -1,6 +1,8 @@
+import uuid
 from enum import StrEnum, auto
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class BaseDto(BaseModel):
@@ -29,3 +31,16 @@ PLANET_MESSAGE_TYPES = (
     MessageType.NEGOTIATIONS_END,
     MessageType.NEGOTIATIONS_NOTIFICATION,
 )
+
+
+class Job(BaseModel):
+    """
+    A checkpoint of a game run by the scheduler at ``run_at`` (a Unix
+    timestamp). ``payload`` must be JSON-serializable.
+    """
+
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    game_id: int
+    kind: str
+    run_at: float
+    payload: dict[str, Any] = Field(default_factory=dict)
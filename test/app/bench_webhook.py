@@ -0,0 +1,164 @@
+"""
+Load generator for the webhook mode.
+
+Posts synthetic message updates spread over ``--chats`` chats to the webhook
+with ``--concurrency`` concurrent senders, reporting the throughput, the
+response latencies and statuses and the ``/stats`` of the pipeline. Without
+``--url`` the updates go straight to an in-process ``WebhookApp`` whose
+handlers just sleep for ``--handler-latency`` seconds, which shows how the
+worker count and the queue size behave without a database or Telegram.
+
+Usage:
+    python -m test.app.bench_webhook
+    python -m test.app.bench_webhook --workers 4 --queue-size 100 --timeout 0.1
+    python -m test.app.bench_webhook --url http://localhost:8000/webhook --secret s
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from unittest.mock import Mock
+
+import aiohttp
+from aiogram.types import Update
+from yarl import URL
+
+from app.webhook import SECRET_TOKEN_HEADER, STATS_PATH, UpdatePipeline, WebhookApp
+
+
+def make_update(update_id: int, chat_id: int) -> bytes:
+    return json.dumps(
+        {
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Bench'},
+                'text': '/start',
+            },
+        }
+    ).encode()
+
+
+class SleepingDispatcher:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def feed_update(self, bot, update: Update) -> None:
+        await asyncio.sleep(random.expovariate(1 / self.latency))
+
+
+class InProcessClient:
+    def __init__(self, app: WebhookApp, secret: str | None):
+        self.app = app
+        self.headers = (
+            [] if secret is None else [(SECRET_TOKEN_HEADER, secret.encode())]
+        )
+
+    async def request(self, method: str, path: str, body: bytes = b'') -> tuple:
+        scope = {
+            'type': 'http',
+            'method': method,
+            'path': path,
+            'headers': self.headers,
+        }
+        response = {}
+
+        async def receive():
+            return {'type': 'http.request', 'body': body}
+
+        async def send(message):
+            response.update(message)
+
+        await self.app(scope, receive, send)
+        return response['status'], response['body']
+
+
+class HttpClient:
+    def __init__(self, session: aiohttp.ClientSession, url: str, secret: str | None):
+        self.session = session
+        self.url = URL(url)
+        self.headers = {'Content-Type': 'application/json'}
+        if secret is not None:
+            self.headers[SECRET_TOKEN_HEADER.decode()] = secret
+
+    async def request(self, method: str, path: str, body: bytes = b'') -> tuple:
+        async with self.session.request(
+            method,
+            self.url.with_path(path),
+            data=body,
+            headers=self.headers,
+        ) as response:
+            return response.status, await response.read()
+
+
+async def load(client, path: str, updates: int, chats: int, concurrency: int) -> None:
+    statuses = Counter()
+    latencies = []
+    update_ids = iter(range(1, updates + 1))
+
+    async def sender():
+        for update_id in update_ids:
+            body = make_update(update_id, random.randrange(1, chats + 1))
+            started = time.perf_counter()
+            status, _ = await client.request('POST', path, body)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f'{updates} updates in {elapsed:.2f} s, {updates / elapsed:.0f} updates/s, '
+        f'latency p50 {quantiles[49] * 1000:.2f} ms, p99 {quantiles[98] * 1000:.2f} ms, '
+        f'max {max(latencies) * 1000:.2f} ms'
+    )
+    print('statuses:', dict(sorted(statuses.items())))
+
+
+async def run(args: argparse.Namespace) -> None:
+    random.seed(0)
+    if args.url is not None:
+        async with aiohttp.ClientSession() as session:
+            client = HttpClient(session, args.url, args.secret)
+            path = client.url.path
+            await load(client, path, args.updates, args.chats, args.concurrency)
+            status, body = await client.request('GET', STATS_PATH)
+        print('stats:', json.loads(body) if status == 200 else status)
+        return
+
+    pipeline = UpdatePipeline(
+        SleepingDispatcher(args.handler_latency),
+        Mock(),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        enqueue_timeout=args.timeout,
+    )
+    app = WebhookApp(pipeline, '/webhook', secret_token=args.secret)
+    client = InProcessClient(app, args.secret)
+    await pipeline.start()
+    await load(client, '/webhook', args.updates, args.chats, args.concurrency)
+    await pipeline.close()
+    print('stats:', pipeline.get_stats())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='webhook of a running server')
+    parser.add_argument('--secret')
+    parser.add_argument('--updates', type=int, default=10000)
+    parser.add_argument('--chats', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--timeout', type=float, default=5)
+    parser.add_argument('--handler-latency', type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -65,7 +65,7 @@ def user_client():
 @pytest.fixture()
 def messages_client():
     return MessagesClient(
-        redis_client=Mock(),
+        redis_client=AsyncMock(),
         ex=1,
     )
 
@@ -73,7 +73,7 @@ def messages_client():
 @pytest.fixture()
 def actions_client():
     return ActionsClient(
-        client=Mock(),
+        client=AsyncMock(),
         ex=1,
         game_config=game_config,
     )
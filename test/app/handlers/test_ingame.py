@@ -1,18 +1,48 @@
-from unittest.mock import AsyncMock
+import asyncio
+import itertools
+import time
+from unittest.mock import AsyncMock, Mock
 
 import pytest
-from aiogram.methods import EditMessageText, SendMessage
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText, SendMessage
 from aiogram.types import ReplyKeyboardRemove
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import greenlet_spawn
 
+from app.coalescer import EditCoalescer
 from app.filters.state import BotStates
 from app.handlers.ingame import (
+    TRANSACTION_TIMEOUT,
     end_the_game,
+    expire_transaction,
     handle_action,
+    handle_transaction_action,
     set_amount_of_money,
     start_round,
+    switch_other_planet,
 )
-from database.schemas import AdminDto, GameDto, GameStatus, PlanetDto, PlayerDto
+from app.handlers.round_loop import register_round_handlers, schedule_round
+from app.middlewares import DBMiddleware
+from app.scheduler import Scheduler
+from database.models import Planet
+from database.pool import MonitoredQueuePool
+from database.schemas import (
+    AdminDto,
+    CityDto,
+    GameDto,
+    GameStatus,
+    PlanetDto,
+    PlayerDto,
+)
+from game.config import game_config
 from game.schemas import FailureReason
+from keyboards.schemas import Action, ActionType
+from messages.renderer import get_renderer
+from storage.clients.actions import PlanetState
+from storage.clients.jobs import InMemoryJobStore
+from storage.schemas import Job
 from test.app.mock_utils import mock_answer_message
 
 
@@ -74,8 +104,18 @@ async def test_start_round(
             )
         },
     )
-    send_all_info_mock = mocker.patch('app.handlers.ingame.send_all_info')
-    mocker.patch('app.handlers.ingame.get_round_notifier', return_value=AsyncMock())
+    mocker.patch.object(
+        game_client,
+        'get_all_active_players',
+        return_value=[PlayerDto(tg_id=other_user_id, game_id=game_id)],
+    )
+    mocker.patch.object(
+        game_client, 'get_imposed_sanctions_of_game', return_value={}
+    )
+    make_all_info_mock = mocker.patch(
+        'app.handlers.ingame.make_all_info', return_value=[]
+    )
+    mocker.patch('app.handlers.ingame.schedule_round')
 
     mock_bot.add_result_for(SendMessage, True, message)
     mock_bot.add_result_for(SendMessage, True, message)
@@ -89,10 +129,11 @@ async def test_start_round(
         mock_session,
     )
 
-    send_all_info_mock.assert_awaited_once()
-    _, kwargs = send_all_info_mock.call_args
+    make_all_info_mock.assert_called_once()
+    _, kwargs = make_all_info_mock.call_args
     assert kwargs['planet_id'] == 1
     assert kwargs['user_id'] == other_user_id
+    assert kwargs['sanctioned_planets'] == []
 
     request = mock_bot.get_request()
     assert isinstance(request, SendMessage)
@@ -217,7 +258,11 @@ async def test_handle_action_delegating(
     user_id,
     game_id,
 ):
-    mocker.patch.object(actions_client, 'get_balance', return_value=0)
+    mocker.patch.object(
+        actions_client,
+        'get_planet_state',
+        return_value=PlanetState(0, 0, 0, False, False),
+    )
     mocker.patch.object(
         user_client, 'get_user', return_value=AdminDto(tg_id=user_id, game_id=game_id)
     )
@@ -266,13 +311,15 @@ async def test_handle_action_messages(
     meteorites_changed,
     money_changed,
 ):
-    side_effect = [1] * 4
-    if meteorites_changed:
-        side_effect[3] = 2
-    if money_changed:
-        side_effect[2] = 2
+    new_state = PlanetState(
+        money=2 if money_changed else 1,
+        meteorites=2 if meteorites_changed else 1,
+        created_meteorites=0,
+        invented=False,
+        eco_boost=False,
+    )
+    side_effect = [PlanetState(1, 1, 0, False, False), new_state]
 
-    mocker.patch.object(actions_client, 'get_balance', return_value=0)
     mocker.patch.object(
         user_client, 'get_user', return_value=AdminDto(tg_id=user_id, game_id=game_id)
     )
@@ -289,10 +336,9 @@ async def test_handle_action_messages(
     mocker.patch.object(game_client, 'get_cities_of_planet', return_value=[])
     mocker.patch.object(game_client, 'spend')
     mocker.patch('app.handlers.ingame.handle_eco_action')
-    mocker.patch.object(actions_client, 'get_balance', side_effect=side_effect)
+    mocker.patch.object(actions_client, 'get_planet_state', side_effect=side_effect)
     mocker.patch.object(actions_client, 'get_shielded_cities', return_value=[])
     mocker.patch.object(actions_client, 'get_developed_cities', return_value=[])
-    mocker.patch.object(actions_client, 'get_created_meteorites', return_value=0)
     mocker.patch.object(
         messages_client, 'get_info_message_id', return_value=message.message_id
     )
@@ -335,6 +381,158 @@ async def test_handle_action_messages(
         )
 
 
+COALESCE_WINDOW = 0.05
+
+
+@pytest.fixture()
+def coalescer(mocker) -> EditCoalescer:
+    coalescer = EditCoalescer(COALESCE_WINDOW)
+    mocker.patch('app.handlers.ingame.edit_coalescer', coalescer)
+    return coalescer
+
+
+@pytest.fixture()
+def round_game(game_client, user_client, user_id, chat, game_id) -> PlanetDto:
+    """
+    Mocks a running round with the planet of the user and returns the planet.
+    """
+    game = GameDto(id=game_id, status=GameStatus.ROUND, round=2, num_planets=3)
+    planets = {
+        1: PlanetDto(id=1, name='Земля', game_id=game_id, owner_id=chat.id),
+        2: PlanetDto(id=2, name='Венера', game_id=game_id),
+        3: PlanetDto(id=3, name='Марс', game_id=game_id),
+    }
+    user_client.get_user = AsyncMock(
+        return_value=PlayerDto(tg_id=user_id, game_id=game_id)
+    )
+    game_client.get_game = AsyncMock(return_value=game)
+    game_client.get_player_planet = AsyncMock(return_value=planets[1])
+    game_client.get_planet = AsyncMock(
+        side_effect=lambda session, planet_id, *args: planets[planet_id]
+    )
+    game_client.get_planet_by_city_id = AsyncMock(
+        side_effect=lambda session, city_id: planets[city_id // 10]
+    )
+    game_client.get_planets_of_game = AsyncMock(return_value=list(planets.values()))
+    game_client.get_cities_of_planet = AsyncMock(
+        side_effect=lambda session, planet_id, *args, **kwargs: [
+            CityDto(id=planet_id * 10 + i, name=f'city{i}', planet_id=planet_id)
+            for i in range(2)
+        ]
+    )
+    return planets[1]
+
+
+@pytest.mark.parametrize(
+    'call',
+    ['{"action_type": "develop", "planet_id": 1, "argument": 10}'],
+    indirect=True,
+)
+@pytest.mark.asyncio
+async def test_city_press_edits_message_once(
+    call,
+    fsm_context,
+    user_client,
+    game_client,
+    messages_client,
+    actions_client,
+    mock_session,
+    mock_bot,
+    scheduler,
+    coalescer,
+    round_game,
+):
+    actions_client.get_planet_state = AsyncMock(
+        side_effect=[
+            PlanetState(1000, 0, 0, False, False),
+            PlanetState(1000 - game_config.DEVELOPMENT_COST, 0, 0, False, False),
+        ]
+    )
+    actions_client.develop_city = AsyncMock(return_value=FailureReason.SUCCESS)
+    actions_client.get_shielded_cities = AsyncMock(return_value=[])
+    actions_client.get_developed_cities = AsyncMock(return_value=[10])
+    messages_client.get_info_message_id = AsyncMock(
+        return_value=call.message.message_id
+    )
+    mock_bot.add_result_for(EditMessageText, True, True)
+
+    await handle_action(
+        call,
+        Action.model_validate_json(call.data),
+        fsm_context,
+        user_client,
+        game_client,
+        messages_client,
+        actions_client,
+        mock_session,
+        get_renderer('ru'),
+        scheduler,
+    )
+
+    # the balance and the keyboard go out at once in one edit
+    assert len(mock_bot.session.requests) == 1
+    request = mock_bot.get_request()
+    assert isinstance(request, EditMessageText)
+    assert request.message_id == call.message.message_id
+    assert request.reply_markup is not None
+    assert coalescer.stats()['sent'] == 1
+
+
+@pytest.mark.parametrize(
+    'call',
+    ['{"action_type": "attack", "planet_id": 1, "argument": 30}'],
+    indirect=True,
+)
+@pytest.mark.asyncio
+async def test_switch_planet_drops_pending_attack_keyboard(
+    call,
+    fsm_context,
+    user_client,
+    game_client,
+    messages_client,
+    actions_client,
+    mock_session,
+    mock_bot,
+    scheduler,
+    coalescer,
+    round_game,
+):
+    renderer = get_renderer('ru')
+    actions_client.get_planet_state = AsyncMock(
+        return_value=PlanetState(1000, 5, 0, False, False)
+    )
+    actions_client.attack_city = AsyncMock(return_value=FailureReason.SUCCESS)
+    actions_client.get_attacked_cities = AsyncMock(side_effect=[[30], [], []])
+    for _ in range(3):
+        mock_bot.add_result_for(EditMessageText, True, True)
+
+    # two quick taps: the second keyboard edit waits for the window
+    for _ in range(2):
+        await handle_action(
+            call,
+            Action.model_validate_json(call.data),
+            fsm_context,
+            user_client,
+            game_client,
+            messages_client,
+            actions_client,
+            mock_session,
+            renderer,
+            scheduler,
+        )
+    assert len(mock_bot.session.requests) == 1
+
+    switch = call.model_copy(update={'data': 'other_planet_info 1 2'})
+    await switch_other_planet(
+        switch, game_client, actions_client, mock_session, renderer
+    )
+    await asyncio.sleep(COALESCE_WINDOW * 2)
+
+    methods = [type(request) for request in mock_bot.session.requests]
+    assert methods == [EditMessageReplyMarkup, EditMessageText]
+    assert 'Венера' in mock_bot.session.requests[-1].text
+
+
 @pytest.mark.parametrize(
     ('message', 'current_balance', 'is_wrong_answer'),
     [
@@ -437,3 +635,226 @@ async def test_set_amount_of_money(
 
         state = await fsm_context.get_state()
         assert state is None
+
+
+@pytest.fixture()
+def scheduler() -> Scheduler:
+    scheduler = Scheduler(InMemoryJobStore(), Mock())
+    scheduler.register(TRANSACTION_TIMEOUT, expire_transaction)
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_pending_transfers_hold_no_connection(
+    storage, mock_bot, game_client, scheduler, game_id
+):
+    # overflow is allowed, so waiting for a free connection can't hide a leak
+    pool = MonitoredQueuePool(Mock, pool_size=5, max_overflow=50, timeout=1)
+    game = GameDto(id=game_id, status=GameStatus.ROUND, round=1, num_planets=3)
+    to_planet = PlanetDto(id=2, name='Марс', game_id=game_id)
+    sessions = []
+
+    def make_session() -> Mock:
+        # like AsyncSession, checks out a connection when first used
+        session = Mock(spec=AsyncSession)
+        connections = []
+
+        async def get(*args, **kwargs):
+            if not connections:
+                connections.append(await greenlet_spawn(pool.connect))
+
+        async def close():
+            for connection in connections:
+                await greenlet_spawn(connection.close)
+
+        session.get = AsyncMock(side_effect=get)
+        session.close = AsyncMock(side_effect=close)
+        sessions.append(session)
+        return session
+
+    session_factory = Mock(side_effect=make_session)
+    lookups = itertools.count()
+
+    async def get_planet(session, planet_id: int, *args) -> PlanetDto:
+        # every other lookup misses the cache
+        if next(lookups) % 2:
+            await session.get(Planet, planet_id)
+        return to_planet
+
+    game_client.get_planet = AsyncMock(side_effect=get_planet)
+    middleware = DBMiddleware(
+        Mock(), game_client, Mock(), session_factory, Mock(), Mock()
+    )
+
+    def fsm_context(user_id: int) -> FSMContext:
+        return FSMContext(storage, StorageKey(mock_bot.id, user_id, user_id))
+
+    async def transfer(user_id: int) -> None:
+        call = Mock(from_user=Mock(id=user_id), message=Mock(chat=Mock(id=user_id)))
+        call.answer = call.message.answer = AsyncMock()
+
+        async def handler(event, data):
+            await handle_transaction_action(
+                event,
+                Action(action_type=ActionType.TRANSACTION, planet_id=1, argument=2),
+                fsm_context(user_id),
+                PlanetDto(id=1, name='Земля', game_id=game_id, owner_id=user_id),
+                game,
+                data['game_client'],
+                data['session'],
+                get_renderer('ru'),
+                scheduler,
+            )
+
+        await middleware(handler, call, {})
+
+    started = time.time()
+    await asyncio.gather(*(transfer(user_id) for user_id in range(50)))
+
+    # all the handlers are done while every transfer is still waiting
+    assert time.time() - started < game_config.TIME_WAITING_AMOUNT_ANSWER
+    assert not await scheduler.store.get_due(time.time())
+    # cache hits never opened a session, the others are closed already
+    assert middleware.stats() == {'updates': 50, 'updates_without_db': 25}
+    assert session_factory.call_count == 25
+    for session in sessions:
+        session.commit.assert_awaited_once()
+        session.close.assert_awaited_once()
+    stats = pool.get_stats()
+    assert stats['checked_out'] == 0
+    assert stats['peak_checked_out'] > 0
+
+    jobs = {job.payload['user_id']: job for job in scheduler.store.jobs.values()}
+    assert jobs.keys() == set(range(50))
+    for user_id, job in jobs.items():
+        data = await fsm_context(user_id).get_data()
+        assert await fsm_context(user_id).get_state() == (
+            BotStates.transaction_state.state
+        )
+        assert job.game_id == game_id
+        assert job.kind == TRANSACTION_TIMEOUT
+        assert job.run_at >= started + game_config.TIME_WAITING_AMOUNT_ANSWER
+        assert job.payload == {
+            'chat_id': user_id,
+            'user_id': user_id,
+            'nonce': data['nonce'],
+            'language': 'ru',
+        }
+    assert len({job.payload['nonce'] for job in jobs.values()}) == 50
+
+
+@pytest.mark.asyncio
+async def test_end_the_game_keeps_transfer_timeouts(
+    message,
+    fsm_context,
+    storage,
+    mock_bot,
+    user_client,
+    game_client,
+    mock_session,
+    scheduler,
+    chat,
+    user_id,
+    other_user_id,
+    game_id,
+):
+    game = GameDto(id=game_id, status=GameStatus.ROUND, round=1, num_planets=3)
+    game_client.get_planet = AsyncMock(
+        return_value=PlanetDto(id=2, name='Марс', game_id=game_id)
+    )
+    call = Mock(from_user=Mock(id=user_id), message=Mock(chat=Mock(id=chat.id)))
+    call.answer = call.message.answer = AsyncMock()
+    register_round_handlers(scheduler)
+    await schedule_round(scheduler, game, 'ru')
+    await handle_transaction_action(
+        call,
+        Action(action_type=ActionType.TRANSACTION, planet_id=1, argument=2),
+        fsm_context,
+        PlanetDto(id=1, name='Земля', game_id=game_id, owner_id=user_id),
+        game,
+        game_client,
+        mock_session,
+        get_renderer('ru'),
+        scheduler,
+    )
+
+    user_client.get_user = AsyncMock(
+        return_value=AdminDto(tg_id=user_id, game_id=game_id)
+    )
+    user_client.get_game = AsyncMock(return_value=game)
+    game_client.get_all_active_admins = AsyncMock(return_value=[])
+    game_client.get_all_active_players = AsyncMock(
+        return_value=[PlayerDto(tg_id=other_user_id, game_id=game_id)]
+    )
+    game_client.end_game = AsyncMock()
+    mock_bot.add_result_for(SendMessage, True, message)
+    await end_the_game(
+        message, user_client, game_client, mock_session, get_renderer('ru'), scheduler
+    )
+    mock_bot.get_request()
+
+    [job] = scheduler.store.jobs.values()
+    assert job.kind == TRANSACTION_TIMEOUT
+
+    game_client.get_game = AsyncMock(
+        return_value=game.model_copy(update={'status': GameStatus.ENDED})
+    )
+    await expire_transaction(
+        job,
+        bot=mock_bot,
+        fsm_storage=storage,
+        game_client=game_client,
+        session=mock_session,
+    )
+
+    assert await fsm_context.get_state() is None
+    assert not mock_bot.session.requests
+
+
+@pytest.mark.parametrize('answered', [False, True])
+@pytest.mark.asyncio
+async def test_expire_transaction(
+    fsm_context,
+    storage,
+    mock_bot,
+    game_client,
+    mock_session,
+    chat,
+    user_id,
+    game_id,
+    message,
+    answered,
+):
+    await fsm_context.set_state(BotStates.transaction_state)
+    await fsm_context.set_data({'nonce': 'new' if answered else 'old'})
+    game = GameDto(id=game_id, status=GameStatus.ROUND, round=1, num_planets=3)
+    game_client.get_game = AsyncMock(return_value=game)
+    mock_bot.add_result_for(SendMessage, True, message)
+    job = Job(
+        game_id=game_id,
+        kind=TRANSACTION_TIMEOUT,
+        run_at=0,
+        payload={
+            'chat_id': chat.id,
+            'user_id': user_id,
+            'nonce': 'old',
+            'language': 'ru',
+        },
+    )
+
+    await expire_transaction(
+        job,
+        bot=mock_bot,
+        fsm_storage=storage,
+        game_client=game_client,
+        session=mock_session,
+    )
+
+    if answered:
+        assert await fsm_context.get_state() == BotStates.transaction_state.state
+        assert not mock_bot.session.requests
+    else:
+        assert await fsm_context.get_state() is None
+        request = mock_bot.get_request()
+        assert isinstance(request, SendMessage)
+        assert request.chat_id == chat.id
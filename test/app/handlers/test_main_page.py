@@ -1,18 +1,24 @@
+from unittest.mock import Mock
+
 import pytest
 from aiogram import types
 from aiogram.filters import CommandObject
 from aiogram.methods import GetChat, SendMessage
 from pytest_lazy_fixtures import lf
+from sqlalchemy.util import greenlet_spawn
 
 from app.handlers.main_page import (
     accept_knight,
+    cache_stats,
     fire_admin,
     refuse_knight,
     request,
     start,
 )
+from database.pool import MonitoredQueuePool
 from database.schemas import AdminDto, PlayerDto
 from game.schemas import FailureReason
+from messages.renderer import get_renderer
 from test.app.mock_utils import mock_answer_message
 
 
@@ -185,3 +191,16 @@ async def test_fire_admin(
     )
     mock_fire.assert_called_once()
     mock_promote.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_shows_pool(mocker, message):
+    answer_mock = mock_answer_message(mocker)
+    pool = MonitoredQueuePool(Mock, pool_size=5, max_overflow=0, timeout=1)
+    connection = await greenlet_spawn(pool.connect)
+
+    await cache_stats(message, get_renderer('en'), Mock(pool=pool))
+    await greenlet_spawn(connection.close)
+
+    text = answer_mock.await_args.kwargs['text']
+    assert 'Database pool: checked out 1/5 (+0), peak 1, checkouts 1' in text
@@ -1,3 +1,4 @@
+import asyncio
 from collections import deque
 from collections.abc import AsyncGenerator
 from typing import TYPE_CHECKING, Any
@@ -10,8 +11,10 @@ from aiogram.types import UNSET_PARSE_MODE, ResponseParameters, User
 
 
 class MockedSession(BaseSession):
-    def __init__(self):
+    def __init__(self, latency: float = 0):
         super().__init__()
+        # seconds every request takes, to simulate round trips to Telegram
+        self.latency = latency
         self.responses: deque[Response[TelegramType]] = deque()
         self.requests: deque[TelegramMethod[TelegramType]] = deque()
         self.closed = True
@@ -34,6 +37,8 @@ class MockedSession(BaseSession):
     ) -> TelegramType:
         self.closed = False
         self.requests.append(method)
+        if self.latency:
+            await asyncio.sleep(self.latency)
         response: Response[TelegramType] = self.responses.pop()
         self.check_response(
             bot=bot,
@@ -58,9 +63,11 @@ class MockedBot(Bot):
     if TYPE_CHECKING:
         session: MockedSession
 
-    def __init__(self, **kwargs):
+    def __init__(self, latency: float = 0, **kwargs):
         super().__init__(
-            kwargs.pop('token', '42:TEST'), session=MockedSession(), **kwargs
+            kwargs.pop('token', '42:TEST'),
+            session=MockedSession(latency),
+            **kwargs,
         )
         self._me = User(
             id=self.id,
@@ -0,0 +1,197 @@
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+from app.broadcast import Broadcaster, RateLimitMiddleware, TokenBucket
+from test.app.mocked_bot import MockedBot
+
+LATENCY = 0.05
+
+
+@pytest.fixture()
+def slow_bot():
+    return MockedBot(latency=LATENCY)
+
+
+def add_results(bot: MockedBot, message, n: int):
+    for _ in range(n):
+        bot.add_result_for(SendMessage, True, message)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    started = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+
+    # the first 5 pass at once, the other 10 at 50 per second
+    assert time.monotonic() - started >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.1)
+
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_broadcast_load(slow_bot, message):
+    chats = 100
+    add_results(slow_bot, message, chats)
+    broadcaster = Broadcaster(max_concurrency=20)
+
+    started = time.monotonic()
+    results = await broadcaster.broadcast(
+        slow_bot,
+        (SendMessage(chat_id=chat_id, text='text') for chat_id in range(chats)),
+    )
+    elapsed = time.monotonic() - started
+
+    assert len(results) == chats
+    assert all(result.message_id == message.message_id for result in results)
+    assert len(slow_bot.session.requests) == chats
+    # one request after another would take chats * LATENCY = 5 s
+    assert elapsed < chats * LATENCY / 10
+
+
+@pytest.mark.asyncio
+async def test_broadcast_bounded_concurrency(slow_bot, message):
+    add_results(slow_bot, message, 20)
+    broadcaster = Broadcaster(max_concurrency=5)
+
+    started = time.monotonic()
+    await broadcaster.broadcast(
+        slow_bot,
+        (SendMessage(chat_id=chat_id, text='text') for chat_id in range(20)),
+    )
+
+    assert time.monotonic() - started >= 4 * LATENCY
+
+
+@pytest.mark.asyncio
+async def test_broadcast_keeps_order_in_chat(slow_bot, message):
+    add_results(slow_bot, message, 9)
+    broadcaster = Broadcaster(max_concurrency=10)
+
+    await broadcaster.broadcast(
+        slow_bot,
+        (
+            SendMessage(chat_id=chat_id, text=str(i))
+            for i in range(3)
+            for chat_id in range(3)
+        ),
+    )
+
+    for chat_id in range(3):
+        texts = [
+            request.text
+            for request in slow_bot.session.requests
+            if request.chat_id == chat_id
+        ]
+        assert texts == ['0', '1', '2']
+
+
+@pytest.mark.asyncio
+async def test_broadcast_timeout(slow_bot, message):
+    add_results(slow_bot, message, 3)
+    broadcaster = Broadcaster(max_concurrency=10)
+
+    results = await broadcaster.broadcast(
+        slow_bot,
+        (SendMessage(chat_id=1, text=str(i)) for i in range(3)),
+        timeout=1.5 * LATENCY,
+    )
+
+    assert results[0].message_id == message.message_id
+    assert results[1:] == [None, None]
+    assert len(slow_bot.session.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_broadcast_returns_errors(mock_bot, message):
+    mock_bot.add_result_for(SendMessage, True, message)
+    mock_bot.add_result_for(
+        SendMessage, False, description='Forbidden: bot was blocked', error_code=403
+    )
+    broadcaster = Broadcaster(max_concurrency=1)
+
+    results = await broadcaster.broadcast(
+        mock_bot,
+        [
+            SendMessage(chat_id=1, text='text'),
+            SendMessage(chat_id=2, text='text'),
+        ],
+    )
+
+    assert isinstance(results[0], TelegramForbiddenError)
+    assert results[1].message_id == message.message_id
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_chat(mock_bot, message):
+    mock_bot.session.middleware(
+        RateLimitMiddleware(rate=1000, chat_rate=20, chat_burst=1, max_retries=0)
+    )
+    add_results(mock_bot, message, 6)
+    broadcaster = Broadcaster(max_concurrency=10)
+
+    started = time.monotonic()
+    await broadcaster.broadcast(
+        mock_bot,
+        [
+            *(SendMessage(chat_id=1, text='text') for _ in range(5)),
+            SendMessage(chat_id=2, text='text'),
+        ],
+    )
+
+    # 4 requests to chat 1 wait for a token, chat 2 doesn't wait for them
+    assert time.monotonic() - started >= 0.19
+    assert mock_bot.session.requests[1].chat_id == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_global(slow_bot, message):
+    slow_bot.session.middleware(
+        RateLimitMiddleware(rate=50, chat_rate=1, chat_burst=1, max_retries=0)
+    )
+    add_results(slow_bot, message, 60)
+    broadcaster = Broadcaster(max_concurrency=60)
+
+    started = time.monotonic()
+    await broadcaster.broadcast(
+        slow_bot,
+        (SendMessage(chat_id=chat_id, text='text') for chat_id in range(60)),
+    )
+
+    # 50 pass at once, the other 10 at 50 per second
+    assert time.monotonic() - started >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_retry_after(mock_bot, message):
+    mock_bot.session.middleware(
+        RateLimitMiddleware(rate=1000, chat_rate=1000, chat_burst=10, max_retries=1)
+    )
+    mock_bot.add_result_for(SendMessage, True, message)
+    mock_bot.add_result_for(
+        SendMessage,
+        False,
+        description='Too Many Requests: retry after 1',
+        error_code=429,
+        retry_after=1,
+    )
+
+    started = time.monotonic()
+    result = await mock_bot(SendMessage(chat_id=1, text='text'))
+
+    assert result.message_id == message.message_id
+    assert len(mock_bot.session.requests) == 2
+    assert time.monotonic() - started >= 1
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.coalescer import EditCoalescer
+from test.app.mocked_bot import MockedBot
+
+WINDOW = 0.05
+
+
+def markup(text: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text=text, callback_data='data')]]
+    )
+
+
+def edit_text(text: str, button: str = 'button') -> EditMessageText:
+    return EditMessageText(
+        chat_id=1, message_id=10, text=text, reply_markup=markup(button)
+    )
+
+
+def edit_markup(button: str) -> EditMessageReplyMarkup:
+    return EditMessageReplyMarkup(chat_id=1, message_id=10, reply_markup=markup(button))
+
+
+@pytest.fixture()
+def bot():
+    bot = MockedBot()
+    for _ in range(10):
+        bot.add_result_for(EditMessageText, True, True)
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_first_edit_is_sent_at_once(bot):
+    coalescer = EditCoalescer(WINDOW)
+
+    await coalescer.edit(bot, edit_text('balance: 100'))
+
+    assert len(bot.session.requests) == 1
+    assert bot.session.requests[0].text == 'balance: 100'
+
+
+@pytest.mark.asyncio
+async def test_rapid_edits_are_coalesced(bot):
+    coalescer = EditCoalescer(WINDOW)
+
+    for balance in range(100, 60, -10):
+        await coalescer.edit(bot, edit_text(f'balance: {balance}'))
+    assert len(bot.session.requests) == 1
+
+    await asyncio.sleep(WINDOW * 2)
+
+    assert [request.text for request in bot.session.requests] == [
+        'balance: 100',
+        'balance: 70',
+    ]
+    assert coalescer.stats() == {'sent': 2, 'coalesced': 2, 'skipped': 0}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_edit_is_skipped(bot):
+    coalescer = EditCoalescer(0)
+
+    await coalescer.edit(bot, edit_text('balance: 100'))
+    await coalescer.edit(bot, edit_text('balance: 100'))
+    await coalescer.edit(bot, edit_text('balance: 100', button='other'))
+
+    assert len(bot.session.requests) == 2
+    assert coalescer.stats()['skipped'] == 1
+
+
+@pytest.mark.asyncio
+async def test_markup_edit_keeps_pending_text(bot):
+    coalescer = EditCoalescer(WINDOW)
+
+    await coalescer.edit(bot, edit_text('balance: 100'))
+    await coalescer.edit(bot, edit_text('balance: 90'))
+    await coalescer.edit(bot, edit_markup('✅ button'))
+    await asyncio.sleep(WINDOW * 2)
+
+    last = bot.session.requests[-1]
+    assert len(bot.session.requests) == 2
+    assert last.text == 'balance: 90'
+    assert last.reply_markup == markup('✅ button')
+
+
+@pytest.mark.asyncio
+async def test_discard_drops_pending_edit(bot):
+    coalescer = EditCoalescer(WINDOW)
+
+    await coalescer.edit(bot, edit_markup('first'))
+    await coalescer.edit(bot, edit_markup('second'))
+    coalescer.discard(1, 10)
+    await asyncio.sleep(WINDOW * 2)
+
+    assert len(bot.session.requests) == 1
+
+    # the message was edited directly, the same keyboard is sent again
+    await coalescer.edit(bot, edit_markup('first'))
+    assert len(bot.session.requests) == 2
+    assert coalescer.stats()['skipped'] == 0
+
+
+@pytest.mark.asyncio
+async def test_not_modified_error_is_ignored():
+    bot = MockedBot()
+    bot.add_result_for(
+        EditMessageText,
+        False,
+        description='Bad Request: message is not modified',
+        error_code=400,
+    )
+    coalescer = EditCoalescer(0)
+
+    await coalescer.edit(bot, edit_text('balance: 100'))
+    await coalescer.edit(bot, edit_text('balance: 100'))
+
+    assert len(bot.session.requests) == 1
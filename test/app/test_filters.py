@@ -0,0 +1,20 @@
+import pytest
+
+from app.filters.action import ActionFilter
+from keyboards.schemas import Action, ActionType, get_action_data
+
+ACTION = Action(action_type=ActionType.DEVELOP, planet_id=123, argument=456)
+
+
+@pytest.mark.parametrize(
+    ('call', 'expected'),
+    [
+        (get_action_data(ACTION), {'action': ACTION}),
+        ('develop:123:456', {'action': ACTION}),
+        ('other_planet_info 1 2', False),
+    ],
+    indirect=['call'],
+)
+@pytest.mark.asyncio
+async def test_action_filter(call, expected):
+    assert await ActionFilter()(call) == expected
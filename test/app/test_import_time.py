@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parents[2]
+IMPORT_TIME_BUDGET_MS = int(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+LAZY_MODULES = ('pymorphy3', 'inflect', 'num2words', 'django', 'pandas')
+
+
+@pytest.fixture(scope='module')
+def import_times() -> dict[str, int]:
+    """
+    Cumulative import time in microseconds of every module imported by
+    ``import app.handlers`` in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app.handlers'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize('module', LAZY_MODULES)
+def test_heavy_modules_are_not_imported(import_times, module):
+    assert module not in import_times
+
+
+def test_import_time_budget(import_times):
+    assert import_times['app.handlers'] / 1000 < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,103 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from aiogram import types
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.middlewares import DBMiddleware, I18nMiddleware
+from app.middlewares.throttle import ThrottleMiddleware
+from messages.renderer import get_renderer
+
+
+@pytest.mark.parametrize(
+    ['i18n', 'language_code', 'expected'],
+    [
+        (False, 'en-US', 'ru'),
+        (True, 'en-US', 'en'),
+        (True, 'ru', 'ru'),
+        (True, 'de', 'ru'),
+        (True, None, 'ru'),
+    ],
+)
+@pytest.mark.asyncio
+async def test_i18n_resolves_language(mocker, user, i18n, language_code, expected):
+    mocker.patch('app.middlewares.i18n.feature_config.I18N', i18n)
+    user = user.model_copy(update={'language_code': language_code})
+    handler = AsyncMock()
+    data = {'event_from_user': user}
+
+    await I18nMiddleware(default_language='ru')(handler, None, data)
+
+    handler.assert_awaited_once()
+    assert data['language'] == expected
+    assert data['renderer'] is get_renderer(expected)
+
+
+@pytest.mark.parametrize('call', ['data'], indirect=['call'])
+@pytest.mark.asyncio
+async def test_throttle_uses_renderer_of_update(mocker, user, call):
+    update = types.Update(update_id=1, callback_query=call)
+    answer = mocker.patch.object(types.CallbackQuery, 'answer', new=AsyncMock())
+    handler = AsyncMock()
+    middleware = ThrottleMiddleware(throttle=60, cache_maxsize=10)
+    data = {'event_from_user': user, 'renderer': get_renderer('en')}
+
+    await middleware(handler, update, data)
+    await middleware(handler, update, data)
+
+    handler.assert_awaited_once()
+    answer.assert_awaited_once_with('Slow down, cowboy!', show_alert=False)
+
+
+@pytest.fixture()
+def db_middleware(mocker) -> DBMiddleware:
+    session = mocker.MagicMock(spec=AsyncSession)
+    return DBMiddleware(
+        psql_user_client=mocker.Mock(),
+        psql_game_client=mocker.Mock(),
+        psql_info_client=mocker.Mock(),
+        session_factory=mocker.Mock(return_value=session),
+        redis_actions_client=mocker.Mock(),
+        redis_messages_client=mocker.Mock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_db_middleware_skips_unused_session(db_middleware):
+    handler = AsyncMock()
+
+    await db_middleware(handler, None, {})
+
+    handler.assert_awaited_once()
+    db_middleware.session_factory.assert_not_called()
+    assert db_middleware.stats() == {'updates': 1, 'updates_without_db': 1}
+
+
+@pytest.mark.asyncio
+async def test_db_middleware_commits_used_session(db_middleware):
+    async def handler(event, data):
+        await data['session'].execute('SELECT 1')
+        await data['session'].execute('SELECT 2')
+
+    await db_middleware(handler, None, {})
+
+    session = db_middleware.session_factory.return_value
+    db_middleware.session_factory.assert_called_once()
+    assert session.execute.await_count == 2
+    session.commit.assert_awaited_once()
+    session.close.assert_awaited_once()
+    assert db_middleware.stats() == {'updates': 1, 'updates_without_db': 0}
+
+
+@pytest.mark.asyncio
+async def test_db_middleware_rolls_back_used_session(db_middleware):
+    async def handler(event, data):
+        await data['session'].execute('SELECT 1')
+        raise RuntimeError
+
+    await db_middleware(handler, None, {})
+
+    session = db_middleware.session_factory.return_value
+    session.commit.assert_not_awaited()
+    session.rollback.assert_awaited_once()
+    session.close.assert_awaited_once()
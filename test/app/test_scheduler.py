@@ -0,0 +1,249 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.handlers.round_loop import (
+    end_handler,
+    register_round_handlers,
+    schedule_round,
+)
+from app.scheduler import Scheduler
+from database.schemas import GameDto, GameStatus, PlanetDto
+from game.config import game_config
+from storage.clients.actions import ActionsClient
+from storage.clients.jobs import InMemoryJobStore
+from storage.schemas import Job
+
+POLL_INTERVAL = 0.02
+
+
+async def wait_until(predicate, timeout: float = 2) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+@pytest.fixture()
+def sessions() -> list[MagicMock]:
+    return []
+
+
+@pytest.fixture()
+def session_factory(sessions):
+    def factory():
+        session = MagicMock(spec=AsyncSession)
+        session.__aenter__.return_value = session
+        sessions.append(session)
+        return session
+
+    return factory
+
+
+@pytest.fixture()
+def store() -> InMemoryJobStore:
+    return InMemoryJobStore()
+
+
+@pytest.fixture()
+def scheduler(store, session_factory) -> Scheduler:
+    return Scheduler(store, session_factory, poll_interval=POLL_INTERVAL, bot='bot')
+
+
+@pytest.mark.asyncio
+async def test_job_runs_with_own_session(scheduler, sessions):
+    handler = AsyncMock()
+    scheduler.register('end', handler)
+    await scheduler.start()
+
+    job = await scheduler.schedule(1, 'end', 0.05, {'round': 2})
+    await asyncio.sleep(0.02)
+    handler.assert_not_awaited()
+    await wait_until(lambda: handler.await_count)
+    await scheduler.close()
+
+    handler.assert_awaited_once_with(job, session=sessions[0], bot='bot')
+    sessions[0].commit.assert_awaited_once()
+    assert scheduler.stats()['run'] == 1
+    assert scheduler.stats()['max_drift'] < 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_many_games_share_scheduler(scheduler, store):
+    handler = AsyncMock()
+    scheduler.register('middle_5', handler)
+    await scheduler.start()
+
+    for game_id in range(50):
+        await scheduler.schedule(game_id, 'middle_5', 0.01)
+    await wait_until(lambda: handler.await_count == 50)
+    await scheduler.close()
+
+    assert store.jobs == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_rolled_back(scheduler, sessions):
+    scheduler.register('end', AsyncMock(side_effect=RuntimeError))
+    await scheduler.start()
+
+    await scheduler.schedule(1, 'end', 0)
+    await wait_until(lambda: scheduler.failed)
+    await scheduler.close()
+
+    sessions[0].rollback.assert_awaited_once()
+    assert scheduler.stats()['failed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_game(scheduler, store):
+    handler = AsyncMock()
+    scheduler.register('end', handler)
+    await scheduler.schedule(1, 'end', 0.05)
+    await scheduler.schedule(2, 'end', 0.05)
+
+    assert await scheduler.cancel(1) == 1
+    assert [job.game_id for job in store.jobs.values()] == [2]
+
+
+@pytest.mark.asyncio
+async def test_schedule_unknown_kind(scheduler):
+    with pytest.raises(ValueError, match='No handler'):
+        await scheduler.schedule(1, 'unknown', 0)
+
+
+@pytest.mark.asyncio
+async def test_restart_recovers_overdue_end(scheduler, store):
+    # jobs left by a process that was down when they were due
+    overdue = time.time() - 60
+    await store.add(Job(game_id=1, kind='middle_9', run_at=overdue))
+    await store.add(Job(game_id=1, kind='end', run_at=overdue))
+    middle, end = AsyncMock(), AsyncMock()
+    scheduler.register('middle_9', middle)
+    scheduler.register('end', end, recover=True)
+
+    await scheduler.start()
+    await wait_until(lambda: end.await_count)
+    await scheduler.close()
+
+    middle.assert_not_awaited()
+    end.assert_awaited_once()
+    stats = scheduler.stats()
+    assert (stats['recovered'], stats['dropped']) == (1, 1)
+    assert stats['max_drift'] >= 60
+
+
+@pytest.mark.asyncio
+async def test_schedule_round(scheduler, store):
+    register_round_handlers(scheduler)
+    game = GameDto(id=1, status=GameStatus.ROUND, round=3, num_planets=3)
+
+    await schedule_round(scheduler, game, 'en')
+
+    jobs = sorted(store.jobs.values(), key=lambda job: job.run_at)
+    assert [job.kind for job in jobs] == ['middle_5', 'middle_9', 'end']
+    assert all(job.payload == {'round': 3, 'language': 'en'} for job in jobs)
+    assert scheduler.recoverable == {'end'}
+
+
+@pytest.mark.asyncio
+async def test_end_of_finished_round_is_skipped(mocker, scheduler, store):
+    register_round_handlers(scheduler)
+    game_client = mocker.Mock()
+    game_client.get_game = AsyncMock(
+        return_value=GameDto(id=1, status=GameStatus.ROUND, round=4, num_planets=3)
+    )
+    scheduler.context.update(
+        game_client=game_client,
+        actions_client=mocker.Mock(),
+        info_client=mocker.Mock(),
+        messages_client=mocker.Mock(),
+    )
+    await scheduler.start()
+
+    await scheduler.schedule(1, 'end', 0, {'round': 3, 'language': 'ru'})
+    await wait_until(lambda: scheduler.run)
+    await scheduler.close()
+
+    game_client.get_game.assert_awaited_once()
+    game_client.get_planets_of_game.assert_not_called()
+    assert scheduler.stats()['failed'] == 0
+
+
+@pytest.mark.asyncio
+async def test_end_keeps_expired_balances(mocker):
+    mocker.patch('app.handlers.round_loop.broadcaster.broadcast')
+    game = GameDto(id=1, status=GameStatus.ROUND, round=2, num_planets=2)
+    planets = [
+        PlanetDto(id=1, name='Земля', game_id=1, balance=700, meteorites=3),
+        PlanetDto(id=2, name='Марс', game_id=1, balance=400, meteorites=1),
+    ]
+    game_client = mocker.AsyncMock()
+    game_client.get_game.return_value = game
+    game_client.get_planets_of_game.return_value = planets
+    game_client.get_all_active_players.return_value = []
+    game_client.get_all_active_admins.return_value = []
+    actions_client = ActionsClient(FakeAsyncRedis(), 100, game_config)
+    # the keys of the second planet have expired
+    await actions_client.set_balance(1, 900, actions_client.MONEY_KEY)
+    await actions_client.set_balance(1, 0, actions_client.METEORITES_KEY)
+    session = MagicMock(spec=AsyncSession)
+
+    await end_handler(
+        Job(game_id=1, kind='end', run_at=0, payload={'round': 2, 'language': 'ru'}),
+        bot='bot',
+        game_client=game_client,
+        actions_client=actions_client,
+        info_client=mocker.AsyncMock(),
+        messages_client=mocker.AsyncMock(),
+        session=session,
+    )
+
+    assert game_client.update_planet_balance.await_args_list == [
+        mocker.call(session, 1, 900, 0),
+        mocker.call(session, 2, 400, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recovered_end_without_state_keeps_balances(
+    mocker, caplog, scheduler, store
+):
+    mocker.patch('app.handlers.round_loop.broadcaster.broadcast')
+    register_round_handlers(scheduler)
+    game_client = mocker.AsyncMock()
+    game_client.get_game.return_value = GameDto(
+        id=1, status=GameStatus.ROUND, round=2, num_planets=1
+    )
+    game_client.get_planets_of_game.return_value = [
+        PlanetDto(id=1, name='Земля', game_id=1, balance=700, meteorites=3)
+    ]
+    game_client.get_all_active_players.return_value = []
+    game_client.get_all_active_admins.return_value = []
+    scheduler.context.update(
+        game_client=game_client,
+        # the bot was down longer than the keys live
+        actions_client=ActionsClient(FakeAsyncRedis(), 100, game_config),
+        info_client=mocker.AsyncMock(),
+        messages_client=mocker.AsyncMock(),
+    )
+    await store.add(
+        Job(
+            game_id=1,
+            kind='end',
+            run_at=time.time() - 3600,
+            payload={'round': 2, 'language': 'ru'},
+        )
+    )
+
+    await scheduler.start()
+    await wait_until(lambda: scheduler.run)
+    await scheduler.close()
+
+    assert scheduler.stats()['recovered'] == 1
+    game_client.update_planet_balance.assert_awaited_once_with(mocker.ANY, 1, 700, 3)
+    game_client.end_current_round.assert_awaited_once()
+    assert 'State of round 2 of game 1 has expired' in caplog.text
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import random
+from collections import defaultdict
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from aiogram.types import Update
+
+from app.webhook import SECRET_TOKEN_HEADER, UpdatePipeline, WebhookApp
+
+PATH = '/webhook'
+SECRET = 'secret'
+
+
+def make_update(update_id: int, chat_id: int) -> dict:
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Nikita'},
+            'text': str(update_id),
+        },
+    }
+
+
+class RecordingDispatcher:
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.handled: dict[int, list[int]] = defaultdict(list)
+
+    async def feed_update(self, bot, update: Update) -> None:
+        await asyncio.sleep(random.uniform(0, self.latency))
+        self.handled[update.message.chat.id].append(update.update_id)
+
+
+async def request(
+    app: WebhookApp,
+    method: str,
+    path: str,
+    body: bytes = b'',
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> tuple[int, bytes]:
+    scope = {'type': 'http', 'method': method, 'path': path, 'headers': headers or []}
+    receive = AsyncMock(return_value={'type': 'http.request', 'body': body})
+    send = AsyncMock()
+
+    await app(scope, receive, send)
+
+    start, response = (call.args[0] for call in send.await_args_list)
+    return start['status'], response['body']
+
+
+def post_update(app: WebhookApp, update: dict, secret: str = SECRET):
+    return request(
+        app,
+        'POST',
+        PATH,
+        json.dumps(update).encode(),
+        [(SECRET_TOKEN_HEADER, secret.encode())],
+    )
+
+
+@pytest.mark.asyncio
+async def test_updates_of_chat_stay_ordered():
+    random.seed(0)
+    dp = RecordingDispatcher(latency=0.005)
+    pipeline = UpdatePipeline(dp, Mock(), workers=4, queue_size=100)
+    await pipeline.start()
+
+    updates = [make_update(update_id, update_id % 10) for update_id in range(200)]
+    for update in updates:
+        assert await pipeline.put(Update.model_validate(update))
+    await pipeline.close()
+
+    assert sum(map(len, dp.handled.values())) == 200
+    for chat_id, update_ids in dp.handled.items():
+        assert update_ids == list(range(chat_id, 200, 10))
+    stats = pipeline.get_stats()
+    assert stats['processed'] == 200
+    assert stats['depth'] == 0
+    assert 0 < stats['max_depth'] <= 100
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_update():
+    pipeline = UpdatePipeline(
+        RecordingDispatcher(), Mock(), workers=2, queue_size=2, enqueue_timeout=0.01
+    )
+
+    # the workers aren't started, so the queue of chat 1 fills up
+    assert await pipeline.put(Update.model_validate(make_update(1, 1)))
+    assert not await pipeline.put(Update.model_validate(make_update(2, 1)))
+    assert await pipeline.put(Update.model_validate(make_update(3, 2)))
+
+    stats = pipeline.get_stats()
+    assert (stats['received'], stats['rejected'], stats['depth']) == (3, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_webhook_queues_update():
+    dp = RecordingDispatcher()
+    pipeline = UpdatePipeline(dp, Mock(), workers=2)
+    app = WebhookApp(pipeline, PATH, secret_token=SECRET)
+    await pipeline.start()
+
+    assert await post_update(app, make_update(1, 42)) == (200, b'{}')
+    await pipeline.close()
+
+    assert dp.handled == {42: [1]}
+
+
+@pytest.mark.asyncio
+async def test_webhook_responses():
+    pipeline = UpdatePipeline(
+        RecordingDispatcher(), Mock(), workers=1, queue_size=1, enqueue_timeout=0
+    )
+    app = WebhookApp(pipeline, PATH, secret_token=SECRET)
+
+    assert (await post_update(app, make_update(1, 1), secret='wrong'))[0] == 401
+    assert (await request(app, 'POST', PATH, make_update(1, 1)))[0] == 401
+    assert (await post_update(app, {'update_id': 'x'}))[0] == 400
+    headers = [(SECRET_TOKEN_HEADER, SECRET.encode())]
+    assert (await request(app, 'POST', PATH, b'{', headers))[0] == 400
+    assert (await post_update(app, make_update(1, 1)))[0] == 200
+    assert (await post_update(app, make_update(2, 1)))[0] == 503
+    assert (await request(app, 'GET', PATH))[0] == 405
+    assert (await request(app, 'GET', '/other'))[0] == 404
+
+    assert (await request(app, 'GET', '/stats'))[0] == 401
+    status, body = await request(app, 'GET', '/stats', headers=headers)
+    assert status == 200
+    assert json.loads(body)['rejected'] == 1
+
+
+@pytest.mark.asyncio
+async def test_close_drops_updates_of_hung_handler():
+    async def hang(bot, update: Update) -> None:
+        await asyncio.Event().wait()
+
+    dp = Mock(feed_update=AsyncMock(side_effect=hang))
+    pipeline = UpdatePipeline(dp, Mock(), workers=1, shutdown_timeout=0.05)
+    await pipeline.start()
+    await pipeline.put(Update.model_validate(make_update(1, 1)))
+    await pipeline.put(Update.model_validate(make_update(2, 1)))
+
+    async with asyncio.timeout(1):
+        await pipeline.close()
+
+    assert dp.feed_update.await_count == 1
+    assert pipeline.depth == 1
+    assert not pipeline._workers
+
+
+@pytest.mark.asyncio
+async def test_lifespan():
+    pipeline = UpdatePipeline(RecordingDispatcher(), Mock(), workers=2)
+    on_startup, on_shutdown = AsyncMock(), AsyncMock()
+    app = WebhookApp(pipeline, PATH, on_startup=on_startup, on_shutdown=on_shutdown)
+    receive = AsyncMock(
+        side_effect=[{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    )
+    send = AsyncMock()
+
+    await app({'type': 'lifespan'}, receive, send)
+
+    on_startup.assert_awaited_once()
+    on_shutdown.assert_awaited_once()
+    assert [call.args[0]['type'] for call in send.await_args_list] == [
+        'lifespan.startup.complete',
+        'lifespan.shutdown.complete',
+    ]
@@ -0,0 +1,120 @@
+"""
+Game creation benchmark for ``GameClient.create_game``.
+
+Creates games from a synthetic pack with the bulk implementation and with the
+previous one that flushed every planet separately, reporting the number of
+executed statements and the wall time. Everything runs in a transaction that
+is rolled back at the end. Requires a running Postgres configured through the
+usual ``DATABASE_*`` variables.
+
+Usage:
+    python -m test.database.bench_create_game
+    python -m test.database.bench_create_game --planets 100 --cities 10 --games 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import engine
+from database.clients import GameClient
+from database.models import Admin, City, Game, Planet
+from packs.pack import Pack, PackCity, PackPlanet
+
+ADMIN_ID = -1
+
+
+async def per_planet_create_game(
+    game_client: GameClient, s: AsyncSession, admin_id: int, pack: Pack
+) -> None:
+    """
+    The previous implementation: a flush per planet to get its id.
+    """
+    game = Game(num_planets=len(pack.planets))
+    s.add(game)
+    await s.flush()
+    for _planet in pack.planets:
+        planet = Planet(name=_planet.name, game_id=game.id)
+        s.add(planet)
+        await s.flush()
+        for _city in _planet.cities:
+            s.add(City(name=_city.name, planet_id=planet.id))
+        await s.flush()
+
+    await s.execute(
+        update(Admin).where(Admin.tg_id == admin_id).values(game_id=game.id)
+    )
+
+
+async def bulk_create_game(
+    game_client: GameClient, s: AsyncSession, admin_id: int, pack: Pack
+) -> None:
+    await game_client.create_game(s, admin_id, pack)
+    await s.flush()
+
+
+def synthetic_pack(planets: int, cities: int) -> Pack:
+    return Pack(
+        name='bench',
+        planets=[
+            PackPlanet(
+                name=f'Planet{i}',
+                cities=[PackCity(name=f'City{i}_{j}') for j in range(cities)],
+            )
+            for i in range(planets)
+        ],
+    )
+
+
+async def run(planets: int, cities: int, games: int) -> None:
+    counter = [0]
+
+    def count_statement(*args):
+        counter[0] += 1
+
+    game_client = GameClient()
+    pack = synthetic_pack(planets, cities)
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_statement)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        s = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            s.add(Admin(tg_id=ADMIN_ID))
+            await s.flush()
+            for name, create_game in (
+                ('per-planet', per_planet_create_game),
+                ('bulk', bulk_create_game),
+            ):
+                timings = []
+                statements = []
+                for _ in range(games):
+                    counter[0] = 0
+                    started = time.perf_counter()
+                    await create_game(game_client, s, ADMIN_ID, pack)
+                    timings.append(time.perf_counter() - started)
+                    statements.append(counter[0])
+                    s.expunge_all()
+                print(
+                    f'{planets}x{cities}, {name:>10}: '
+                    f'{statistics.median(statements):>5.0f} statements, '
+                    f'median {statistics.median(timings) * 1000:.2f} ms, '
+                    f'max {max(timings) * 1000:.2f} ms'
+                )
+        finally:
+            await s.close()
+            await transaction.rollback()
+            event.remove(engine.sync_engine, 'before_cursor_execute', count_statement)
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=100)
+    parser.add_argument('--cities', type=int, default=10)
+    parser.add_argument('--games', type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.planets, args.cities, args.games))
@@ -0,0 +1,236 @@
+"""
+Round resolution benchmark for ``GameClient.end_current_round``.
+
+Creates games with the given numbers of planets and random orders, then
+resolves the same rounds with the set-based implementation and with the
+previous per-planet one, reporting the number of executed statements and the
+wall time. Everything runs in a transaction that is rolled back at the end.
+Requires a running Postgres configured through the usual ``DATABASE_*``
+variables.
+
+Usage:
+    python -m test.database.bench_end_round
+    python -m test.database.bench_end_round --planets 4 10 50 --rounds 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import event, not_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import engine
+from database.clients import GameClient
+from database.models import City, Game, Planet
+from database.schemas import GameStatus, SanctionDto
+from game.config import game_config
+from game.schemas import OrderInfo, OrderType
+
+CITIES_PER_PLANET = 4
+
+EndRound = Callable[[GameClient, AsyncSession, int, dict[int, OrderInfo]], Awaitable]
+
+
+async def per_planet_end_current_round(
+    game_client: GameClient,
+    s: AsyncSession,
+    game_id: int,
+    orders: dict[int, OrderInfo],
+) -> None:
+    """
+    The previous implementation: one update per planet plus one statement
+    per kind of order.
+    """
+    game = await s.get(Game, game_id)
+    game_client._save_orders(s, game, orders)
+    sanctions = []
+    invented = []
+    by_action = {OrderType.ATTACK: [], OrderType.DEVELOP: [], OrderType.SHIELD: []}
+    for planet_id, order_info in orders.items():
+        await s.execute(
+            update(Planet)
+            .where(Planet.id == planet_id)
+            .values({Planet.balance: Planet.balance + Planet.income})
+        )
+        if created := order_info.get(OrderType.CREATE, 0):
+            planet = await s.get(Planet, planet_id)
+            planet.meteorites += created
+        sanctions.extend(
+            SanctionDto(planet_from=planet_id, planet_to=other, num_round=game.round)
+            for other in order_info.get(OrderType.SANCTIONS, [])
+        )
+        if order_info.get(OrderType.INVENT, False):
+            invented.append(planet_id)
+        for action, objs in by_action.items():
+            objs.extend(order_info.get(action, []))
+
+    if shielded := by_action[OrderType.SHIELD]:
+        await s.execute(
+            update(City).where(City.id.in_(shielded)).values(is_shielded=True)
+        )
+    if developed := by_action[OrderType.DEVELOP]:
+        await s.execute(
+            update(City)
+            .where(City.id.in_(developed))
+            .values(
+                {City.development: City.development + game_config.DEVELOPMENT_BOOST}
+            )
+        )
+    if invented:
+        await s.execute(
+            update(Planet).where(Planet.id.in_(invented)).values(is_invented=True)
+        )
+    await game_client.send_sanctions(s, sanctions)
+    attacks = Counter(by_action[OrderType.ATTACK])
+    once_attacked = [city_id for city_id, n in attacks.items() if n == 1]
+    twice_attacked = [city_id for city_id, n in attacks.items() if n > 1]
+    if twice_attacked:
+        await s.execute(
+            update(City)
+            .where(City.id.in_(twice_attacked))
+            .values(development=0, is_shielded=False)
+        )
+    if once_attacked:
+        await s.execute(
+            update(City)
+            .where(City.id.in_(once_attacked), not_(City.is_shielded))
+            .values(development=0)
+        )
+        await s.execute(
+            update(City)
+            .where(City.id.in_(once_attacked), City.is_shielded)
+            .values(is_shielded=False)
+        )
+    values = {Game.status: GameStatus.MEETING}
+    if delta := game_client._eco_delta(orders):
+        values[Game.ecorate] = game_client._updated_ecorate(delta)
+    await s.execute(update(Game).where(Game.id == game_id).values(values))
+
+
+async def set_based_end_current_round(
+    game_client: GameClient,
+    s: AsyncSession,
+    game_id: int,
+    orders: dict[int, OrderInfo],
+) -> None:
+    await game_client.end_current_round(s, game_id, orders)
+
+
+async def create_game(
+    s: AsyncSession, planets: int
+) -> tuple[int, dict[int, list[int]]]:
+    game = Game(status=GameStatus.WAITING, num_planets=planets, round=0)
+    s.add(game)
+    await s.flush()
+    planet_objs = [Planet(name=f'Planet{i}', game_id=game.id) for i in range(planets)]
+    s.add_all(planet_objs)
+    await s.flush()
+    city_objs = {
+        planet.id: [
+            City(name=f'City{planet.id}_{i}', planet_id=planet.id)
+            for i in range(CITIES_PER_PLANET)
+        ]
+        for planet in planet_objs
+    }
+    s.add_all(city for cities in city_objs.values() for city in cities)
+    await s.flush()
+    cities = {
+        planet_id: [city.id for city in objs] for planet_id, objs in city_objs.items()
+    }
+    return game.id, cities
+
+
+def random_orders(
+    rng: random.Random, cities: dict[int, list[int]]
+) -> dict[int, OrderInfo]:
+    orders = {}
+    for planet_id, own_cities in cities.items():
+        others = [other for other in cities if other != planet_id]
+        other_cities = [city for other in others for city in cities[other]]
+        orders[planet_id] = {
+            OrderType.SHIELD: rng.sample(own_cities, 1),
+            OrderType.DEVELOP: rng.sample(own_cities, 2),
+            OrderType.ATTACK: rng.sample(other_cities, 1),
+            OrderType.SANCTIONS: rng.sample(others, 1),
+            OrderType.CREATE: rng.randint(0, 2),
+            OrderType.INVENT: rng.random() < 0.2,
+            OrderType.ECO: rng.random() < 0.3,
+        }
+    return orders
+
+
+async def measure(
+    end_round: EndRound,
+    s: AsyncSession,
+    game_id: int,
+    rounds: list[dict[int, OrderInfo]],
+    counter: list[int],
+) -> tuple[list[float], list[int]]:
+    game_client = GameClient()
+    timings = []
+    statements = []
+    for orders in rounds:
+        await s.execute(
+            update(Game)
+            .where(Game.id == game_id)
+            .values({Game.status: GameStatus.ROUND, Game.round: Game.round + 1})
+        )
+        s.expire_all()
+        await s.flush()
+        counter[0] = 0
+        started = time.perf_counter()
+        await end_round(game_client, s, game_id, orders)
+        await s.flush()
+        timings.append(time.perf_counter() - started)
+        statements.append(counter[0])
+    return timings, statements
+
+
+async def run(planet_numbers: list[int], rounds: int, seed: int) -> None:
+    counter = [0]
+
+    def count_statement(*args):
+        counter[0] += 1
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', count_statement)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        s = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            for planets in planet_numbers:
+                for name, end_round in (
+                    ('per-planet', per_planet_end_current_round),
+                    ('set-based', set_based_end_current_round),
+                ):
+                    # the same orders for both implementations
+                    rng = random.Random(seed)
+                    game_id, cities = await create_game(s, planets)
+                    round_orders = [random_orders(rng, cities) for _ in range(rounds)]
+                    timings, statements = await measure(
+                        end_round, s, game_id, round_orders, counter
+                    )
+                    print(
+                        f'{planets:>3} planets, {name:>10}: '
+                        f'{statistics.median(statements):>5.0f} statements, '
+                        f'median {statistics.median(timings) * 1000:.2f} ms, '
+                        f'max {max(timings) * 1000:.2f} ms'
+                    )
+        finally:
+            await s.close()
+            await transaction.rollback()
+            event.remove(engine.sync_engine, 'before_cursor_execute', count_statement)
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, nargs='+', default=[4, 10, 50])
+    parser.add_argument('--rounds', type=int, default=game_config.ROUND_NUM)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.planets, args.rounds, args.seed))
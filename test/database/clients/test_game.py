@@ -1,8 +1,6 @@
-import asyncio
-
 import pytest
 from pytest_lazy_fixtures import lf
-from sqlalchemy import select
+from sqlalchemy import event, select
 
 from database.models import (
     Admin,
@@ -63,6 +61,28 @@ async def test_create_game(game_client, session, admin_id, pack, num_planets):
             assert orm_city
 
 
+@pytest.mark.asyncio
+async def test_create_game_statements(game_client, session, admin_id, pack):
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args)
+
+    async def count_creation(number_of_planets: int) -> int:
+        statements.clear()
+        await game_client.create_game(session, admin_id, pack, number_of_planets)
+        await session.commit()
+        return len(statements)
+
+    event.listen(session.bind.sync_engine, 'before_cursor_execute', count_statement)
+    try:
+        assert await count_creation(1) == await count_creation(len(pack.planets))
+    finally:
+        event.remove(
+            session.bind.sync_engine, 'before_cursor_execute', count_statement
+        )
+
+
 @pytest.mark.asyncio
 async def test_end_game(game_client, session, game_id, player_ids, admin_id):
     admin = await session.get(Admin, admin_id)
@@ -113,9 +133,27 @@ async def test_get_all_active_admins(
     assert result[0].tg_id == admin_id
 
 
+async def end_round(game_client, session, game_id, orders_info) -> None:
+    game = await session.get(Game, game_id)
+    game.round = 1
+    game.status = GameStatus.ROUND
+    await session.commit()
+
+    result = await game_client.end_current_round(session, game_id, orders_info)
+    await session.commit()
+    assert result == FailureReason.SUCCESS
+
+
 @pytest.mark.asyncio
-async def test_build_shield_for_cities(game_client, session, city_id, city_id_2):
-    await game_client.build_shield_for_cities(session, city_id, city_id_2)
+async def test_round_shields_cities(
+    game_client, session, game_id, planet_id, city_id, city_id_2
+):
+    await end_round(
+        game_client,
+        session,
+        game_id,
+        {planet_id: {OrderType.SHIELD: [city_id, city_id_2]}},
+    )
 
     city1 = await session.get(City, city_id)
     city2 = await session.get(City, city_id_2)
@@ -125,24 +163,41 @@ async def test_build_shield_for_cities(game_client, session, city_id, city_id_2)
 
 
 @pytest.mark.asyncio
-async def test_develop_cities(game_client, session, city_id, city_id_2):
+async def test_round_develops_cities(
+    game_client, session, game_id, planet_id, city_id, city_id_2
+):
     city1 = await session.get(City, city_id)
     city2 = await session.get(City, city_id_2)
     development1 = city1.development
     development2 = city2.development
 
-    await game_client.develop_cities(session, city_id, city_id_2)
+    await end_round(
+        game_client,
+        session,
+        game_id,
+        {planet_id: {OrderType.DEVELOP: [city_id, city_id_2]}},
+    )
 
-    city1 = await session.get(City, city_id)
-    city2 = await session.get(City, city_id_2)
+    await session.refresh(city1)
+    await session.refresh(city2)
 
     assert city1.development - development1 == game_config.DEVELOPMENT_BOOST
     assert city2.development - development2 == game_config.DEVELOPMENT_BOOST
 
 
 @pytest.mark.asyncio
-async def test_invent_for_planets(game_client, session, planet_id, planet_id_2):
-    await game_client.invent_for_planets(session, planet_id, planet_id_2)
+async def test_round_invents_for_planets(
+    game_client, session, game_id, planet_id, planet_id_2
+):
+    await end_round(
+        game_client,
+        session,
+        game_id,
+        {
+            planet_id: {OrderType.INVENT: True},
+            planet_id_2: {OrderType.INVENT: True},
+        },
+    )
 
     planet = await session.get(Planet, planet_id)
     planet_2 = await session.get(Planet, planet_id_2)
@@ -155,32 +210,47 @@ async def test_invent_for_planets(game_client, session, planet_id, planet_id_2):
     ['num_to_create', 'meteorites', 'result'], [(1, 2, 3), (2, 2, 4)]
 )
 @pytest.mark.asyncio
-async def test_create_meteorites(
-    game_client, session, planet_id, num_to_create, meteorites, result
+async def test_round_creates_meteorites(
+    game_client, session, game_id, planet_id, num_to_create, meteorites, result
 ):
     planet = await session.get(Planet, planet_id)
     planet.meteorites = meteorites
     await session.commit()
 
-    await game_client.create_meteorites(session, planet_id, num_to_create)
+    await end_round(
+        game_client, session, game_id, {planet_id: {OrderType.CREATE: num_to_create}}
+    )
 
-    planet = await session.get(Planet, planet_id)
+    await session.refresh(planet)
     assert planet.meteorites == result
 
 
 @pytest.mark.asyncio
-async def test_attack_cities(
-    game_client, session, city_id, city_id_2, city_id_3, game_id
+async def test_round_attacks_cities(
+    game_client,
+    session,
+    game_id,
+    planet_id,
+    planet_id_2,
+    city_id,
+    city_id_2,
+    city_id_3,
 ):
     city1 = await session.get(City, city_id)
     city2 = await session.get(City, city_id_2)
-    game = await session.get(Game, game_id)
-    game.round = 1
     city1.is_shielded = True
     city2.is_shielded = True
     await session.commit()
 
-    await game_client.attack_cities(session, city_id, city_id, city_id_2, city_id_3)
+    await end_round(
+        game_client,
+        session,
+        game_id,
+        {
+            planet_id: {OrderType.ATTACK: [city_id, city_id_2]},
+            planet_id_2: {OrderType.ATTACK: [city_id, city_id_3]},
+        },
+    )
 
     await session.refresh(city1)
     await session.refresh(city2)
@@ -216,7 +286,7 @@ async def test_attack_cities(
     ],
 )
 @pytest.mark.asyncio
-async def test_eco_update(
+async def test_round_updates_eco_rate(
     game_client,
     session,
     game_id,
@@ -228,9 +298,9 @@ async def test_eco_update(
     game.ecorate = initial_eco_rate
     await session.commit()
 
-    await game_client.eco_update(session, game_id, orders_info)
+    await end_round(game_client, session, game_id, orders_info)
 
-    game = await session.get(Game, game_id)
+    await session.refresh(game)
     assert game.ecorate == expected_eco_rate
 
 
@@ -276,7 +346,7 @@ async def test_transfer(
 
 @pytest.mark.asyncio
 async def test_end_current_round(
-    game_client, session, mocker, planet_id, planet_id_2, game_id, city_id
+    game_client, session, planet_id, planet_id_2, game_id, city_id
 ):
     orders_info = {
         planet_id: {
@@ -287,10 +357,15 @@ async def test_end_current_round(
             OrderType.ECO: True,
         },
         planet_id_2: {
-            OrderType.ATTACK: [city_id],
+            OrderType.ATTACK: [city_id, 13],
             OrderType.CREATE: 2,
             OrderType.ECO: True,
         },
+        3: {
+            OrderType.ATTACK: [13],
+            OrderType.DEVELOP: [10],
+        },
+        4: {},
     }
 
     orders = [
@@ -307,53 +382,92 @@ async def test_end_current_round(
     game = await session.get(Game, game_id)
     game.round = 2
     game.status = GameStatus.ROUND
+    session.add(Sanction(planet_from=3, planet_to=planet_id_2, num_round=1))
     await session.commit()
 
-    mock_future = asyncio.Future()
-    mock_future.set_result(None)
-
-    mock_create_meteorites = mocker.patch.object(
-        game_client, 'create_meteorites', return_value=mock_future
-    )
-    mock_develop_cities = mocker.patch.object(
-        game_client, 'develop_cities', return_value=mock_future
-    )
-    mock_attack_cities = mocker.patch.object(
-        game_client, 'attack_cities', return_value=mock_future
-    )
-    mock_build_shield_for_cities = mocker.patch.object(
-        game_client, 'build_shield_for_cities', return_value=mock_future
-    )
-    mock_invent_for_planets = mocker.patch.object(
-        game_client, 'invent_for_planets', return_value=mock_future
-    )
-    mock_send_sanctions = mocker.patch.object(
-        game_client, 'send_sanctions', return_value=mock_future
-    )
-    mock_eco_update = mocker.patch.object(
-        game_client, 'eco_update', return_value=mock_future
-    )
-
-    await game_client.end_current_round(session, game_id, orders_info)
+    result = await game_client.end_current_round(session, game_id, orders_info)
     await session.commit()
+    assert result == FailureReason.SUCCESS
 
     for order in orders:
         result = await session.get(Order, order.model_dump())
         assert result is not None
 
-    mock_create_meteorites.assert_any_call(session, planet_id_2, 2)
-    mock_develop_cities.assert_any_call(session, city_id)
-    mock_attack_cities.assert_any_call(session, city_id)
-    mock_build_shield_for_cities.assert_any_call(session, city_id)
-    mock_invent_for_planets.assert_any_call(session, planet_id)
-    mock_send_sanctions.assert_any_call(
-        session,
-        [SanctionDto(planet_from=planet_id, planet_to=planet_id_2, num_round=2)],
+    assert await session.get(
+        Sanction, {'planet_from': planet_id, 'planet_to': planet_id_2, 'num_round': 2}
     )
-    mock_eco_update.assert_called_once_with(session, game_id, orders_info)
+
+    # 4 cities with development 60 and eco rate 95 bring 171 each
+    planets = (
+        await session.execute(select(Planet).order_by(Planet.id))
+    ).scalars().all()
+    assert [planet.balance - game_config.DEFAULT_BALANCE for planet in planets] == [
+        684,
+        round(684 * (1 - game_config.SANCTIONS_IMPACT / 4)),
+        684,
+        684,
+    ]
+    assert [planet.meteorites for planet in planets] == [0, 2, 0, 0]
+    assert [planet.is_invented for planet in planets] == [True, False, False, False]
+
+    # shielded city attacked once keeps its development, but loses the shield
+    city = await session.get(City, city_id)
+    assert city.development == 60 + game_config.DEVELOPMENT_BOOST
+    assert not city.is_shielded
+    city = await session.get(City, 10)
+    assert city.development == 60 + game_config.DEVELOPMENT_BOOST
+    city = await session.get(City, 13)
+    assert city.development == 0
 
     game = await session.get(Game, game_id)
     assert game.status == GameStatus.MEETING
+    assert game.ecorate == 100
+
+
+@pytest.mark.asyncio
+async def test_end_current_round_statements(
+    game_client, session, game_id, planet_ids
+):
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args)
+
+    async def count_round(orders_info) -> int:
+        game = await session.get(Game, game_id)
+        game.round = 1 if game.round is None else game.round + 1
+        game.status = GameStatus.ROUND
+        await session.commit()
+
+        statements.clear()
+        await game_client.end_current_round(session, game_id, orders_info)
+        await session.commit()
+        return len(statements)
+
+    event.listen(session.bind.sync_engine, 'before_cursor_execute', count_statement)
+    try:
+        one_planet = await count_round(
+            {1: {OrderType.DEVELOP: [1], OrderType.ATTACK: [5], OrderType.CREATE: 1}}
+        )
+        all_planets = await count_round(
+            {
+                planet_id: {
+                    OrderType.DEVELOP: [4 * planet_id - 3, 4 * planet_id],
+                    OrderType.ATTACK: [4 * (planet_id % 4) + 1],
+                    OrderType.SANCTIONS: [planet_id % 4 + 1],
+                    OrderType.CREATE: 1,
+                    OrderType.INVENT: True,
+                }
+                for planet_id in planet_ids
+            }
+        )
+    finally:
+        event.remove(
+            session.bind.sync_engine, 'before_cursor_execute', count_statement
+        )
+
+    # the single planet round has no sanctions to insert
+    assert all_planets == one_planet + 1
 
 
 @pytest.mark.parametrize(
@@ -505,6 +619,33 @@ async def test_get_planets_imposed_sanctions(
     assert sanctioned_ids == expected_result
 
 
+@pytest.mark.asyncio
+async def test_get_imposed_sanctions_of_game(
+    game_client, session, planet_id, planet_id_2, planet_id_3, game_id
+):
+    game = await session.get(Game, game_id)
+    game.round = 3
+    session.add_all(
+        [
+            Sanction(planet_from=planet_id_3, planet_to=planet_id, num_round=2),
+            Sanction(planet_from=planet_id_2, planet_to=planet_id, num_round=2),
+            Sanction(planet_from=planet_id, planet_to=planet_id_2, num_round=2),
+            Sanction(planet_from=planet_id_3, planet_to=planet_id_2, num_round=1),
+        ]
+    )
+    await session.commit()
+
+    result = await game_client.get_imposed_sanctions_of_game(session, game_id)
+    sanctioned_ids = {
+        planet_to: [planet.id for planet in planets]
+        for planet_to, planets in result.items()
+    }
+    assert sanctioned_ids == {
+        planet_id: [planet_id_2, planet_id_3],
+        planet_id_2: [planet_id],
+    }
+
+
 @pytest.mark.parametrize(
     ('money', 'meteorites', 'result'),
     [
@@ -1,8 +1,11 @@
+import asyncio
+import time
 from unittest.mock import AsyncMock
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from database.alru_cache import alru_cache, get_cache_stats
 from database.schemas import GameDto
 
 
@@ -53,3 +56,158 @@ async def test_cache_clear(database_client):
     await database_client.get_game(mock_session, 2)
 
     assert mock_session.get.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tag(database_client):
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.get.side_effect = lambda model, game_id: GameDto(
+        id=game_id, num_planets=2
+    )
+
+    await database_client.get_game(mock_session, 1)
+    await database_client.get_game(mock_session, 2)
+    database_client.get_game.invalidate_tag(1)
+    await database_client.get_game(mock_session, 1)
+    await database_client.get_game(mock_session, 2)
+
+    assert [call.args[1] for call in mock_session.get.await_args_list] == [1, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_clear_game_cache_keeps_other_games(database_client):
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.get.side_effect = lambda model, game_id: GameDto(
+        id=game_id, num_planets=2
+    )
+
+    await database_client.get_game(mock_session, 1)
+    await database_client.get_game(mock_session, 2)
+    database_client._clear_game_cache(2)
+    await database_client.get_game(mock_session, 1)
+
+    assert mock_session.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_single_flight(database_client, game_id):
+    mock_session = AsyncMock(spec=AsyncSession)
+
+    async def get(model, game_id):
+        await asyncio.sleep(0.01)
+        return GameDto(id=game_id, num_planets=2)
+
+    mock_session.get.side_effect = get
+
+    results = await asyncio.gather(
+        *(database_client.get_game(mock_session, game_id) for _ in range(100))
+    )
+
+    mock_session.get.assert_awaited_once()
+    assert all(result == GameDto(id=game_id, num_planets=2) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_exception(database_client, game_id):
+    mock_session = AsyncMock(spec=AsyncSession)
+
+    async def get(model, game_id):
+        await asyncio.sleep(0.01)
+        raise ConnectionError
+
+    mock_session.get.side_effect = get
+
+    results = await asyncio.gather(
+        *(database_client.get_game(mock_session, game_id) for _ in range(100)),
+        return_exceptions=True,
+    )
+
+    mock_session.get.assert_awaited_once()
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+    mock_session.get.side_effect = None
+    mock_session.get.return_value = GameDto(id=game_id, num_planets=2)
+    assert await database_client.get_game(mock_session, game_id) is not None
+    assert mock_session.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_count_hits_and_misses(database_client, game_id):
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.get.return_value = GameDto(id=game_id, num_planets=2)
+    database_client.get_game.cache_clear()
+    before = get_cache_stats()['DatabaseClient.get_game']
+
+    await database_client.get_game(mock_session, game_id)
+    await database_client.get_game(mock_session, game_id)
+    await database_client.get_game(mock_session, game_id)
+
+    after = get_cache_stats()['DatabaseClient.get_game']
+    assert after['hits'] - before['hits'] == 2
+    assert after['misses'] - before['misses'] == 1
+    assert after['loads'] - before['loads'] == 1
+    assert after['size'] == 1
+    assert after['max_load_time'] >= 0
+
+
+@pytest.mark.asyncio
+async def test_stats_count_evictions_and_expirations():
+    class Client:
+        @alru_cache(maxsize=1)
+        async def lru(self, session, value):
+            return value
+
+        @alru_cache(maxsize=1, ttl=60)
+        async def ttl(self, session, value):
+            return value
+
+    client = Client()
+    await client.lru(None, 1)
+    await client.lru(None, 2)
+    await client.ttl(None, 1)
+    client.ttl._wrapper.cacher.expire(time.monotonic() + 120)
+
+    stats = get_cache_stats()
+    lru_stats = stats[client.lru._wrapper.name]
+    ttl_stats = stats[client.ttl._wrapper.name]
+    assert lru_stats['evictions'] == 1
+    assert lru_stats['size'] == 1
+    assert ttl_stats['expirations'] == 1
+    assert ttl_stats['size'] == 0
+
+
+@pytest.mark.asyncio
+async def test_tags_released_when_entries_leave():
+    class Client:
+        @alru_cache(maxsize=2, tag=lambda self, session, result, value: value % 2)
+        async def lru(self, session, value):
+            return value
+
+        @alru_cache(maxsize=2, ttl=60, tag=lambda self, session, result, value: value)
+        async def ttl(self, session, value):
+            return value
+
+    client = Client()
+    lru = client.lru._wrapper
+    for value in range(10):
+        await client.lru(None, value)
+    assert lru._tagged_keys == {
+        0: {lru._get_key(client, None, 8)},
+        1: {lru._get_key(client, None, 9)},
+    }
+
+    client.lru.cache_invalidate(9)
+    assert set(lru._tagged_keys) == {0}
+    assert len(lru._key_tags) == 1
+
+    ttl = client.ttl._wrapper
+    await client.ttl(None, 1)
+    await client.ttl(None, 2)
+    ttl.cacher.expire(time.monotonic() + 120)
+    assert ttl._tagged_keys == {}
+    assert ttl._key_tags == {}
+
+    await client.ttl(None, 1)
+    client.ttl.invalidate_tag(1)
+    assert ttl._tagged_keys == {}
+    assert ttl._key_tags == {}
@@ -0,0 +1,63 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.alru_cache import set_invalidation_bus
+from database.invalidation import InMemoryInvalidationBus, InvalidationBus
+from database.schemas import GameDto
+
+
+@pytest.fixture()
+def network():
+    network = []
+    set_invalidation_bus(InMemoryInvalidationBus(network))
+    yield network
+    set_invalidation_bus(InvalidationBus())
+
+
+@pytest.mark.asyncio
+async def test_remote_invalidate(network, user_client, admin_id):
+    other_process = InMemoryInvalidationBus(network)
+    mock_session = AsyncMock(spec=AsyncSession)
+
+    await user_client.is_user_admin(mock_session, admin_id)
+    other_process.publish(
+        {
+            'cache': 'UserClient.is_user_admin',
+            'action': 'invalidate',
+            'args': [admin_id],
+            'kwargs': {},
+        }
+    )
+    await user_client.is_user_admin(mock_session, admin_id)
+
+    assert mock_session.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_remote_clear(network, database_client, game_id):
+    other_process = InMemoryInvalidationBus(network)
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.get.return_value = GameDto(id=game_id, num_planets=2)
+
+    await database_client.get_game(mock_session, game_id)
+    other_process.publish({'cache': None, 'action': 'clear'})
+    await database_client.get_game(mock_session, game_id)
+
+    assert mock_session.get.await_count == 2
+
+
+def test_local_invalidations_are_published(network, user_client, admin_id):
+    (bus,) = network
+
+    user_client.is_user_admin.cache_invalidate(admin_id)
+    user_client.is_user_admin.invalidate_tag(1)
+    user_client.is_user_admin.cache_clear()
+
+    assert [message['action'] for message in bus.published] == [
+        'invalidate',
+        'tag',
+        'clear',
+    ]
+    assert bus.published[0]['args'] == (admin_id,)
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from pytest_postgresql.janitor import DatabaseJanitor
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from database.pool import MonitoredQueuePool
+
+
+@pytest_asyncio.fixture()
+async def engine(test_db_config) -> AsyncEngine:
+    with DatabaseJanitor(
+        user=test_db_config['user'],
+        dbname=test_db_config['name'],
+        host=test_db_config['host'],
+        port=test_db_config['port'],
+        password=test_db_config['password'],
+        version=test_db_config['version'],
+    ) as j:
+        engine = create_async_engine(
+            f'postgresql+asyncpg://{j.user}:{j.password}@{j.host}:{j.port}/{j.dbname}',
+            poolclass=MonitoredQueuePool,
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=0.2,
+        )
+        yield engine
+        await engine.dispose()
+
+
+async def hold_connection(engine: AsyncEngine, seconds: float) -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text('SELECT 1'))
+        await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_peak_checked_out(engine):
+    await asyncio.gather(*(hold_connection(engine, 0.05) for _ in range(2)))
+
+    stats = engine.pool.get_stats()
+    assert stats['checkouts'] == 2
+    assert stats['peak_checked_out'] == 2
+    assert stats['checked_out'] == 0
+    assert stats['size'] == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_for_free_connection(engine):
+    await asyncio.gather(*(hold_connection(engine, 0.1) for _ in range(3)))
+
+    stats = engine.pool.get_stats()
+    assert stats['checkouts'] == 3
+    assert stats['peak_checked_out'] == 2
+    assert stats['max_wait_time'] >= 0.09
+    assert stats['timeouts'] == 0
+
+
+@pytest.mark.asyncio
+async def test_checkout_timeout(engine):
+    results = await asyncio.gather(
+        *(hold_connection(engine, 0.5) for _ in range(3)), return_exceptions=True
+    )
+
+    assert [type(result) for result in results].count(exc.TimeoutError) == 1
+    assert engine.pool.get_stats()['timeouts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_survive_dispose(engine):
+    await hold_connection(engine, 0)
+    await engine.dispose()
+    await hold_connection(engine, 0)
+
+    assert engine.pool.get_stats()['checkouts'] == 2
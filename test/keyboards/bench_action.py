@@ -0,0 +1,81 @@
+"""
+Router filter benchmark for order button callbacks.
+
+Parses a mix of order callbacks the way ``handle_action`` used to (legacy
+``type:planet_id:argument`` data checked by ``validate_action`` in the filter
+and parsed again by ``get_action_from_data`` in the handler) and the way it
+does now (compact data parsed once by ``parse_action_data``). Reports the
+time per callback and the mean length of the callback data.
+
+Usage:
+    python -m test.keyboards.bench_action
+    python -m test.keyboards.bench_action --callbacks 100000 --max-id 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from keyboards.schemas import (
+    Action,
+    ActionType,
+    get_action_data,
+    get_action_from_data,
+    parse_action_data,
+    validate_action,
+)
+
+
+def legacy_data(action: Action) -> str:
+    return f'{action.action_type}:{action.planet_id}:{action.argument}'
+
+
+def legacy_filter(action_data: str) -> Action | None:
+    if not validate_action(action_data):
+        return None
+    return get_action_from_data(action_data)
+
+
+def random_actions(rng: random.Random, n: int, max_id: int) -> list[Action]:
+    return [
+        Action(
+            action_type=rng.choice(list(ActionType)),
+            planet_id=rng.randint(1, max_id),
+            argument=rng.choice([None, rng.randint(1, max_id)]),
+        )
+        for _ in range(n)
+    ]
+
+
+def measure(parse: Callable[[str], Action | None], data: list[str]) -> float:
+    started = time.perf_counter()
+    for action_data in data:
+        parse(action_data)
+    return time.perf_counter() - started
+
+
+def run(callbacks: int, max_id: int, repeat: int, seed: int) -> None:
+    actions = random_actions(random.Random(seed), callbacks, max_id)
+    for name, encode, parse in (
+        ('legacy', legacy_data, legacy_filter),
+        ('compact', get_action_data, parse_action_data),
+    ):
+        data = [encode(action) for action in actions]
+        timings = [measure(parse, data) for _ in range(repeat)]
+        print(
+            f'{name:>7}: {statistics.mean(map(len, data)):.1f} bytes, '
+            f'median {statistics.median(timings) / callbacks * 1e6:.2f} us '
+            'per callback'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--callbacks', type=int, default=10000)
+    parser.add_argument('--max-id', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.callbacks, args.max_id, args.repeat, args.seed)
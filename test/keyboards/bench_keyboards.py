@@ -0,0 +1,215 @@
+"""
+Keyboard building benchmark for ``keyboards.keyboards``.
+
+Simulates presses on the city and attack keyboards of a planet with 10
+cities: every press toggles one order and builds the keyboard again, with the
+cached skeletons and with the previous implementation that built every
+button through ``InlineKeyboardBuilder``. Reports the time per press.
+
+Usage:
+    python -m test.keyboards.bench_keyboards
+    python -m test.keyboards.bench_keyboards --cities 10 --presses 10000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from database.schemas import CityDto, PlanetDto
+from game.config import game_config
+from keyboards import keyboards as kb
+from keyboards.schemas import Action, ActionType, get_action_data
+
+ROUND = 2
+
+
+def rebuilt_city_keyboard(
+    nround: int,
+    planet: PlanetDto,
+    cities: list[CityDto],
+    under_shield_ids: list[int],
+    developed_ids: list[int],
+) -> InlineKeyboardMarkup:
+    """
+    The previous implementation: every button is built on every press.
+    """
+    builder = InlineKeyboardBuilder()
+    cities.sort(key=lambda x: x.name)
+    for city in cities:
+        if city.development == 0:
+            continue
+        str1 = '✅' if city.id in developed_ids else ''
+        str2 = '✅' if city.id in under_shield_ids else ''
+        develop_action = Action(
+            action_type=ActionType.DEVELOP, planet_id=planet.id, argument=city.id
+        )
+        shield_action = Action(
+            action_type=ActionType.SHIELD, planet_id=planet.id, argument=city.id
+        )
+        builder.add(
+            InlineKeyboardButton(
+                text=f'{str1}📈 {city.name} ({game_config.DEVELOPMENT_COST} 💵)',
+                callback_data=get_action_data(develop_action),
+            ),
+        )
+        if nround > 1:
+            builder.add(
+                InlineKeyboardButton(
+                    text=f'{str2}🛡️ {city.name} ({game_config.SHIELD_COST} 💵)',
+                    callback_data=get_action_data(shield_action),
+                ),
+            )
+    return builder.adjust(2).as_markup()
+
+
+def rebuilt_attack_keyboard(
+    nround: int,
+    planet: PlanetDto,
+    other_planet: PlanetDto,
+    other_cities: list[CityDto],
+    attacked_cities_ids: list[int],
+    other_planet_ids: list[int],
+) -> InlineKeyboardMarkup:
+    """
+    The previous implementation of ``other_planets_keyboard``.
+    """
+    builder = InlineKeyboardBuilder()
+    other_cities.sort(key=lambda x: x.name)
+    other_planet_ids.sort()
+    for city in other_cities:
+        if city.development == 0:
+            continue
+        add = '✅ ' if city.id in attacked_cities_ids else ''
+        attack_action = Action(
+            action_type=ActionType.ATTACK, planet_id=planet.id, argument=city.id
+        )
+        builder.add(
+            InlineKeyboardButton(
+                text=f'{add}🗡 {city.name}',
+                callback_data=get_action_data(attack_action),
+            )
+        )
+    for action_type, text in (
+        (ActionType.NEGOTIATE, 'Переговоры 📞'),
+        (ActionType.TRANSACTION, 'Перевод 💸'),
+    ):
+        action = Action(
+            action_type=action_type, planet_id=planet.id, argument=other_planet.id
+        )
+        builder.add(
+            InlineKeyboardButton(text=text, callback_data=get_action_data(action))
+        )
+    builder.adjust(2)
+    planet_index = other_planet_ids.index(other_planet.id)
+    builder.row(
+        InlineKeyboardButton(
+            text='⬅️',
+            callback_data=(
+                f'other_planet_info {planet.id} {other_planet_ids[planet_index - 1]}'
+            ),
+        ),
+        InlineKeyboardButton(
+            text='➡️',
+            callback_data=(
+                'other_planet_info '
+                f'{planet.id} '
+                f'{other_planet_ids[(planet_index + 1) % len(other_planet_ids)]}'
+            ),
+        ),
+    )
+    return builder.as_markup()
+
+
+def make_cities(planet_id: int, n: int) -> list[CityDto]:
+    return [
+        CityDto(id=planet_id * 100 + i, name=f'City{i}', planet_id=planet_id)
+        for i in range(n)
+    ]
+
+
+def press_cities(
+    city_keyboard: Callable, planet: PlanetDto, cities: list[CityDto], presses: int
+) -> list[float]:
+    rng = random.Random(0)
+    ids = [city.id for city in cities]
+    developed, shielded = [], []
+    timings = []
+    for _ in range(presses):
+        orders = rng.choice((developed, shielded))
+        city_id = rng.choice(ids)
+        if city_id in orders:
+            orders.remove(city_id)
+        else:
+            orders.append(city_id)
+        started = time.perf_counter()
+        city_keyboard(ROUND, planet, cities, shielded, developed)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def press_attacks(
+    attack_keyboard: Callable,
+    planet: PlanetDto,
+    other_planet: PlanetDto,
+    other_cities: list[CityDto],
+    presses: int,
+) -> list[float]:
+    rng = random.Random(0)
+    ids = [city.id for city in other_cities]
+    attacked = []
+    timings = []
+    for _ in range(presses):
+        city_id = rng.choice(ids)
+        if city_id in attacked:
+            attacked.remove(city_id)
+        else:
+            attacked.append(city_id)
+        started = time.perf_counter()
+        attack_keyboard(ROUND, planet, other_planet, other_cities, attacked, [2, 3, 4])
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    print(
+        f'{name:>24}: median {statistics.median(timings) * 1e6:.1f} us, '
+        f'p99 {statistics.quantiles(timings, n=100)[98] * 1e6:.1f} us'
+    )
+
+
+def run(cities: int, presses: int) -> None:
+    planet = PlanetDto(id=1, name='Planet1', game_id=1)
+    other_planet = PlanetDto(id=2, name='Planet2', game_id=1)
+    own_cities = make_cities(planet.id, cities)
+    other_cities = make_cities(other_planet.id, cities)
+
+    report(
+        'city, rebuilt',
+        press_cities(rebuilt_city_keyboard, planet, own_cities, presses),
+    )
+    report('city, cached', press_cities(kb.city_keyboard, planet, own_cities, presses))
+    report(
+        'attack, rebuilt',
+        press_attacks(
+            rebuilt_attack_keyboard, planet, other_planet, other_cities, presses
+        ),
+    )
+    report(
+        'attack, cached',
+        press_attacks(
+            kb.other_planets_keyboard, planet, other_planet, other_cities, presses
+        ),
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cities', type=int, default=10)
+    parser.add_argument('--presses', type=int, default=5000)
+    args = parser.parse_args()
+    run(args.cities, args.presses)
@@ -1,3 +1,5 @@
+import random
+
 import pytest
 
 from keyboards.schemas import (
@@ -5,6 +7,7 @@ from keyboards.schemas import (
     ActionType,
     get_action_data,
     get_action_from_data,
+    parse_action_data,
     validate_action,
 )
 
@@ -27,18 +30,86 @@ def test_validate_action(action_data, result):
 @pytest.mark.parametrize(
     ('result', 'action'),
     [
-        ('negotiate:24:21', Action(
+        ('~no.l', Action(
             action_type=ActionType.NEGOTIATE,
             planet_id=24,
             argument=21,
         )),
-        ('accept_negotiations:1:1', Action(
+        ('~y1.1', Action(
             action_type=ActionType.ACCEPT_NEGOTIATIONS,
             planet_id=1,
             argument=1,
         )),
+        ('~i10', Action(
+            action_type=ActionType.INVENT,
+            planet_id=36,
+        )),
     ]
 )
 def test_action_transformations(action, result):
-    assert get_action_from_data(result) == action
+    assert parse_action_data(result) == action
     assert get_action_data(action) == result
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_action_data_round_trip(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        action = Action(
+            action_type=rng.choice(list(ActionType)),
+            planet_id=rng.randint(0, 2**63),
+            argument=rng.choice([None, rng.randint(-(2**63), 2**63)]),
+        )
+        assert parse_action_data(get_action_data(action)) == action
+
+
+def test_action_data_fits_telegram_limit():
+    action = Action(
+        action_type=ActionType.ACCEPT_NEGOTIATIONS,
+        planet_id=2**63 - 1,
+        argument=-(2**63),
+    )
+    assert len(get_action_data(action).encode()) <= 64
+
+
+@pytest.mark.parametrize(
+    ('action_data', 'action'),
+    [
+        ('negotiate:24:21', Action(
+            action_type=ActionType.NEGOTIATE,
+            planet_id=24,
+            argument=21,
+        )),
+        ('invent:22:None', Action(
+            action_type=ActionType.INVENT,
+            planet_id=22,
+        )),
+    ]
+)
+def test_parse_legacy_action_data(action_data, action):
+    assert parse_action_data(action_data) == action
+    assert get_action_from_data(action_data) == action
+
+
+@pytest.mark.parametrize(
+    'action_data',
+    [
+        None,
+        '',
+        '~',
+        '~a',
+        '~z1',
+        '~a1.',
+        '~a.1',
+        '~a1.2.3',
+        '~a1_0',
+        '~a 1',
+        '~a+1',
+        '~a٣',
+        'other_planet_info 1 2',
+        '12',
+        'action:2:2',
+    ]
+)
+def test_parse_invalid_action_data(action_data):
+    assert parse_action_data(action_data) is None
@@ -0,0 +1,149 @@
+import pytest
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from database.schemas import CityDto, PlanetDto
+from game.config import game_config
+from keyboards import keyboards as kb
+from keyboards.cache import keyboard_cache
+from keyboards.schemas import Action, ActionType, get_action_data
+
+DEVELOP = f'({game_config.DEVELOPMENT_COST} 💵)'
+SHIELD = f'({game_config.SHIELD_COST} 💵)'
+
+
+@pytest.fixture(autouse=True)
+def clear_keyboard_cache():
+    keyboard_cache.clear()
+    yield
+    keyboard_cache.clear()
+
+
+@pytest.fixture
+def planet() -> PlanetDto:
+    return PlanetDto(id=1, name='Земля', game_id=1)
+
+
+@pytest.fixture
+def cities() -> list[CityDto]:
+    return [
+        CityDto(id=12, name='Питер', planet_id=1),
+        CityDto(id=11, name='Москва', planet_id=1),
+        CityDto(id=13, name='Казань', planet_id=1, development=0),
+    ]
+
+
+def data(action_type: ActionType, planet_id: int, argument: int | None) -> str:
+    return get_action_data(
+        Action(action_type=action_type, planet_id=planet_id, argument=argument)
+    )
+
+
+def button(text: str, callback_data: str) -> InlineKeyboardButton:
+    return InlineKeyboardButton(text=text, callback_data=callback_data)
+
+
+def test_city_keyboard(planet, cities):
+    keyboard = kb.city_keyboard(2, planet, cities, [12], [11, 12])
+
+    assert keyboard == InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                button(f'✅📈 Москва {DEVELOP}', data(ActionType.DEVELOP, 1, 11)),
+                button(f'🛡️ Москва {SHIELD}', data(ActionType.SHIELD, 1, 11)),
+            ],
+            [
+                button(f'✅📈 Питер {DEVELOP}', data(ActionType.DEVELOP, 1, 12)),
+                button(f'✅🛡️ Питер {SHIELD}', data(ActionType.SHIELD, 1, 12)),
+            ],
+        ]
+    )
+
+
+def test_city_keyboard_first_round(planet, cities):
+    keyboard = kb.city_keyboard(1, planet, cities, [], [12])
+
+    assert keyboard == InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                button(f'📈 Москва {DEVELOP}', data(ActionType.DEVELOP, 1, 11)),
+                button(f'✅📈 Питер {DEVELOP}', data(ActionType.DEVELOP, 1, 12)),
+            ],
+        ]
+    )
+
+
+def test_city_keyboard_reuses_skeleton(mocker, planet, cities):
+    kb.city_keyboard(2, planet, cities, [], [])
+    build_button = mocker.spy(kb, 'toggle_button')
+
+    keyboard = kb.city_keyboard(2, planet, cities, [11], [])
+
+    build_button.assert_not_called()
+    assert keyboard.inline_keyboard[0][1].text == f'✅🛡️ Москва {SHIELD}'
+    assert keyboard.inline_keyboard[0][0].text == f'📈 Москва {DEVELOP}'
+
+
+def test_city_keyboard_rebuilds_on_destroyed_city(planet, cities):
+    kb.city_keyboard(2, planet, cities, [], [])
+    next(city for city in cities if city.id == 12).development = 0
+
+    keyboard = kb.city_keyboard(2, planet, cities, [], [])
+
+    assert len(keyboard.inline_keyboard) == 1
+    assert keyboard.inline_keyboard[0][0].text == f'📈 Москва {DEVELOP}'
+
+
+def test_city_keyboard_per_round(planet, cities):
+    first = kb.city_keyboard(1, planet, cities, [], [])
+    second = kb.city_keyboard(2, planet, cities, [], [])
+
+    assert len(first.inline_keyboard[0]) == 2
+    assert second.inline_keyboard[0][1].text == f'🛡️ Москва {SHIELD}'
+
+
+def test_sanctions_keyboard(planet):
+    other_planets = [
+        planet,
+        PlanetDto(id=3, name='Юпитер', game_id=1),
+        PlanetDto(id=2, name='Марс', game_id=1),
+    ]
+
+    keyboard = kb.sanctions_keyboard(planet, other_planets, [3])
+
+    assert keyboard == InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                button('Марс', data(ActionType.SANCTIONS, 1, 2)),
+                button('✅ Юпитер', data(ActionType.SANCTIONS, 1, 3)),
+            ],
+        ]
+    )
+
+
+def test_other_planets_keyboard(planet):
+    other_planet = PlanetDto(id=2, name='Марс', game_id=1)
+    other_cities = [
+        CityDto(id=21, name='Олимп', planet_id=2),
+        CityDto(id=22, name='Гале', planet_id=2),
+    ]
+
+    keyboard = kb.other_planets_keyboard(
+        2, planet, other_planet, other_cities, [21], [4, 2, 3]
+    )
+
+    assert keyboard == InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                button('🗡 Гале', data(ActionType.ATTACK, 1, 22)),
+                button('✅ 🗡 Олимп', data(ActionType.ATTACK, 1, 21)),
+            ],
+            [
+                button('Переговоры 📞', data(ActionType.NEGOTIATE, 1, 2)),
+                button('Перевод 💸', data(ActionType.TRANSACTION, 1, 2)),
+            ],
+            [
+                button('⬅️', 'other_planet_info 1 4'),
+                button('➡️', 'other_planet_info 1 3'),
+            ],
+        ]
+    )
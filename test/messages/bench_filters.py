@@ -0,0 +1,83 @@
+"""
+Morphology cache benchmark for ``messages.filters``.
+
+Renders ``half_time_passed`` and ``hurry_up`` for every player of a game the
+way the round loop does, with the memoized word agreement and with direct
+pymorphy3 and inflect calls on every render. Reports the time per broadcast
+for both languages.
+
+Usage:
+    python -m test.messages.bench_filters
+    python -m test.messages.bench_filters --players 200 --repeat 50
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+
+from game.config import game_config
+from messages import filters
+from messages.renderer import MessageRenderer
+
+
+@contextmanager
+def uncached() -> Iterator[None]:
+    """
+    Replaces the memoized agreement with the underlying functions.
+    """
+    agree_ru, agree_en = filters._agree_ru, filters._agree_en
+    filters._agree_ru = agree_ru.__wrapped__
+    filters._agree_en = agree_en.__wrapped__
+    try:
+        yield
+    finally:
+        filters._agree_ru, filters._agree_en = agree_ru, agree_en
+
+
+def broadcast(renderer: MessageRenderer, players: int) -> None:
+    for _ in range(players):
+        renderer.render(
+            'half_time_passed',
+            time=timedelta(seconds=game_config.ROUND_LENGTH // 2),
+        )
+    for _ in range(players):
+        renderer.render(
+            'hurry_up', time=timedelta(seconds=game_config.ROUND_LENGTH // 10)
+        )
+
+
+def measure(renderer: MessageRenderer, players: int, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        broadcast(renderer, players)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(players: int, repeat: int) -> None:
+    for language in ('ru', 'en'):
+        renderer = MessageRenderer(language)
+        with uncached():
+            uncached_timings = measure(renderer, players, repeat)
+        cached_timings = measure(renderer, players, repeat)
+        for name, timings in (
+            ('uncached', uncached_timings),
+            ('memoized', cached_timings),
+        ):
+            print(
+                f'{language}, {name:>8}: {players} players, '
+                f'median {statistics.median(timings) * 1000:.2f} ms, '
+                f'max {max(timings) * 1000:.2f} ms'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.players, args.repeat)
@@ -0,0 +1,109 @@
+"""
+Render throughput benchmark for ``MessageRenderer``.
+
+Renders every message of ``ru.yml`` and ``en.yml`` with a sample context in
+three modes: compiling the template on every call as the renderer used to,
+with templates compiled once, and with parameterless messages memoized as
+well. Reports renders per second for each mode.
+
+Usage:
+    python -m test.messages.bench_renderer
+    python -m test.messages.bench_renderer --repeat 200
+"""
+
+import argparse
+import time
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any
+
+from database.schemas import CityDto, GameDto, PlanetDto
+from game.config import game_config
+from messages.renderer import MessageRenderer, get_templates
+
+
+def sample_context() -> dict[str, Any]:
+    planet = PlanetDto(
+        id=1,
+        game_id=1,
+        name='Земля',
+        is_invented=True,
+        meteorites=3,
+        rate_of_life=Decimal('45.5'),
+    )
+    return {
+        'amount': 100,
+        'cache_stats': {},
+        'cities': [
+            CityDto(id=i, planet_id=1, name=f'City{i}', development=70)
+            for i in range(4)
+        ],
+        'current_players': 3,
+        'from_planet': PlanetDto(id=2, game_id=1, name='Марс'),
+        'game': GameDto(id=1, num_planets=4, round=2, ecorate=67),
+        'game_config': game_config,
+        'is_admin': False,
+        'name': 'Alice',
+        'planet': planet,
+        'pool_stats': {
+            'size': 20,
+            'checked_out': 3,
+            'overflow': 0,
+            'checkouts': 1000,
+            'timeouts': 0,
+            'peak_checked_out': 12,
+            'wait_time': 0.5,
+            'max_wait_time': 0.05,
+            'mean_wait_time': 0.0005,
+        },
+        'sanctioned_planets': ['Марс', 'Юпитер'],
+        'time': timedelta(minutes=5, seconds=30),
+        'to_planet': PlanetDto(id=3, game_id=1, name='Юпитер'),
+        'user': SimpleNamespace(
+            id=1, game_id=1, first_name='Alice', full_name='Alice Smith'
+        ),
+    }
+
+
+def render_recompiling(renderer: MessageRenderer, key: str, **kwargs) -> None:
+    """
+    The previous implementation: the template is compiled on every call.
+    """
+    template = renderer.env.from_string(renderer.messages[key].template)
+    template.render(**kwargs)
+
+
+def render_compiled(renderer: MessageRenderer, key: str, **kwargs) -> None:
+    renderer.render(key, **kwargs)
+
+
+def run(repeat: int) -> None:
+    context = sample_context()
+    for language, messages in get_templates().items():
+        keys = list(messages)
+        for name, renderer, render in (
+            ('recompiling', MessageRenderer(language), render_recompiling),
+            ('compiled', MessageRenderer(language), render_compiled),
+            (
+                'memoized',
+                MessageRenderer(language, memoize_static=True),
+                render_compiled,
+            ),
+        ):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for key in keys:
+                    render(renderer, key, **context)
+            elapsed = time.perf_counter() - started
+            print(
+                f'{language}, {name:>11}: {len(keys)} messages, '
+                f'{repeat * len(keys) / elapsed:>10.0f} renders/s'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    run(args.repeat)
@@ -4,17 +4,17 @@ from types import SimpleNamespace
 import pytest
 
 from database.schemas import CityDto, GameDto, PlanetDto, PlayerDto
-from messages.renderer import MessageRenderer
+from messages.renderer import MessageRenderer, get_renderer
 
 
 @pytest.fixture(scope='module')
 def renderer_ru() -> MessageRenderer:
-    return MessageRenderer('ru')
+    return get_renderer('ru')
 
 
 @pytest.fixture(scope='module')
 def renderer_en() -> MessageRenderer:
-    return MessageRenderer('en')
+    return get_renderer('en')
 
 
 @pytest.fixture
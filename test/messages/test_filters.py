@@ -2,6 +2,7 @@ from datetime import timedelta
 
 import pytest
 
+from messages import filters
 from messages.filters import (
     escape_md,
     make_agree_with,
@@ -179,6 +180,47 @@ def test_make_agree_with_en(word, number, expected):
     assert make_agree_with(word, number, 'en') == expected
 
 
+@pytest.mark.parametrize(
+    'word, number, expected',
+    [
+        ('волк', 111, 'волков'),
+        ('волк', 121, 'волк'),
+        ('волк', 1002, 'волка'),
+    ],
+)
+def test_make_agree_with_ru_large_numbers(word, number, expected):
+    assert make_agree_with(word, number, 'ru') == expected
+
+
+def test_make_agree_with_ru_is_memoized_by_last_two_digits(mocker):
+    filters._agree_ru.cache_clear()
+    parse = mocker.spy(filters.get_morph(), 'parse')
+
+    for number in (5, 105, 1005, 305):
+        assert make_agree_with('волк', number, 'ru') == 'волков'
+
+    assert parse.call_count == 1
+
+
+def test_make_agree_with_en_is_memoized_by_one_or_other(mocker):
+    filters._agree_en.cache_clear()
+    plural_noun = mocker.spy(filters.get_inflect_engine(), 'plural_noun')
+
+    for number in (0, 2, 5, 100):
+        assert make_agree_with('cat', number, 'en') == 'cats'
+    assert make_agree_with('cat', 1, 'en') == 'cat'
+
+    assert plural_noun.call_count == 2
+
+
+def test_time_filter_ru_is_memoized(mocker):
+    time_filter(timedelta(minutes=7, seconds=11), 'ru')
+    parse = mocker.spy(filters.get_morph(), 'parse')
+
+    assert time_filter(timedelta(minutes=7, seconds=11), 'ru') == '7 минут 11 секунд'
+    parse.assert_not_called()
+
+
 @pytest.mark.parametrize(
     ('id', 'name', 'expected'),
     [
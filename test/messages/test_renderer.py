@@ -3,6 +3,7 @@ from datetime import timedelta
 import pytest
 
 from database.schemas import PlanetDto
+from messages.renderer import MessageRenderer, get_renderer
 
 
 def test_render_on_start_for_player_without_game(
@@ -1275,3 +1276,44 @@ def test_render_wait_till_game_ends(renderer_ru, renderer_en):
         'text': "This operation cannot be performed because the player is in the game. Wait until it's over.",
         'parse_mode': None,
     }
+
+
+def test_render_does_not_recompile_templates(renderer_ru, mocker):
+    from_string = mocker.spy(renderer_ru.env, 'from_string')
+
+    renderer_ru.render('too_fast')
+    renderer_ru.render('on_choose_lobby')
+
+    from_string.assert_not_called()
+
+
+def test_get_renderer_is_shared():
+    assert get_renderer('ru') is get_renderer('ru')
+    assert get_renderer('ru') is not get_renderer('en')
+    assert get_renderer('en').language == 'en'
+
+
+def test_render_unknown_key(renderer_ru):
+    with pytest.raises(ValueError):
+        renderer_ru.render('no_such_message')
+
+
+def test_static_keys(renderer_en):
+    assert {'goodbye', 'too_fast'} <= renderer_en.static_keys
+    assert 'on_start' not in renderer_en.static_keys
+
+
+def test_render_memoizes_static_messages(mocker):
+    renderer = MessageRenderer('en', memoize_static=True)
+    too_fast = mocker.spy(renderer.templates['too_fast'], 'render')
+    on_start = mocker.spy(renderer.templates['on_start'], 'render')
+
+    first = renderer.render('too_fast')
+    first['text'] = 'changed'
+    second = renderer.render('too_fast')
+    renderer.render('on_start', name='Alice', user=None, is_admin=False)
+    renderer.render('on_start', name='Alice', user=None, is_admin=False)
+
+    assert second == {'text': 'Slow down, cowboy!', 'parse_mode': None}
+    assert too_fast.call_count == 1
+    assert on_start.call_count == 2
@@ -0,0 +1,142 @@
+"""
+Callback latency benchmark for the Redis-backed storage clients.
+
+Simulates many players pressing order buttons at the same time: every
+"callback" performs the same sequence of storage calls as ``handle_action``
+(read balances, toggle an order, read the relations back). Requires a running
+Redis configured through the usual ``REDIS_*`` variables.
+
+Usage:
+    python -m test.storage.bench_callbacks --planets 20 --presses 50
+    python -m test.storage.bench_callbacks --blocking
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from redis.commands.core import Script
+
+from game.config import game_config
+from storage.clients.actions import ActionsClient
+from storage.config import redis_config
+
+
+class _BlockingScript:
+    """
+    Awaitable facade over a script registered on the synchronous client.
+    """
+
+    def __init__(self, script: Script):
+        self._script = script
+
+    def __getattr__(self, name: str):
+        return getattr(self._script, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name == '_script':
+            super().__setattr__(name, value)
+        else:
+            setattr(self._script, name, value)
+
+    async def __call__(self, keys=None, args=None):
+        return self._script(keys=keys, args=args)
+
+
+class _BlockingRedis:
+    """
+    Awaitable facade over the synchronous client. Every command blocks
+    the event loop, which is how the storage layer used to behave.
+    """
+
+    def __init__(self, client: SyncRedis):
+        self._client = client
+
+    def register_script(self, script: str) -> _BlockingScript:
+        return _BlockingScript(self._client.register_script(script))
+
+    def __getattr__(self, name: str):
+        command = getattr(self._client, name)
+
+        async def wrapper(*args, **kwargs):
+            return command(*args, **kwargs)
+
+        return wrapper
+
+
+async def press_buttons(
+    actions_client: ActionsClient, planet_id: int, presses: int
+) -> list[float]:
+    latencies = []
+    for press in range(presses):
+        started = time.perf_counter()
+        await actions_client.get_balance(planet_id, actions_client.MONEY_KEY)
+        await actions_client.get_balance(planet_id, actions_client.METEORITES_KEY)
+        await actions_client.develop_city(planet_id, press % 4)
+        await actions_client.get_shielded_cities(planet_id)
+        await actions_client.get_developed_cities(planet_id)
+        await actions_client.get_balance(planet_id, actions_client.MONEY_KEY)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0)
+    return latencies
+
+
+async def run(planets: int, presses: int, blocking: bool) -> None:
+    connection_kwargs = {
+        'db': redis_config.DB,
+        'host': redis_config.HOST,
+        'port': redis_config.INNER_PORT,
+        'password': redis_config.PASSWORD,
+    }
+    if blocking:
+        client = _BlockingRedis(SyncRedis(**connection_kwargs))
+    else:
+        client = Redis(**connection_kwargs)
+
+    actions_client = ActionsClient(client, 60, game_config)
+    planet_ids = range(10**6, 10**6 + planets)
+    for planet_id in planet_ids:
+        await actions_client.set_balance(
+            planet_id, 10**9, actions_client.MONEY_KEY
+        )
+        await actions_client.set_balance(
+            planet_id, 0, actions_client.METEORITES_KEY
+        )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            press_buttons(actions_client, planet_id, presses)
+            for planet_id in planet_ids
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    for planet_id in planet_ids:
+        await actions_client.clear_order_info(planet_id)
+        await actions_client.delete(actions_client.MONEY_KEY, planet_id)
+        await actions_client.delete(actions_client.METEORITES_KEY, planet_id)
+
+    latencies = sorted(latency for result in results for latency in result)
+    quantiles = statistics.quantiles(latencies, n=100)
+    mode = 'blocking' if blocking else 'asyncio'
+    print(f'{mode}: {len(latencies)} callbacks in {elapsed:.2f}s')
+    print(f'  p50 = {quantiles[49] * 1000:.2f} ms')
+    print(f'  p99 = {quantiles[98] * 1000:.2f} ms')
+    print(f'  max = {latencies[-1] * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--planets', type=int, default=20)
+    parser.add_argument('--presses', type=int, default=50)
+    parser.add_argument(
+        '--blocking',
+        action='store_true',
+        help='issue commands through the synchronous client for comparison',
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.planets, args.presses, args.blocking))
@@ -0,0 +1,172 @@
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from game.config import game_config
+from game.schemas import FailureReason, OrderType
+from storage.clients.actions import PlanetState
+from storage.clients.hash_actions import HashActionsClient
+
+
+@pytest.fixture()
+def mock_hash_storage(mock_redis) -> HashActionsClient:
+    return HashActionsClient(mock_redis, 100, game_config)
+
+
+@pytest.fixture()
+def fake_redis() -> FakeAsyncRedis:
+    return FakeAsyncRedis()
+
+
+@pytest.fixture()
+def hash_storage(fake_redis) -> HashActionsClient:
+    return HashActionsClient(fake_redis, 100, game_config)
+
+
+@pytest.mark.asyncio
+async def test_binary_relation_script_call(mock_hash_storage, planet_id):
+    mock_hash_storage._toggle_member.return_value = [1, 0, 1]
+
+    await mock_hash_storage.shield_city(planet_id, 3)
+    mock_hash_storage._toggle_member.assert_awaited_once_with(
+        keys=[
+            f'planet:{planet_id}',
+            f'money_balance:{planet_id}',
+            f'shield:{planet_id}',
+        ],
+        args=['money_balance', game_config.SHIELD_COST, 3, mock_hash_storage.ex],
+    )
+
+
+@pytest.mark.asyncio
+async def test_unary_relation_script_call(mock_hash_storage, planet_id):
+    mock_hash_storage._toggle_flag.return_value = [1, 0, 1]
+
+    await mock_hash_storage.eco_boost(planet_id)
+    mock_hash_storage._toggle_flag.assert_awaited_once_with(
+        keys=[
+            f'planet:{planet_id}',
+            f'meteorites_balance:{planet_id}',
+            f'planet:{planet_id}',
+            f'eco:{planet_id}',
+        ],
+        args=['meteorites_balance', 'eco', game_config.ECO_COST, mock_hash_storage.ex],
+    )
+
+
+@pytest.mark.asyncio
+async def test_toggle_member_script(hash_storage, fake_redis, planet_id):
+    planet = f'planet:{planet_id}'
+    await fake_redis.set(f'money_balance:{planet_id}', 1000)
+
+    assert await hash_storage.develop_city(planet_id, 3) == FailureReason.SUCCESS
+    assert await hash_storage.get_developed_cities(planet_id) == [3]
+    balance = 1000 - game_config.DEVELOPMENT_COST
+    assert await fake_redis.hget(planet, 'money_balance') == str(balance).encode()
+    assert not await fake_redis.exists(f'money_balance:{planet_id}')
+    assert 0 < await fake_redis.ttl(planet) <= 100
+
+    assert await hash_storage.develop_city(planet_id, 3) == FailureReason.SUCCESS
+    assert await hash_storage.get_developed_cities(planet_id) == []
+    assert await hash_storage.get_balance(planet_id, hash_storage.MONEY_KEY) == 1000
+
+    await hash_storage.set_balance(planet_id, 0, hash_storage.MONEY_KEY)
+    result = await hash_storage.develop_city(planet_id, 3)
+    assert result == FailureReason.NOT_ENOUGH_MONEY
+    assert await hash_storage.get_developed_cities(planet_id) == []
+
+
+@pytest.mark.asyncio
+async def test_toggle_flag_script(hash_storage, fake_redis, planet_id):
+    planet = f'planet:{planet_id}'
+    meteorites = hash_storage.METEORITES_KEY
+    await hash_storage.set_balance(planet_id, game_config.ECO_COST, meteorites)
+    await fake_redis.set(f'eco:{planet_id}', 0)
+
+    assert await hash_storage.eco_boost(planet_id) == FailureReason.SUCCESS
+    assert await fake_redis.hget(planet, 'eco') == b'1'
+    assert not await fake_redis.exists(f'eco:{planet_id}')
+    assert await hash_storage.get_balance(planet_id, meteorites) == 0
+    assert 0 < await fake_redis.ttl(planet) <= 100
+
+    assert await hash_storage.eco_boost(planet_id) == FailureReason.SUCCESS
+    assert not await hash_storage.get_eco_boost(planet_id)
+    assert await fake_redis.hget(planet, 'eco') is None
+    assert await hash_storage.get_balance(planet_id, meteorites) == game_config.ECO_COST
+
+    await hash_storage.set_balance(planet_id, 0, meteorites)
+    result = await hash_storage.eco_boost(planet_id)
+    assert result == FailureReason.NOT_ENOUGH_METEORITES
+    assert not await hash_storage.get_eco_boost(planet_id)
+
+
+@pytest.mark.asyncio
+async def test_set_balance_replaces_legacy_key(hash_storage, fake_redis, planet_id):
+    await fake_redis.set(f'money_balance:{planet_id}', 100)
+
+    await hash_storage.set_balance(planet_id, 700, hash_storage.MONEY_KEY)
+    assert await fake_redis.hget(f'planet:{planet_id}', 'money_balance') == b'700'
+    assert not await fake_redis.exists(f'money_balance:{planet_id}')
+    assert 0 < await fake_redis.ttl(f'planet:{planet_id}') <= 100
+
+
+@pytest.mark.asyncio
+async def test_get_falls_back_to_legacy_keys(hash_storage, fake_redis, planet_id):
+    await fake_redis.set(f'money_balance:{planet_id}', 100)
+    await fake_redis.set(f'invent:{planet_id}', 1)
+    await fake_redis.hset(f'planet:{planet_id}', 'meteorites_balance', 3)
+
+    assert await hash_storage.get_balance(planet_id, hash_storage.MONEY_KEY) == 100
+    assert await hash_storage.get_invented(planet_id)
+    assert await hash_storage.get_planet_state(planet_id) == PlanetState(
+        money=100, meteorites=3, created_meteorites=0, invented=True, eco_boost=False
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_planet_state_single_round_trip(
+    mocker, mock_hash_storage, planet_id
+):
+    pipe = mocker.Mock()
+    pipe.execute = mocker.AsyncMock(
+        return_value=[
+            {b'money_balance': b'10', b'meteorites_balance': b'2', b'invent': b'1'},
+            [b'0', b'0', b'1', b'0', b'1'],
+        ]
+    )
+    mock_hash_storage.client.pipeline.return_value = pipe
+
+    state = await mock_hash_storage.get_planet_state(planet_id)
+    assert state == PlanetState(10, 2, 1, True, True)
+    pipe.hgetall.assert_called_once_with(f'planet:{planet_id}')
+    pipe.execute.assert_awaited_once()
+    mock_hash_storage.client.hgetall.assert_not_called()
+    mock_hash_storage.client.mget.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_and_clear_game(
+    hash_storage, fake_redis, planet_id, other_planet_id
+):
+    await fake_redis.hset(
+        f'planet:{planet_id}',
+        mapping={'money_balance': 500, 'meteorites_balance': 1, 'create': 2},
+    )
+    await fake_redis.set(f'eco:{planet_id}', 1)
+    await fake_redis.set(f'money_balance:{other_planet_id}', 300)
+    await fake_redis.sadd(f'develop:{other_planet_id}', 5)
+
+    orders, balances = await hash_storage.snapshot_and_clear_game(
+        [planet_id, other_planet_id]
+    )
+
+    assert orders[planet_id][OrderType.CREATE] == 2
+    assert orders[planet_id][OrderType.ECO] is True
+    assert orders[other_planet_id][OrderType.DEVELOP] == [5]
+    assert balances == {planet_id: (500, 1), other_planet_id: (300, None)}
+    assert await fake_redis.hgetall(f'planet:{planet_id}') == {
+        b'money_balance': b'500',
+        b'meteorites_balance': b'1',
+    }
+    assert not await fake_redis.exists(
+        f'eco:{planet_id}', f'develop:{other_planet_id}'
+    )
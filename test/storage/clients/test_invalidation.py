@@ -0,0 +1,29 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from storage.clients.invalidation import RedisInvalidationBus
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_other_process():
+    server = FakeServer()
+    sender = RedisInvalidationBus(FakeAsyncRedis(server=server))
+    receiver = RedisInvalidationBus(FakeAsyncRedis(server=server))
+    sender_handler, receiver_handler = Mock(), Mock()
+    sender.subscribe(sender_handler)
+    receiver.subscribe(receiver_handler)
+    await sender.start()
+    await receiver.start()
+    await asyncio.sleep(0.05)
+
+    message = {'cache': 'UserClient.is_user_admin', 'action': 'clear'}
+    sender.publish(message)
+    await asyncio.sleep(0.05)
+    await sender.close()
+    await receiver.close()
+
+    receiver_handler.assert_called_once_with({'sender': sender.sender, **message})
+    sender_handler.assert_not_called()
@@ -0,0 +1,103 @@
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from storage.clients.jobs import JobStore, RedisJobStore
+from storage.schemas import Job
+
+
+@pytest.fixture()
+def server() -> FakeServer:
+    return FakeServer()
+
+
+@pytest.fixture()
+def store(server) -> RedisJobStore:
+    return RedisJobStore(FakeAsyncRedis(server=server))
+
+
+@pytest.mark.asyncio
+async def test_due_jobs_in_order(store):
+    end = Job(game_id=1, kind='end', run_at=300, payload={'round': 1})
+    middle = Job(game_id=1, kind='middle_5', run_at=150, payload={'round': 1})
+    later = Job(game_id=2, kind='end', run_at=600)
+    for job in (end, middle, later):
+        await store.add(job)
+
+    assert await store.get_due(300) == [middle, end]
+    assert await store.next_run_at() == 150
+
+
+@pytest.mark.asyncio
+async def test_job_is_claimed_once(server, store):
+    other_process = RedisJobStore(FakeAsyncRedis(server=server))
+    job = Job(game_id=1, kind='end', run_at=100)
+    await store.add(job)
+
+    [due] = await other_process.get_due(100)
+
+    assert await other_process.claim(due)
+    assert not await store.claim(job)
+    assert await store.next_run_at() is None
+
+
+@pytest.mark.asyncio
+async def test_delete_game(store):
+    await store.add(Job(game_id=1, kind='middle_5', run_at=100))
+    await store.add(Job(game_id=1, kind='end', run_at=200))
+    kept = Job(game_id=2, kind='end', run_at=200)
+    await store.add(kept)
+
+    assert await store.delete_game(1) == 2
+    assert await store.delete_game(1) == 0
+    assert await store.get_due(1000) == [kept]
+
+
+@pytest.mark.asyncio
+async def test_delete_game_kinds(store):
+    await store.add(Job(game_id=1, kind='end', run_at=100))
+    kept = Job(game_id=1, kind='transaction_timeout', run_at=200)
+    await store.add(kept)
+
+    assert await store.delete_game(1, ['middle_5', 'end']) == 1
+    assert await store.get_due(1000) == [kept]
+
+
+@pytest.mark.asyncio
+async def test_claim_removes_member_as_read(store):
+    # written by an older version: other field order, integer run_at
+    member = '{"kind": "end", "run_at": 100, "game_id": 1, "id": "a"}'
+    await store.client.zadd(store.key, {member: 100})
+    await store.client.sadd(store._game_key(1), member)
+
+    [job] = await store.get_due(100)
+
+    assert job.model_dump_json() != member
+    assert await store.claim(job)
+    assert not await store.client.exists(store.key, store._game_key(1))
+
+
+@pytest.mark.asyncio
+async def test_game_index_follows_jobs(mocker, store):
+    claimed = Job(game_id=1, kind='middle_5', run_at=100)
+    for job in (claimed, Job(game_id=1, kind='end', run_at=200)):
+        await store.add(job)
+    await store.add(Job(game_id=2, kind='end', run_at=200))
+    assert await store.client.scard(store._game_key(1)) == 2
+
+    assert await store.claim(claimed)
+    assert await store.client.scard(store._game_key(1)) == 1
+
+    zrange = mocker.spy(store.client, 'zrange')
+    assert await store.delete_game(1) == 1
+    zrange.assert_not_called()
+    assert not await store.client.exists(store._game_key(1))
+    assert await store.client.scard(store._game_key(2)) == 1
+
+
+def test_store_must_implement_every_method():
+    class PartialStore(JobStore):
+        async def add(self, job: Job) -> None:
+            pass
+
+    with pytest.raises(TypeError, match='abstract'):
+        PartialStore()
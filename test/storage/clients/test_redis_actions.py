@@ -1,5 +1,8 @@
+import asyncio
+from unittest.mock import AsyncMock
+
 import pytest
-from redis import Redis
+from fakeredis import FakeAsyncRedis
 
 from game.config import game_config
 from game.schemas import FailureReason, OrderType
@@ -7,8 +10,18 @@ from storage.clients.actions import ActionsClient
 
 
 @pytest.fixture()
-def mock_actions_storage(mocker) -> ActionsClient:
-    return ActionsClient(mocker.Mock(Redis), 100, game_config)
+def mock_actions_storage(mock_redis) -> ActionsClient:
+    return ActionsClient(mock_redis, 100, game_config)
+
+
+@pytest.fixture()
+def fake_redis() -> FakeAsyncRedis:
+    return FakeAsyncRedis()
+
+
+@pytest.fixture()
+def actions_storage(fake_redis) -> ActionsClient:
+    return ActionsClient(fake_redis, 100, game_config)
 
 
 @pytest.fixture()
@@ -32,276 +45,197 @@ def city_id2():
 
 
 @pytest.mark.parametrize(
-    ('is_shielded', 'balance', 'new_balance', 'true_result'),
+    ('method', 'relation', 'balance_key', 'cost'),
     [
-        (False, game_config.SHIELD_COST + 1, 1, FailureReason.SUCCESS),
-        (False, game_config.SHIELD_COST - 1, None, FailureReason.NOT_ENOUGH_MONEY),
-        (True, 1, game_config.SHIELD_COST + 1, FailureReason.SUCCESS),
+        ('shield_city', 'shield', 'money_balance', game_config.SHIELD_COST),
+        ('develop_city', 'develop', 'money_balance', game_config.DEVELOPMENT_COST),
+        ('attack_city', 'attack', 'meteorites_balance', game_config.ATTACK_COST),
+        ('sanction_planet', 'sanctions', 'money_balance', game_config.SANCTIONS_COST),
     ],
 )
-def test_shield_city(
-    mock_actions_storage,
-    planet_id,
-    city_id,
-    is_shielded,
-    balance,
-    new_balance,
-    true_result,
+@pytest.mark.asyncio
+async def test_binary_relation_script_call(
+    mock_actions_storage, planet_id, city_id, method, relation, balance_key, cost
 ):
-    mock_actions_storage.client.sismember.return_value = is_shielded
-    mock_actions_storage.client.get.return_value = balance
-
-    result = mock_actions_storage.shield_city(planet_id, city_id)
-    if new_balance is not None:
-        mock_actions_storage.client.set.assert_called_with(
-            name=f'money_balance:{planet_id}',
-            value=str(new_balance),
-            ex=mock_actions_storage.ex,
-        )
-    else:
-        mock_actions_storage.client.set.assert_not_called()
+    mock_actions_storage._toggle_member.return_value = [1, 0, 1]
 
-    assert true_result == result
+    result = await getattr(mock_actions_storage, method)(planet_id, city_id)
+    assert result == FailureReason.SUCCESS
+    mock_actions_storage._toggle_member.assert_awaited_once_with(
+        keys=[
+            f'{balance_key}:{planet_id}',
+            f'{balance_key}:{planet_id}',
+            f'{relation}:{planet_id}',
+        ],
+        args=['', cost, city_id, mock_actions_storage.ex],
+    )
 
 
 @pytest.mark.parametrize(
-    ('is_developed', 'balance', 'new_balance', 'true_result'),
+    ('method', 'status', 'expected'),
     [
-        (False, game_config.DEVELOPMENT_COST + 1, 1, FailureReason.SUCCESS),
-        (False, game_config.DEVELOPMENT_COST - 1, None, FailureReason.NOT_ENOUGH_MONEY),
-        (True, 1, game_config.DEVELOPMENT_COST + 1, FailureReason.SUCCESS),
+        ('shield_city', 1, FailureReason.SUCCESS),
+        ('shield_city', 0, FailureReason.NOT_ENOUGH_MONEY),
+        ('develop_city', 0, FailureReason.NOT_ENOUGH_MONEY),
+        ('attack_city', 1, FailureReason.SUCCESS),
+        ('attack_city', 0, FailureReason.NOT_ENOUGH_METEORITES),
+        ('sanction_planet', 1, FailureReason.SUCCESS),
     ],
 )
-def test_develop_city(
-    mock_actions_storage,
-    planet_id,
-    city_id,
-    is_developed,
-    balance,
-    new_balance,
-    true_result,
+@pytest.mark.asyncio
+async def test_binary_relation_result(
+    mock_actions_storage, planet_id, city_id, method, status, expected
 ):
-    mock_actions_storage.client.sismember.return_value = is_developed
-    mock_actions_storage.client.get.return_value = balance
-
-    result = mock_actions_storage.develop_city(planet_id, city_id)
-    if new_balance is not None:
-        mock_actions_storage.client.set.assert_called_with(
-            name=f'money_balance:{planet_id}',
-            value=str(new_balance),
-            ex=mock_actions_storage.ex,
-        )
-    else:
-        mock_actions_storage.client.set.assert_not_called()
+    mock_actions_storage._toggle_member.return_value = [status, 0, status]
 
-    assert true_result == result
+    result = await getattr(mock_actions_storage, method)(planet_id, city_id)
+    assert result == expected
+    mock_actions_storage.client.set.assert_not_called()
 
 
 @pytest.mark.parametrize(
-    ('is_attacked', 'balance', 'new_balance', 'true_result'),
-    [
-        (False, 1, 0, FailureReason.SUCCESS),
-        (False, 0, None, FailureReason.NOT_ENOUGH_METEORITES),
-        (True, 1, 2, FailureReason.SUCCESS),
-    ],
+    ('status', 'expected'),
+    [(1, FailureReason.SUCCESS), (0, FailureReason.NOT_ENOUGH_MONEY)],
 )
-def test_attack_city(
-    mock_actions_storage,
-    planet_id,
-    city_id,
-    is_attacked,
-    balance,
-    new_balance,
-    true_result,
-):
-    mock_actions_storage.client.sismember.return_value = is_attacked
-    mock_actions_storage.client.get.return_value = balance
-
-    result = mock_actions_storage.attack_city(planet_id, city_id)
-    if new_balance is not None:
-        mock_actions_storage.client.set.assert_called_with(
-            name=f'meteorites_balance:{planet_id}',
-            value=str(new_balance),
-            ex=mock_actions_storage.ex,
-        )
-    else:
-        mock_actions_storage.client.set.assert_not_called()
+@pytest.mark.asyncio
+async def test_create_meteorites(mock_actions_storage, planet_id, status, expected):
+    mock_actions_storage._set_amount.return_value = [status, 0, 2]
 
-    assert true_result == result
+    result = await mock_actions_storage.create_meteorites(planet_id, 2)
+    assert result == expected
+    mock_actions_storage._set_amount.assert_awaited_once_with(
+        keys=[
+            f'money_balance:{planet_id}',
+            f'money_balance:{planet_id}',
+            f'create:{planet_id}',
+            f'create:{planet_id}',
+        ],
+        args=['', '', game_config.CREATE_COST, 2, mock_actions_storage.ex],
+    )
 
 
-def test_sanction_planet(
-    mock_actions_storage,
-    planet_id,
-    other_planet_id,
-):
-    mock_actions_storage.client.sismember.return_value = True
-    mock_actions_storage.client.get.return_value = 0
+@pytest.mark.parametrize(
+    ('status', 'expected'),
+    [(1, FailureReason.SUCCESS), (0, FailureReason.NOT_ENOUGH_MONEY)],
+)
+@pytest.mark.asyncio
+async def test_invent(mock_actions_storage, planet_id, status, expected):
+    mock_actions_storage._toggle_flag.return_value = [status, 0, status]
 
-    result = mock_actions_storage.sanction_planet(planet_id, other_planet_id)
-    assert result == FailureReason.SUCCESS
-    mock_actions_storage.client.srem.assert_called_once_with(
-        f'sanctions:{planet_id}', str(other_planet_id)
+    result = await mock_actions_storage.invent(planet_id)
+    assert result == expected
+    mock_actions_storage._toggle_flag.assert_awaited_once_with(
+        keys=[
+            f'money_balance:{planet_id}',
+            f'money_balance:{planet_id}',
+            f'invent:{planet_id}',
+            f'invent:{planet_id}',
+        ],
+        args=['', '', game_config.INVENTION_COST, mock_actions_storage.ex],
     )
-    mock_actions_storage.client.sadd.assert_not_called()
 
-    mock_actions_storage.client.sismember.return_value = False
 
-    result = mock_actions_storage.sanction_planet(planet_id, other_planet_id)
-    assert result == FailureReason.SUCCESS
-    mock_actions_storage.client.sadd.assert_called_once_with(
-        f'sanctions:{planet_id}', str(other_planet_id)
+@pytest.mark.parametrize(
+    ('status', 'expected'),
+    [(1, FailureReason.SUCCESS), (0, FailureReason.NOT_ENOUGH_METEORITES)],
+)
+@pytest.mark.asyncio
+async def test_eco_boost(mock_actions_storage, planet_id, status, expected):
+    mock_actions_storage._toggle_flag.return_value = [status, 0, status]
+
+    result = await mock_actions_storage.eco_boost(planet_id)
+    assert result == expected
+    mock_actions_storage._toggle_flag.assert_awaited_once_with(
+        keys=[
+            f'meteorites_balance:{planet_id}',
+            f'meteorites_balance:{planet_id}',
+            f'eco:{planet_id}',
+            f'eco:{planet_id}',
+        ],
+        args=['', '', game_config.ECO_COST, mock_actions_storage.ex],
     )
-    # called once cause it's been called before where sismember.return_value = True
-    mock_actions_storage.client.srem.assert_called_once()
 
 
-@pytest.mark.parametrize(
-    ('ordered_before', 'balance', 'ordered', 'new_balance', 'expected'),
-    [
-        (None, game_config.CREATE_COST, 1, 0, FailureReason.SUCCESS),
-        (0, game_config.CREATE_COST, 1, 0, FailureReason.SUCCESS),
-        (
-            1,
-            game_config.CREATE_COST,
-            0,
-            2 * game_config.CREATE_COST,
-            FailureReason.SUCCESS,
-        ),
-        (1, game_config.CREATE_COST, 3, None, FailureReason.NOT_ENOUGH_MONEY),
-    ],
-)
-def test_create_meteorites(
-    mock_actions_storage,
-    mocker,
-    planet_id,
-    ordered_before,
-    balance,
-    ordered,
-    new_balance,
-    expected,
-):
-    def get_side_effect(key: str) -> str:
-        if key.startswith('create'):
-            return None if ordered_before is None else str(ordered_before)
-        else:
-            return str(balance)
+@pytest.mark.asyncio
+async def test_toggle_member_script(actions_storage, fake_redis, planet_id, city_id):
+    money = actions_storage.MONEY_KEY
+    await actions_storage.set_balance(planet_id, 1000, money)
 
-    mocker.patch.object(mock_actions_storage.client, 'get', side_effect=get_side_effect)
+    result = await actions_storage.shield_city(planet_id, city_id)
+    assert result == FailureReason.SUCCESS
+    assert await actions_storage.get_shielded_cities(planet_id) == [city_id]
+    balance = await actions_storage.get_balance(planet_id, money)
+    assert balance == 1000 - game_config.SHIELD_COST
+    assert 0 < await fake_redis.ttl(f'{money}:{planet_id}') <= 100
 
-    result = mock_actions_storage.create_meteorites(planet_id, ordered)
-    assert result == expected
-    if new_balance is None:
-        mock_actions_storage.client.set.assert_not_called()
-    else:
-        mock_actions_storage.client.set.assert_any_call(
-            name=f'money_balance:{planet_id}',
-            value=str(new_balance),
-            ex=mock_actions_storage.ex,
-        )
-        mock_actions_storage.client.set.assert_any_call(
-            name=f'create:{planet_id}', value=str(ordered), ex=mock_actions_storage.ex
-        )
+    result = await actions_storage.shield_city(planet_id, city_id)
+    assert result == FailureReason.SUCCESS
+    assert await actions_storage.get_shielded_cities(planet_id) == []
+    assert await actions_storage.get_balance(planet_id, money) == 1000
 
 
-@pytest.mark.parametrize(
-    ('invented_before', 'balance', 'invented_after', 'new_balance', 'expected'),
-    [
-        (None, game_config.INVENTION_COST, True, 0, FailureReason.SUCCESS),
-        (False, game_config.INVENTION_COST, True, 0, FailureReason.SUCCESS),
-        (False, 1, None, None, FailureReason.NOT_ENOUGH_MONEY),
-        (True, 0, False, game_config.INVENTION_COST, FailureReason.SUCCESS),
-    ],
-)
-def test_invent(
-    mock_actions_storage,
-    mocker,
-    planet_id,
-    invented_before,
-    balance,
-    invented_after,
-    new_balance,
-    expected,
+@pytest.mark.asyncio
+async def test_toggle_member_script_not_enough_money(
+    actions_storage, planet_id, city_id
 ):
-    def get_side_effect(key: str) -> str:
-        if key.startswith('invent'):
-            return None if invented_before is None else str(int(invented_before))
-        else:
-            return str(balance)
+    money = actions_storage.MONEY_KEY
+    await actions_storage.set_balance(planet_id, game_config.SHIELD_COST - 1, money)
 
-    mocker.patch.object(mock_actions_storage.client, 'get', side_effect=get_side_effect)
+    result = await actions_storage.shield_city(planet_id, city_id)
+    assert result == FailureReason.NOT_ENOUGH_MONEY
+    assert await actions_storage.get_shielded_cities(planet_id) == []
+    balance = await actions_storage.get_balance(planet_id, money)
+    assert balance == game_config.SHIELD_COST - 1
 
-    result = mock_actions_storage.invent(planet_id)
-    assert result == expected
 
-    if new_balance is not None:
-        mock_actions_storage.client.set.assert_any_call(
-            name=f'money_balance:{planet_id}',
-            value=str(new_balance),
-            ex=mock_actions_storage.ex,
-        )
-    else:
-        mock_actions_storage.client.set.assert_not_called()
+@pytest.mark.asyncio
+async def test_toggle_flag_script(actions_storage, fake_redis, planet_id):
+    money = actions_storage.MONEY_KEY
+    await actions_storage.set_balance(planet_id, game_config.INVENTION_COST, money)
 
-    if invented_after is not None:
-        if invented_after:
-            mock_actions_storage.client.set.assert_any_call(
-                name=f'invent:{planet_id}', value='1', ex=mock_actions_storage.ex
-            )
-        else:
-            mock_actions_storage.client.delete.assert_called_once_with(
-                f'invent:{planet_id}'
-            )
+    assert await actions_storage.invent(planet_id) == FailureReason.SUCCESS
+    assert await actions_storage.get_invented(planet_id)
+    assert await actions_storage.get_balance(planet_id, money) == 0
+    assert 0 < await fake_redis.ttl(f'invent:{planet_id}') <= 100
 
+    assert await actions_storage.invent(planet_id) == FailureReason.SUCCESS
+    assert not await actions_storage.get_invented(planet_id)
+    balance = await actions_storage.get_balance(planet_id, money)
+    assert balance == game_config.INVENTION_COST
 
-@pytest.mark.parametrize(
-    ('eco_before', 'balance', 'eco_after', 'new_balance', 'expected'),
-    [
-        (None, game_config.ECO_COST, True, 0, FailureReason.SUCCESS),
-        (False, game_config.ECO_COST, True, 0, FailureReason.SUCCESS),
-        (False, 0, None, None, FailureReason.NOT_ENOUGH_METEORITES),
-        (True, 0, False, game_config.ECO_COST, FailureReason.SUCCESS),
-    ],
-)
-def test_eco_boost(
-    mock_actions_storage,
-    mocker,
-    planet_id,
-    eco_before,
-    balance,
-    eco_after,
-    new_balance,
-    expected,
-):
-    def get_side_effect(key: str) -> str:
-        if key.startswith('eco'):
-            return None if eco_before is None else str(int(eco_before))
-        else:
-            return str(balance)
+    await actions_storage.set_balance(planet_id, 0, money)
+    assert await actions_storage.invent(planet_id) == FailureReason.NOT_ENOUGH_MONEY
+    assert not await actions_storage.get_invented(planet_id)
 
-    mocker.patch.object(mock_actions_storage.client, 'get', side_effect=get_side_effect)
 
-    result = mock_actions_storage.eco_boost(planet_id)
-    assert result == expected
+@pytest.mark.asyncio
+async def test_set_amount_script(actions_storage, fake_redis, planet_id):
+    money = actions_storage.MONEY_KEY
+    await actions_storage.set_balance(planet_id, 2 * game_config.CREATE_COST, money)
 
-    if new_balance is not None:
-        mock_actions_storage.client.set.assert_any_call(
-            name=f'meteorites_balance:{planet_id}',
-            value=str(new_balance),
-            ex=mock_actions_storage.ex,
-        )
-    else:
-        mock_actions_storage.client.set.assert_not_called()
+    result = await actions_storage.create_meteorites(planet_id, 2)
+    assert result == FailureReason.SUCCESS
+    assert await actions_storage.get_created_meteorites(planet_id) == 2
+    assert await actions_storage.get_balance(planet_id, money) == 0
+    assert 0 < await fake_redis.ttl(f'create:{planet_id}') <= 100
 
-    if eco_after is not None:
-        if eco_after:
-            mock_actions_storage.client.set.assert_any_call(
-                name=f'eco:{planet_id}', value='1', ex=mock_actions_storage.ex
-            )
-        else:
-            mock_actions_storage.client.delete.assert_called_once_with(
-                f'eco:{planet_id}'
-            )
+    result = await actions_storage.create_meteorites(planet_id, 3)
+    assert result == FailureReason.NOT_ENOUGH_MONEY
+    assert await actions_storage.get_created_meteorites(planet_id) == 2
+
+    result = await actions_storage.create_meteorites(planet_id, 1)
+    assert result == FailureReason.SUCCESS
+    balance = await actions_storage.get_balance(planet_id, money)
+    assert balance == game_config.CREATE_COST
+
+
+@pytest.mark.asyncio
+async def test_load_scripts(mock_actions_storage):
+    mock_actions_storage.client.script_load = AsyncMock(return_value='sha')
+
+    await mock_actions_storage.load_scripts()
+    assert mock_actions_storage.client.script_load.await_count == 3
+    assert mock_actions_storage._toggle_member.sha == 'sha'
 
 
 @pytest.mark.parametrize(
@@ -313,7 +247,8 @@ def test_eco_boost(
         (False, '2', FailureReason.BILATERAL_NEGOTIATIONS),
     ],
 )
-def test_make_negotiations(
+@pytest.mark.asyncio
+async def test_make_negotiations(
     mock_actions_storage,
     planet_id,
     other_planet_id,
@@ -324,7 +259,7 @@ def test_make_negotiations(
     mock_actions_storage.client.exists.return_value = any_negotiation_exists
     mock_actions_storage.client.get.return_value = side_negotiator
 
-    result = mock_actions_storage.make_negotiations(planet_id, other_planet_id)
+    result = await mock_actions_storage.make_negotiations(planet_id, other_planet_id)
     assert result == expected_result
     if expected_result == FailureReason.SUCCESS:
         mock_actions_storage.client.set.assert_called_once_with(
@@ -334,40 +269,47 @@ def test_make_negotiations(
         )
 
 
-def test_end_negotiations(mock_actions_storage, planet_id):
-    mock_actions_storage.end_negotiations(planet_id)
+@pytest.mark.asyncio
+async def test_end_negotiations(mock_actions_storage, planet_id):
+    await mock_actions_storage.end_negotiations(planet_id)
 
-    assert mock_actions_storage.client.delete(f'negotiate:{planet_id}')
+    mock_actions_storage.client.delete.assert_called_once_with(
+        f'negotiate:{planet_id}'
+    )
 
 
-def test_get_shielded_cities(mock_actions_storage, planet_id, city_id, city_id2):
+@pytest.mark.asyncio
+async def test_get_shielded_cities(mock_actions_storage, planet_id, city_id, city_id2):
     mock_actions_storage.client.smembers.return_value = [str(city_id), str(city_id2)]
 
-    result = mock_actions_storage.get_shielded_cities(planet_id)
+    result = await mock_actions_storage.get_shielded_cities(planet_id)
     assert result == [city_id, city_id2]
     mock_actions_storage.client.smembers.assert_called_once_with(f'shield:{planet_id}')
 
 
-def test_get_developed_cities(mock_actions_storage, planet_id, city_id, city_id2):
+@pytest.mark.asyncio
+async def test_get_developed_cities(mock_actions_storage, planet_id, city_id, city_id2):
     mock_actions_storage.client.smembers.return_value = [str(city_id), str(city_id2)]
 
-    result = mock_actions_storage.get_developed_cities(planet_id)
+    result = await mock_actions_storage.get_developed_cities(planet_id)
     assert result == [city_id, city_id2]
     mock_actions_storage.client.smembers.assert_called_once_with(f'develop:{planet_id}')
 
 
-def test_get_attacked_cities(mock_actions_storage, planet_id, city_id, city_id2):
+@pytest.mark.asyncio
+async def test_get_attacked_cities(mock_actions_storage, planet_id, city_id, city_id2):
     mock_actions_storage.client.smembers.return_value = [str(city_id), str(city_id2)]
 
-    result = mock_actions_storage.get_attacked_cities(planet_id)
+    result = await mock_actions_storage.get_attacked_cities(planet_id)
     assert result == [city_id, city_id2]
     mock_actions_storage.client.smembers.assert_called_once_with(f'attack:{planet_id}')
 
 
-def test_get_sanctioned_planets(mock_actions_storage, planet_id, other_planet_id):
+@pytest.mark.asyncio
+async def test_get_sanctioned_planets(mock_actions_storage, planet_id, other_planet_id):
     mock_actions_storage.client.smembers.return_value = [str(other_planet_id)]
 
-    result = mock_actions_storage.get_sanctioned_planets(planet_id)
+    result = await mock_actions_storage.get_sanctioned_planets(planet_id)
     assert result == [other_planet_id]
     mock_actions_storage.client.smembers.assert_called_once_with(
         f'sanctions:{planet_id}'
@@ -377,12 +319,13 @@ def test_get_sanctioned_planets(mock_actions_storage, planet_id, other_planet_id
 @pytest.mark.parametrize(
     ('inmemory_meteorites', 'expected_result'), [(None, 0), ('0', 0), ('2', 2)]
 )
-def test_get_created_meteorites(
+@pytest.mark.asyncio
+async def test_get_created_meteorites(
     mock_actions_storage, planet_id, inmemory_meteorites, expected_result
 ):
     mock_actions_storage.client.get.return_value = inmemory_meteorites
 
-    actual_result = mock_actions_storage.get_created_meteorites(planet_id)
+    actual_result = await mock_actions_storage.get_created_meteorites(planet_id)
     assert actual_result == expected_result
     mock_actions_storage.client.get.assert_called_once_with(f'create:{planet_id}')
 
@@ -390,10 +333,13 @@ def test_get_created_meteorites(
 @pytest.mark.parametrize(
     ('inmemory_eco', 'expected_result'), [(None, False), (b'0', False), (b'1', True)]
 )
-def test_get_eco_boost(mock_actions_storage, planet_id, inmemory_eco, expected_result):
+@pytest.mark.asyncio
+async def test_get_eco_boost(
+    mock_actions_storage, planet_id, inmemory_eco, expected_result
+):
     mock_actions_storage.client.get.return_value = inmemory_eco
 
-    actual_result = mock_actions_storage.get_eco_boost(planet_id)
+    actual_result = await mock_actions_storage.get_eco_boost(planet_id)
     assert actual_result == expected_result
     mock_actions_storage.client.get.assert_called_once_with(f'eco:{planet_id}')
 
@@ -401,24 +347,76 @@ def test_get_eco_boost(mock_actions_storage, planet_id, inmemory_eco, expected_r
 @pytest.mark.parametrize(
     ('inmemory_invent', 'expected_result'), [(None, False), (b'0', False), (b'1', True)]
 )
-def test_get_invented(
+@pytest.mark.asyncio
+async def test_get_invented(
     mock_actions_storage, planet_id, inmemory_invent, expected_result
 ):
     mock_actions_storage.client.get.return_value = inmemory_invent
 
-    actual_result = mock_actions_storage.get_invented(planet_id)
+    actual_result = await mock_actions_storage.get_invented(planet_id)
     assert actual_result == expected_result
     mock_actions_storage.client.get.assert_called_once_with(f'invent:{planet_id}')
 
 
-def test_clear_order_info(
+@pytest.mark.asyncio
+async def test_clear_order_info(
     mock_actions_storage,
     planet_id,
 ):
-    mock_actions_storage.clear_order_info(planet_id)
+    await mock_actions_storage.clear_order_info(planet_id)
 
     for order_type in OrderType:
         if order_type != OrderType.NEGOTIATE:
             mock_actions_storage.client.delete.assert_any_call(
                 f'{order_type}:{planet_id}'
             )
+
+
+@pytest.mark.asyncio
+async def test_snapshot_and_clear_game(planet_id, other_planet_id):
+    client = FakeAsyncRedis()
+    actions_client = ActionsClient(client, 100, game_config)
+    await client.set('money_balance:1', 500)
+    await client.set('meteorites_balance:1', 2)
+    await client.set('money_balance:2', 100)
+    await client.sadd('shield:1', 1, 3)
+    await client.sadd('sanctions:1', other_planet_id)
+    await client.sadd('attack:2', 4)
+    await client.set('create:1', 2)
+    await client.set('invent:2', 1)
+    await client.set('negotiate:2', planet_id)
+
+    orders, balances = await actions_client.snapshot_and_clear_game(
+        [planet_id, other_planet_id]
+    )
+
+    assert sorted(orders[planet_id].pop(OrderType.SHIELD)) == [1, 3]
+    assert orders[planet_id] == {
+        OrderType.DEVELOP: [],
+        OrderType.SANCTIONS: [other_planet_id],
+        OrderType.ATTACK: [],
+        OrderType.CREATE: 2,
+        OrderType.INVENT: False,
+        OrderType.ECO: False,
+    }
+    assert orders[other_planet_id][OrderType.ATTACK] == [4]
+    assert orders[other_planet_id][OrderType.INVENT] is True
+    assert balances == {planet_id: (500, 2), other_planet_id: (100, None)}
+    assert sorted(await client.keys()) == [
+        b'meteorites_balance:1',
+        b'money_balance:1',
+        b'money_balance:2',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_of_expired_balances(actions_storage, fake_redis, planet_id):
+    await actions_storage.set_balance(planet_id, 500, actions_storage.MONEY_KEY)
+    await actions_storage.set_balance(planet_id, 2, actions_storage.METEORITES_KEY)
+    for key in await fake_redis.keys():
+        await fake_redis.pexpire(key, 1)
+    await asyncio.sleep(0.01)
+
+    _, balances = await actions_storage.snapshot_and_clear_game([planet_id])
+    assert balances == {planet_id: (None, None)}
+    assert (await actions_storage.get_planet_state(planet_id)).money is None
@@ -2,14 +2,14 @@ import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
-from fakeredis import FakeRedis
+from fakeredis import FakeAsyncRedis
 
 from storage.clients.update import UpdateClient
 
 
 @pytest.fixture()
 def mock_update_client():
-    return UpdateClient(FakeRedis())
+    return UpdateClient(FakeAsyncRedis())
 
 
 @pytest.mark.asyncio
@@ -1,4 +1,32 @@
 import pytest
+from redis.asyncio import Redis
+
+REDIS_COMMANDS = (
+    'get',
+    'mget',
+    'set',
+    'delete',
+    'exists',
+    'incr',
+    'decr',
+    'hget',
+    'hset',
+    'hgetall',
+    'hdel',
+    'sadd',
+    'srem',
+    'smembers',
+    'sismember',
+)
+
+
+@pytest.fixture()
+def mock_redis(mocker) -> Redis:
+    client = mocker.Mock(Redis)
+    for command in REDIS_COMMANDS:
+        setattr(client, command, mocker.AsyncMock())
+    client.register_script.side_effect = lambda script: mocker.AsyncMock()
+    return client
 
 
 @pytest.fixture()
@@ -0,0 +1,40 @@
+from redis.asyncio import UnixDomainSocketConnection
+from redis.exceptions import ConnectionError, TimeoutError
+
+from storage import create_redis_pool
+from storage.config import RedisConfig
+
+
+def make_config(**kwargs) -> RedisConfig:
+    return RedisConfig(
+        DB=0,
+        HOST='redis',
+        INNER_PORT='6379',
+        OUTER_PORT='6380',
+        PASSWORD='password',
+        **kwargs,
+    )
+
+
+def test_tcp_pool():
+    pool = create_redis_pool(
+        make_config(POOL_SIZE=7, SOCKET_TIMEOUT=0.5, RETRY_ATTEMPTS=2)
+    )
+    connection = pool.make_connection()
+
+    assert pool.max_connections == 7
+    assert connection.host == 'redis'
+    assert connection.socket_timeout == 0.5
+    assert connection.retry.get_retries() == 2
+    assert ConnectionError in connection.retry._supported_errors
+    # a timed out command may have run, retrying could apply an order twice
+    assert TimeoutError not in connection.retry._supported_errors
+    assert not connection.retry_on_timeout
+
+
+def test_unix_socket_pool():
+    pool = create_redis_pool(make_config(UNIX_SOCKET_PATH='/run/redis.sock'))
+    connection = pool.make_connection()
+
+    assert isinstance(connection, UnixDomainSocketConnection)
+    assert connection.path == '/run/redis.sock'
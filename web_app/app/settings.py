@@ -65,6 +65,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'web_app.stats.middlewares.invalidation.CacheInvalidationMiddleware',
     'web_app.stats.middlewares.db.DBClientMiddleware',
     'web_app.stats.middlewares.verifier.VerifierMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -0,0 +1,33 @@
+from collections.abc import Awaitable, Callable
+from inspect import iscoroutinefunction
+
+from asgiref.sync import markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
+
+from database.alru_cache import set_invalidation_bus
+from storage import redis_client
+from storage.clients import RedisInvalidationBus
+
+invalidation_bus = RedisInvalidationBus(redis_client)
+
+
+class CacheInvalidationMiddleware:
+    """
+    Subscribes the process to cache invalidations published by the bot.
+    The subscription starts on the first request to run in the server loop.
+    """
+
+    async_capable = True
+    sync_capable = False
+
+    def __init__(self, get_response: Callable[[HttpRequest], Awaitable[HttpResponse]]):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    async def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not invalidation_bus.started:
+            await invalidation_bus.start()
+            set_invalidation_bus(invalidation_bus)
+
+        return await self.get_response(request)
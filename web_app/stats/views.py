@@ -7,6 +7,11 @@ from django.template import loader
 from database.clients import GameClient
 from database.clients.user import UserClient
 
+# module level so that cached results outlive a request and can be
+# invalidated by the bot through the invalidation bus
+game_client = GameClient()
+user_client = UserClient()
+
 
 async def get_round_stats(request: HttpRequest, game_id: int, round_num: int) -> HttpResponse:
     forb_template = await sync_to_async(loader.get_template)('stats/forbidden.html')
@@ -18,9 +23,6 @@ async def get_round_stats(request: HttpRequest, game_id: int, round_num: int) ->
     session = request.db_session
     user_id = request.user_id
 
-    game_client = GameClient()
-    user_client = UserClient()
-
     is_admin = await user_client.is_user_admin(session, user_id)
     if not is_admin:
         return forb_response